@@ -1,48 +1,93 @@
 # app/api/deps.py
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, get_db
+from app.core.replica import replica_router
 from app.models.organization import User
+from app.repositories.user_repo import UserRepository
 from app.schemas.token import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_access_token(token: str) -> UUID:
+    """Validates the JWT signature/expiry and returns the user id it was issued for."""
+    from jose import jwt, JWTError
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
         if token_data.sub is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.id == UUID(token_data.sub)).first()
+            raise _credentials_exception()
+        return UUID(token_data.sub)
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    user = UserRepository(db).get_by_id(decode_access_token(token))
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+def get_read_db():
+    """
+    Session for read-only GET handlers: the replica, unless the client's read-after token
+    names a write the replica hasn't replayed yet, or the replica is down/lagging (then the primary).
+    """
+    db = replica_router.read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_current_reader(
+    db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """get_current_user for read-only handlers, resolved on the same (possibly replica) session."""
+    user = UserRepository(db).get_by_id(decode_access_token(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
+def authenticate_user_id(token: Optional[str]) -> UUID:
+    """
+    Authenticates long-lived connections (SSE, WebSocket) with a short-lived session,
+    so a pooled DB connection is not pinned for the lifetime of the stream.
+    """
+    if not token:
+        raise _credentials_exception()
+    user_id = decode_access_token(token)
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).get_active_by_id(user_id)
+    finally:
+        db.close()
+    if user is None:
+        raise _credentials_exception()
+    return user_id
+
+def get_stream_user_id(request: Request, access_token: Optional[str] = None) -> UUID:
+    # EventSource cannot set headers, so the token may also arrive as ?access_token=
+    token = access_token
+    authorization = request.headers.get("authorization", "")
+    if not token and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    return authenticate_user_id(token)
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -50,12 +95,20 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+def _require_admin(current_user: User) -> User:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_current_admin_user(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    return _require_admin(current_user)
+
+def get_current_admin_reader(
+    current_user: User = Depends(get_current_reader),
+) -> User:
+    return _require_admin(current_user)
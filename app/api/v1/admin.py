@@ -1,20 +1,39 @@
 # app/api/v1/admin.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
 from uuid import UUID
+from datetime import date, datetime
 
 from app.core.database import get_db
-from app.api.deps import get_current_admin_user
+from app.core.http_cache import not_modified
+from app.api.deps import get_current_admin_reader, get_current_admin_user, get_read_db
 from app.models.audit import AuditLog
 from app.models.organization import User, Department, Position
 from app.models.workflow import FormTemplate, Workflow, WorkflowStage, FormSubmission
-from app.schemas.organization import DepartmentCreate, PositionCreate
-from app.schemas.workflow import FormTemplateCreate, WorkflowCreate
+from app.schemas.analytics import CycleTimeReport
+from app.schemas.audit import AuditFeedEntryResponse, AuditLogResponse, AuditSearchPage
+from app.schemas.common import MessageResponse
+from app.schemas.dashboard import DashboardStatsResponse
+from app.schemas.organization import DepartmentCreate, DepartmentResponse, PositionCreate, PositionResponse
+from app.schemas.user import UserDirectoryResponse
+from app.schemas.submission import SubmissionSearchPage, SubmissionSearchRequest
+from app.schemas.workflow import (
+    FormTemplateCreate, FormTemplateResponse, WorkflowCreate, WorkflowResponse,
+    WorkflowSimulationRequest, WorkflowSimulationResponse
+)
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.audit_repo import AuditSearchRepository
+from app.repositories.search_repo import SubmissionSearchRepository, decode_cursor, encode_cursor
+from app.repositories.submission_repo import SubmissionRepository
+from app.repositories.version_repo import VersionRepository
+from app.services.cycle_time import CycleTimeAnalytics
+from app.services.form_schema import FormSchemaError, compile_form_schema
 
 router = APIRouter()
 
 # --- Organization Management ---
-@router.post("/departments")
+@router.post("/departments", response_model=DepartmentResponse)
 def create_department(
     dept_in: DepartmentCreate, 
     db: Session = Depends(get_db), 
@@ -26,7 +45,7 @@ def create_department(
     db.refresh(dept)
     return dept
 
-@router.post("/positions")
+@router.post("/positions", response_model=PositionResponse)
 def create_position(
     pos_in: PositionCreate, 
     db: Session = Depends(get_db), 
@@ -39,19 +58,24 @@ def create_position(
     return position
 
 # --- Forms & Workflows Management ---
-@router.post("/forms")
+@router.post("/forms", response_model=FormTemplateResponse)
 def create_form_template(
     form_in: FormTemplateCreate, 
     db: Session = Depends(get_db), 
     current_admin=Depends(get_current_admin_user)
 ):
+    try:
+        compile_form_schema(form_in.form_schema)
+    except FormSchemaError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid form schema: {exc}")
+
     template = FormTemplate(**form_in.model_dump())
     db.add(template)
     db.commit()
     db.refresh(template)
     return template
 
-@router.post("/workflows")
+@router.post("/workflows", response_model=WorkflowResponse)
 def create_workflow(
     workflow_in: WorkflowCreate, 
     db: Session = Depends(get_db), 
@@ -74,11 +98,30 @@ def create_workflow(
     db.refresh(workflow)
     return workflow
 
+@router.post("/workflows/{workflow_id}/simulate", response_model=WorkflowSimulationResponse)
+def simulate_workflow_change(
+    workflow_id: UUID,
+    simulation_in: WorkflowSimulationRequest,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
+    """Dry run: how a proposed stage set would route the template's past and in-flight submissions."""
+    # numpy is only needed here, so it stays off the app import path
+    from app.services.workflow_simulator import WorkflowSimulator
+    return WorkflowSimulator(db).simulate(
+        workflow_id,
+        [stage.model_dump() for stage in simulation_in.stages],
+        statuses=simulation_in.statuses,
+        since=simulation_in.since,
+        until=simulation_in.until,
+        top_approvers=simulation_in.top_approvers
+    )
+
 from app.schemas.user import UserCreate
 from app.core.security import get_password_hash
 from app.models.organization import User, UserPosition
 
-@router.post("/users")
+@router.post("/users", response_model=MessageResponse)
 def create_employee(
     user_in: UserCreate, 
     position_id: UUID, 
@@ -103,36 +146,85 @@ def create_employee(
     db.commit()
     return {"message": f"User {new_user.full_name} created successfully!"}
 
-@router.get("/users")
-def get_all_users(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/users", response_model=List[UserDirectoryResponse])
+def get_all_users(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch all users in the system for the Admin Directory."""
-    users = db.query(User).order_by(User.email).all()
-    # Notice we aren't returning passwords!
-    return [{"id": u.id, "email": u.email, "full_name": u.full_name, "is_admin": u.is_admin, "is_active": u.is_active} for u in users]
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("users"))
+    if cached:
+        return cached
+    # UserDirectoryResponse only exposes public fields, so passwords never leave the API
+    return db.query(User).order_by(User.email).all()
 
-@router.get("/departments")
-def get_all_departments(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/departments", response_model=List[DepartmentResponse])
+def get_all_departments(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch all organizational departments."""
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("departments"))
+    if cached:
+        return cached
     return db.query(Department).all()
 
-@router.get("/positions")
-def get_all_positions(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/positions", response_model=List[PositionResponse])
+def get_all_positions(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch all job positions and their hierarchy."""
-    return db.query(Position).all()
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("positions"))
+    if cached:
+        return cached
+    # Eager-load departments in the same query instead of one lazy load per row
+    return db.query(Position).options(joinedload(Position.department)).all()
 
-@router.get("/forms")
-def get_all_forms(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/forms", response_model=List[FormTemplateResponse])
+def get_all_forms(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch all form templates (both active and draft)."""
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("form_templates"))
+    if cached:
+        return cached
     return db.query(FormTemplate).all()
 
-@router.get("/workflows")
-def get_all_workflows(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/workflows", response_model=List[WorkflowResponse])
+def get_all_workflows(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch all workflow routing engines."""
-    return db.query(Workflow).all()
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("workflows", "workflow_stages"))
+    if cached:
+        return cached
+    return db.query(Workflow).options(selectinload(Workflow.stages)).all()
 
-@router.get("/audit-logs")
-def get_audit_logs(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.get("/audit-logs", response_model=List[AuditFeedEntryResponse])
+def get_audit_logs(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
     """Fetch the latest 100 immutable audit logs for the platform."""
+    cached = not_modified(request, response, VersionRepository(db).get_audit_feed_validators())
+    if cached:
+        return cached
+
     # Using 'timestamp' for ordering
     logs = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).limit(100).all()
     
@@ -161,8 +253,60 @@ def get_audit_logs(db: Session = Depends(get_db), current_admin: User = Depends(
         })
     return result
 
-@router.get("/stats")
-def get_admin_dashboard_stats(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+@router.post("/submissions/search", response_model=SubmissionSearchPage)
+def search_submissions(
+    search_in: SubmissionSearchRequest,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
+    """Filter submissions by status, template, department, date range and form_data (keyset-paginated)."""
+    try:
+        rows = SubmissionSearchRepository(db).search(
+            statuses=search_in.status,
+            template_id=search_in.form_template_id,
+            department_id=search_in.department_id,
+            created_from=search_in.created_from,
+            created_to=search_in.created_to,
+            form_data=search_in.form_data,
+            contains=search_in.contains,
+            after=decode_cursor(search_in.cursor) if search_in.cursor else None,
+            limit=search_in.limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    items = rows[:search_in.limit]
+    next_cursor = None
+    if len(rows) > search_in.limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/audit-logs/search", response_model=AuditSearchPage)
+def search_audit_logs(
+    q: str = Query(..., min_length=2, description="Web-search syntax, e.g. \"budget overrun\" -travel"),
+    entity_type: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: Literal["relevance", "recent"] = "relevance",
+    limit: int = Query(25, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
+    """Ranked full-text search across audit snapshots and approver comments, with highlighted matches."""
+    rows = AuditSearchRepository(db).search(
+        q, entity_type=entity_type, action=action, since=since, until=until,
+        sort=sort, limit=limit, offset=offset
+    )
+    items = [
+        {**AuditLogResponse.model_validate(log).model_dump(), "rank": rank, "headline": headline}
+        for log, rank, headline in rows[:limit]
+    ]
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
+
+@router.get("/stats", response_model=DashboardStatsResponse)
+def get_admin_dashboard_stats(db: Session = Depends(get_read_db), current_admin: User = Depends(get_current_admin_reader)):
     """Fetch live dashboard metrics."""
     # Count active users
     total_users = db.query(User).filter(User.is_active == True).count()
@@ -170,14 +314,32 @@ def get_admin_dashboard_stats(db: Session = Depends(get_db), current_admin: User
     # Count requests sitting in PENDING state
     open_requests = db.query(FormSubmission).filter(FormSubmission.status == "PENDING").count()
     
-    # Calculate completion rate
-    total_requests = db.query(FormSubmission).count()
-    completed_requests = db.query(FormSubmission).filter(FormSubmission.status == "COMPLETED").count()
+    # Calculate completion rate (archived submissions are finished history and still count)
+    archive_repo = ArchiveRepository(db)
+    total_requests = db.query(FormSubmission).count() + archive_repo.count_submissions()
+    completed_requests = (
+        db.query(FormSubmission).filter(FormSubmission.status == "COMPLETED").count()
+        + archive_repo.count_submissions("COMPLETED")
+    )
     completion_rate = round((completed_requests / total_requests * 100), 1) if total_requests > 0 else 0
 
     return {
         "total_users": total_users,
         "open_requests": open_requests,
-        "overdue_approvals": 0, # Setting to 0 for now unless you want complex datetime math
+        "overdue_approvals": SubmissionRepository(db).count_overdue_approvals(datetime.utcnow()),
         "completion_rate": f"{completion_rate}%"
-    }
\ No newline at end of file
+    }
+
+@router.get("/analytics/cycle-times", response_model=CycleTimeReport)
+def get_cycle_time_percentiles(
+    dimension: Literal["stage", "approver", "template"] = "stage",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    outcome: Optional[Literal["APPROVED", "REJECTED"]] = None,
+    key_id: Optional[UUID] = None,
+    percentiles: List[float] = Query([50, 90, 99]),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin_reader)
+):
+    """Time from stage entry to decision, per stage/approver/template, over any date range (default: last 30 days)."""
+    return CycleTimeAnalytics(db).percentiles(dimension, since, until, outcome, key_id, percentiles)
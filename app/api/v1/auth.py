@@ -10,6 +10,7 @@ from app.core.security import verify_password, create_access_token
 from app.models.organization import User
 from app.api.deps import get_current_user
 from app.schemas.token import Token
+from app.schemas.user import CurrentUserResponse
 
 router = APIRouter()
 
@@ -37,7 +38,7 @@ def login_access_token(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/me")
+@router.get("/me", response_model=CurrentUserResponse)
 def read_users_me(current_user: User = Depends(get_current_user)):
     """Fetch the currently logged-in user's profile and positions."""
     return {
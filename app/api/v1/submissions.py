@@ -1,28 +1,55 @@
 # app/api/v1/submissions.py
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import contextlib
+from typing import List
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.inbox_broker import inbox_broker
+from app.core.http_cache import not_modified
+from app.api.deps import get_current_reader, get_current_user, get_read_db, get_stream_user_id, authenticate_user_id
 from app.models.organization import User
-from app.models.workflow import FormSubmission
-from app.schemas.submission import FormSubmissionCreate, ApprovalAction
+from app.schemas.audit import AuditLogResponse
+from app.schemas.common import MessageResponse
+from app.schemas.submission import (
+    FormSubmissionCreate, FormSubmissionResponse, ApprovalAction,
+    SubmissionCreatedResponse, PendingApprovalResponse, DocumentDownloadResponse, InboxCountsResponse,
+    DocumentVerificationResponse, AttachmentUploadCreate, AttachmentUploadResponse, AttachmentResponse
+)
+from app.schemas.workflow import FormTemplateResponse
 from app.services.workflow_engine import WorkflowService
 from app.services.document_service import DocumentService
 from app.services.audit_service import AuditService
+from app.services.integrity_service import IntegrityService
+from app.services.attachment_service import AttachmentService, confirm_attachment
+from app.repositories.inbox_repo import InboxCounterRepository
 from app.repositories.submission_repo import SubmissionRepository
 from app.repositories.workflow_repo import WorkflowRepository
+from app.repositories.version_repo import VersionRepository
 
 router = APIRouter()
 
-@router.get("/forms/active")
-def get_active_forms(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/forms/active", response_model=List[FormTemplateResponse])
+def get_active_forms(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader)
+):
     """Returns available forms for the user to submit (e.g., Leave Request, Procurement)."""
+    cached = not_modified(request, response, VersionRepository(db).get_table_validators("form_templates"))
+    if cached:
+        return cached
     repo = WorkflowRepository(db)
     return repo.get_active_form_templates()
 
-@router.post("/")
+@router.post("/", response_model=SubmissionCreatedResponse)
 def submit_form(
     submission_in: FormSubmissionCreate, 
     db: Session = Depends(get_db), 
@@ -38,13 +65,13 @@ def submit_form(
     )
     return {"message": "Success", "submission_id": submission.id, "status": submission.status}
 
-@router.get("/my-requests")
-def get_my_requests(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/my-requests", response_model=List[FormSubmissionResponse])
+def get_my_requests(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)):
     """Populates the 'My Requests' datatable in the frontend dashboard."""
-    return db.query(FormSubmission).filter(FormSubmission.submitter_id == current_user.id).all()
+    return SubmissionRepository(db).get_submissions_for_submitter(current_user.id)
 
-@router.get("/pending-approvals")
-def get_pending_approvals(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/pending-approvals", response_model=List[PendingApprovalResponse])
+def get_pending_approvals(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)):
     """Populates the 'My Approvals' inbox for managers/HODs."""
     repo = SubmissionRepository(db)
     approvals = repo.get_pending_approvals_for_user(current_user.id)
@@ -58,7 +85,70 @@ def get_pending_approvals(db: Session = Depends(get_db), current_user: User = De
         } for app in approvals
     ]
 
-@router.post("/approvals/{approval_id}/action")
+@router.get("/inbox/counts", response_model=InboxCountsResponse)
+def get_inbox_counts(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)):
+    """Badge numbers for every page load, from the per-user counters (no list is loaded)."""
+    pending_approvals, pending_requests = InboxCounterRepository(db).get_counts(current_user.id)
+    return {"pending_approvals": pending_approvals, "pending_requests": pending_requests}
+
+@router.get("/inbox/stream")
+async def stream_inbox_events(request: Request, user_id: UUID = Depends(get_stream_user_id)):
+    """
+    Server-Sent Events push channel for 'My Approvals' / 'My Requests'.
+    Events are change hints only; clients refetch the affected list when one arrives.
+    """
+    subscription = inbox_broker.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.INBOX_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {orjson.dumps(event).decode()}\n\n"
+        finally:
+            inbox_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/inbox/ws")
+async def inbox_websocket(websocket: WebSocket, access_token: str = None):
+    """WebSocket variant of the inbox push channel (token passed as ?access_token=)."""
+    try:
+        user_id = await run_in_threadpool(authenticate_user_id, access_token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription = inbox_broker.subscribe(user_id)
+
+    async def pump_events():
+        while True:
+            event = await subscription.get(timeout=settings.INBOX_HEARTBEAT_SECONDS)
+            await websocket.send_json(event or {"type": "ping"})
+
+    sender = asyncio.create_task(pump_events())
+    try:
+        # Clients never send anything; receiving only detects the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        # Wait for the pump to unwind so it never outlives the socket or the subscription
+        with contextlib.suppress(asyncio.CancelledError):
+            await sender
+        inbox_broker.unsubscribe(subscription)
+
+@router.post("/approvals/{approval_id}/action", response_model=MessageResponse)
 def process_approval_action(
     approval_id: UUID,
     action_in: ApprovalAction,
@@ -75,22 +165,79 @@ def process_approval_action(
     )
     return result
 
-@router.get("/{submission_id}/timeline")
+@router.get("/{submission_id}/timeline", response_model=List[AuditLogResponse])
 def get_submission_timeline(
     submission_id: UUID, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db), 
+    current_user: User = Depends(get_current_reader)
 ):
     """Fetches the immutable audit trail for the visual timeline UI."""
+    cached = not_modified(request, response, VersionRepository(db).get_timeline_validators(submission_id))
+    if cached:
+        return cached
     audit_svc = AuditService(db)
     return audit_svc.get_timeline_for_submission(submission_id)
 
-@router.get("/{submission_id}/download")
+@router.get("/{submission_id}/download", response_model=DocumentDownloadResponse)
 def download_final_document(
     submission_id: UUID, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db), 
+    current_user: User = Depends(get_current_reader)
 ):
     """Returns a temporary MinIO pre-signed URL for the generated PDF."""
     doc_svc = DocumentService(db)
-    return doc_svc.get_presigned_download_url(submission_id)
\ No newline at end of file
+    return doc_svc.get_presigned_download_url(submission_id)
+
+@router.post("/{submission_id}/verify", response_model=DocumentVerificationResponse)
+def verify_final_document(
+    submission_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streams the stored PDF from MinIO, re-hashes it and compares it with the recorded hash.
+    A POST (it records the outcome), limited to admins and the submission's participants.
+    """
+    return IntegrityService(db).verify_document(submission_id, current_user)
+
+@router.post("/{submission_id}/attachments", response_model=AttachmentUploadResponse)
+def create_attachment_upload(
+    submission_id: UUID,
+    upload_in: AttachmentUploadCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Authorizes one direct-to-storage upload; the file itself never goes through the API."""
+    return AttachmentService(db).create_upload(
+        submission_id=submission_id,
+        uploader_id=current_user.id,
+        filename=upload_in.filename,
+        content_type=upload_in.content_type,
+        size_bytes=upload_in.size_bytes
+    )
+
+@router.post("/{submission_id}/attachments/{attachment_id}/complete", response_model=MessageResponse, status_code=202)
+def complete_attachment_upload(
+    submission_id: UUID,
+    attachment_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Client reports the upload finished; the stored object is checked and hashed after the response."""
+    attachment = AttachmentService(db).get_for_uploader(submission_id, attachment_id, current_user.id)
+    if attachment.status != "PENDING":
+        return {"message": f"Attachment already {attachment.status}"}
+    background_tasks.add_task(confirm_attachment, SessionLocal, attachment.id)
+    return {"message": "Confirmation queued"}
+
+@router.get("/{submission_id}/attachments", response_model=List[AttachmentResponse])
+def list_attachments(
+    submission_id: UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader)
+):
+    """Attachment metadata with temporary download links; admins and the submission's participants only."""
+    return AttachmentService(db).list_attachments(submission_id, current_user)
@@ -0,0 +1,273 @@
+# app/core/admission.py
+import asyncio
+import ipaddress
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry, resolve_route_template
+
+ADMISSION_DECISIONS = registry.counter(
+    "approveflow_admission_decisions_total",
+    "Admission outcomes per pool: admitted, queue_full, deadline, timeout, rate_limited.",
+    ("pool", "result")
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "approveflow_admission_queue_wait_seconds", "Time admitted requests spent queued for a slot.", ("pool",)
+)
+ADMISSION_IN_FLIGHT = registry.gauge("approveflow_admission_in_flight", "Requests holding a slot, per pool.", ("pool",))
+ADMISSION_QUEUED = registry.gauge("approveflow_admission_queued", "Requests waiting for a slot, per pool.", ("pool",))
+ADMISSION_SERVICE_SECONDS = registry.gauge(
+    "approveflow_admission_service_seconds", "Moving average of slot hold time, per pool.", ("pool",)
+)
+ADMISSION_RATE_BUCKETS = registry.gauge("approveflow_admission_rate_buckets", "Per-client token buckets being tracked.")
+
+class AdmissionPool:
+    """
+    A concurrency limit with a bounded FIFO queue, for one class of routes.
+
+    Lives on the event loop, so no locking: slots are handed straight to the next waiter
+    on release. The moving average of slot hold time gives a queue wait estimate, which
+    lets requests that could not start before their deadline be rejected up front instead
+    of timing out after occupying a queue position.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, initial_service_seconds: float = 0.05):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.service_seconds = initial_service_seconds
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        if self.active < self.limit:
+            return 0.0
+        return (self.queued + 1) * self.service_seconds / self.limit
+
+    async def acquire(self, timeout: float) -> Optional[str]:
+        """None once a slot is held; otherwise the rejection reason."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if self.queued >= self.queue_size:
+            return "queue_full"
+        if self.estimated_wait() > timeout:
+            return "deadline"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return None
+        except asyncio.TimeoutError:
+            return "timeout"
+        except asyncio.CancelledError:
+            # Client went away; if a slot was handed over in the meantime, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        if held_seconds is not None:
+            self.service_seconds += 0.1 * (held_seconds - self.service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True) # The slot moves to the waiter; `active` is unchanged
+                return
+        self.active -= 1
+
+class TokenBucketLimiter:
+    """Per-client token buckets (`rate` tokens/s, up to `burst`), bounded to the most recently seen clients."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, cost: float = 1.0) -> float:
+        """0 if the request may proceed, otherwise seconds until the bucket holds `cost` tokens."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class TrustedProxies:
+    """
+    Peers whose X-Forwarded-For names the real client: addresses or CIDR ranges, or "*" for
+    any peer (only safe when nothing but the proxy can reach the app, e.g. a PaaS router).
+    """
+
+    def __init__(self, spec: str = ""):
+        items = [item.strip() for item in spec.split(",") if item.strip()]
+        self.trust_all = "*" in items
+        self.networks = [ipaddress.ip_network(item, strict=False) for item in items if item != "*"]
+
+    def _listed(self, host: str) -> bool:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+    def client_address(self, scope: Scope, headers: Headers) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else None
+        if peer is None or not (self.trust_all or self._listed(peer)):
+            return peer or "unknown"
+        forwarded = [host.strip() for value in headers.getlist("x-forwarded-for") for host in value.split(",") if host.strip()]
+        # Right to left: each proxy appends the address it saw, so the first hop that isn't one of
+        # ours is the client. Anything further left came from the client and is not trusted.
+        for host in reversed(forwarded):
+            if not self._listed(host):
+                return host
+        return forwarded[0] if forwarded else peer
+
+def client_key(scope: Scope, headers: Headers, trusted_proxies: Optional[TrustedProxies] = None) -> str:
+    """
+    The user id of a valid bearer token for authenticated calls, else the client address
+    (login, anonymous routes). Only a verified token counts: an unchecked one would let a
+    client mint a fresh bucket per request by making up tokens. Behind a reverse proxy the
+    address comes from X-Forwarded-For, otherwise every anonymous caller shares the proxy's.
+    """
+    from fastapi import HTTPException
+    from app.api.deps import decode_access_token
+    authorization = headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        try:
+            return f"user:{decode_access_token(authorization[7:])}"
+        except HTTPException:
+            pass # Invalid or expired: charged to the address like any anonymous call
+    if trusted_proxies is not None:
+        return "ip:" + trusted_proxies.client_address(scope, headers)
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+class AdmissionControlMiddleware:
+    """
+    Load shedding by route class. Each class ("cpu", "db", "light") has its own
+    concurrency pool, so a burst of PDF generations or bcrypt logins queues behind its
+    own limit while cheap reads keep flowing. Requests also spend per-client tokens, with
+    expensive classes costing more.
+
+    A full queue, or an estimated wait past the deadline, gets 503; an empty token bucket
+    gets 429. Both carry Retry-After. The deadline is ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+    or a shorter X-Request-Timeout sent by the client.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        pools: Dict[str, AdmissionPool],
+        route_classes: Dict[Tuple[str, str], str],
+        default_class: str = "light",
+        write_class: str = "db",
+        exempt_routes: Tuple[str, ...] = (),
+        max_queue_wait: float = 5.0,
+        limiter: Optional[TokenBucketLimiter] = None,
+        class_costs: Optional[Dict[str, float]] = None,
+        trusted_proxies: Optional[TrustedProxies] = None
+    ):
+        self.app = app
+        self.pools = pools
+        self.route_classes = route_classes
+        self.default_class = default_class
+        self.write_class = write_class
+        self.exempt_routes = set(exempt_routes)
+        self.max_queue_wait = max_queue_wait
+        self.limiter = limiter
+        self.class_costs = class_costs or {}
+        self.trusted_proxies = trusted_proxies
+
+        ADMISSION_IN_FLIGHT.set_function(lambda: {(name,): pool.active for name, pool in self.pools.items()})
+        ADMISSION_QUEUED.set_function(lambda: {(name,): pool.queued for name, pool in self.pools.items()})
+        ADMISSION_SERVICE_SECONDS.set_function(lambda: {(name,): pool.service_seconds for name, pool in self.pools.items()})
+        if limiter is not None:
+            ADMISSION_RATE_BUCKETS.set_function(lambda: {(): len(limiter)})
+
+    def classify(self, method: str, route: str) -> str:
+        if (method, route) in self.route_classes:
+            return self.route_classes[(method, route)]
+        return self.default_class if method in ("GET", "HEAD") else self.write_class
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        route = resolve_route_template(scope)
+        if route in self.exempt_routes:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.classify(scope["method"], route)
+        pool = self.pools[route_class]
+        headers = Headers(scope=scope)
+
+        if self.limiter is not None:
+            wait = self.limiter.take(client_key(scope, headers, self.trusted_proxies), self.class_costs.get(route_class, 1.0))
+            if wait:
+                ADMISSION_DECISIONS.inc(pool=route_class, result="rate_limited")
+                await self._reject(send, 429, "Too many requests; slow down.", wait)
+                return
+
+        deadline = self.max_queue_wait
+        try:
+            deadline = min(deadline, float(headers.get("x-request-timeout", deadline)))
+        except ValueError:
+            pass
+
+        queued_at = time.perf_counter()
+        rejection = await pool.acquire(deadline)
+        if rejection:
+            ADMISSION_DECISIONS.inc(pool=route_class, result=rejection)
+            await self._reject(send, 503, "Server busy; retry shortly.", max(pool.estimated_wait(), 1.0))
+            return
+
+        started = time.perf_counter()
+        ADMISSION_DECISIONS.inc(pool=route_class, result="admitted")
+        ADMISSION_QUEUE_WAIT.observe(started - queued_at, pool=route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.perf_counter() - started)
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, detail: str, retry_after: float) -> None:
+        body = orjson.dumps({"detail": detail})
+        start: Message = {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        }
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
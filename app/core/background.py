@@ -0,0 +1,37 @@
+# app/core/background.py
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class PeriodicWorker:
+    """Runs `task` on a daemon thread every `interval` seconds until stopped."""
+
+    def __init__(self, name: str, task: Callable[[], object], interval: float):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.task()
+            except Exception:
+                # A failing pass must not kill the thread; the next pass retries
+                logger.exception("Background task '%s' failed", self.name)
+            self._stop.wait(self.interval)
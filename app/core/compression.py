@@ -0,0 +1,95 @@
+# app/core/compression.py
+import gzip
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/csv", "application/javascript")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks 'br' or 'gzip' from an Accept-Encoding header, honouring q=0 exclusions."""
+    offered = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[token.strip().lower()] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    wildcard = offered.get("*", 0.0)
+    ranked = [(offered.get(enc, wildcard), -idx, enc) for idx, enc in enumerate(candidates)]
+    quality, _, encoding = max(ranked)
+    return encoding if quality > 0 else None
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression for buffered responses above a size threshold.
+    Streamed bodies (SSE, file downloads) are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False) or not self._should_compress(headers, len(body)):
+                # Not worth it (or a stream): replay the original start message and step aside
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, headers: MutableHeaders, size: int) -> bool:
+        if size < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
@@ -18,13 +18,117 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str = "localhost"
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str = "approveflow"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_CREATE_TABLES_ON_STARTUP: bool = True
+    DB_QUERY_CACHE_SIZE: int = 1200 # Compiled-SQL cache entries per engine (SQLAlchemy's default is 500)
+    # psycopg 3 (a postgresql+psycopg:// URL) switches a statement to a server-side prepared one after it
+    # ran this many times on a connection. 0 disables it (PgBouncer in transaction mode before 1.21).
+    # psycopg2 has no server-side prepare; the setting is ignored there.
+    DB_PREPARE_THRESHOLD: int = 5
+    STARTUP_WARM_UP: bool = True # Pre-open DB connections and object storage during startup
+
+    # Optional streaming replica for read-only GET endpoints (empty = everything on the primary)
+    READ_REPLICA_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 30.0 # Lifetime of the signed read-after token a write hands back to the client
+    REPLICA_MAX_LAG_SECONDS: float = 2.0 # Above this, reads fall back to the primary
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
     
     # MinIO
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_SECURE: bool = False
+    # Garbage collection of content-addressed documents nothing references any more
+    STORAGE_GC_ENABLED: bool = True
+    STORAGE_GC_INTERVAL_SECONDS: float = 3600.0
+    STORAGE_GC_GRACE_SECONDS: int = 86400
+    # Background re-hashing of stored documents (tamper evidence); also available as verify_documents.py
+    INTEGRITY_SCAN_ENABLED: bool = False
+    INTEGRITY_SCAN_INTERVAL_SECONDS: float = 3600.0
+    INTEGRITY_SCAN_WORKERS: int = 8
+    INTEGRITY_REVERIFY_SECONDS: int = 7 * 86400
+    # Submission attachments go straight from the browser to MinIO via presigned URLs
+    ATTACHMENT_MAX_BYTES: int = 25 * 1024 * 1024
+    ATTACHMENT_ALLOWED_TYPES: str = "application/pdf,image/png,image/jpeg" # Comma-separated
+    ATTACHMENT_MAX_PER_SUBMISSION: int = 20
+    ATTACHMENT_UPLOAD_EXPIRY_SECONDS: int = 900 # Lifetime of the presigned upload URL/policy
+    ATTACHMENT_SWEEP_ENABLED: bool = True # Confirms (or rejects) uploads the client never reported
+    ATTACHMENT_SWEEP_INTERVAL_SECONDS: float = 300.0
+
+    # Observability
+    METRICS_ENABLED: bool = True # Prometheus text format on /metrics
+    SERVER_TIMING_ENABLED: bool = False # Opt-in: exposes db/pdf/storage timings to browsers
+    SLOW_QUERY_MS: int = 200
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 1.0
+    TRACING_EXPORTER: str = "console" # "console" (logging) or "file" (JSON lines)
+    TRACING_FILE_PATH: str = "traces.jsonl"
+
+    # Admission control: per route class concurrency pools with bounded queues, plus per-client token buckets
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_CPU_CONCURRENCY: int = 2 # PDF generation, bcrypt, re-hashing
+    ADMISSION_CPU_QUEUE: int = 16
+    ADMISSION_DB_CONCURRENCY: int = 8 # Keep below DB_POOL_SIZE + DB_MAX_OVERFLOW
+    ADMISSION_DB_QUEUE: int = 64
+    ADMISSION_LIGHT_CONCURRENCY: int = 64
+    ADMISSION_LIGHT_QUEUE: int = 256
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS: float = 5.0
+    ADMISSION_CLIENT_RATE: float = 20.0 # Tokens per second per client (0 = no rate limiting)
+    ADMISSION_CLIENT_BURST: float = 60.0
+    # Reverse proxies whose X-Forwarded-For gives the client address for per-IP buckets (addresses or
+    # CIDRs, comma-separated; "*" = any peer). The same variable configures uvicorn/gunicorn.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Response compression (bodies below this many bytes are sent as-is)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Real-time inbox push ("postgres" = LISTEN/NOTIFY across workers, "memory" = single process)
+    INBOX_BROKER: str = "postgres"
+    INBOX_QUEUE_SIZE: int = 100 # Per connection; overflowing clients get one "resync" event
+    INBOX_HEARTBEAT_SECONDS: int = 15
+    # Workflow blueprints and the org tree, cached per process and dropped on a Postgres NOTIFY when they change
+    REFERENCE_CACHE_ENABLED: bool = True
+    REFERENCE_CACHE_REVALIDATE_SECONDS: float = 60.0 # Backstop check of table_versions, in case a NOTIFY was missed
+    # Badge counters are maintained on every status change; the reconciler recounts them to fix drift
+    INBOX_COUNTER_RECONCILE_ENABLED: bool = True
+    INBOX_COUNTER_RECONCILE_SECONDS: float = 900.0
+
+    # Transactional outbox relay (workflow transition events for downstream systems)
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_POLL_SECONDS: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_WEBHOOK_URL: str = "" # Optional: POST batches here
+    OUTBOX_FILE_PATH: str = "" # Optional: append JSON lines here
+
+    # SLA escalation scheduler (deadlines come from WorkflowStage.sla_hours)
+    SLA_SCHEDULER_ENABLED: bool = True
+    SLA_TICK_SECONDS: float = 5.0
+    SLA_HORIZON_SECONDS: int = 300 # How far ahead due approvals are loaded into memory
+    SLA_MAX_LOADED: int = 10000
+
+    # Approval cycle-time rollups (per-day sketches behind /admin/analytics/cycle-times)
+    CYCLE_ROLLUP_ENABLED: bool = True
+    CYCLE_ROLLUP_INTERVAL_SECONDS: float = 60.0
+
+    # Archival of finished submissions (moved to *_archive tables; reads fall back transparently)
+    ARCHIVE_ENABLED: bool = False # Opt-in: existing databases must drop the documents/attachments FKs first (see README)
+    ARCHIVE_AFTER_DAYS: int = 180 # COMPLETED/REJECTED submissions idle for this long leave the hot tables
+    ARCHIVE_INTERVAL_SECONDS: float = 3600.0
     
+    @staticmethod
+    def _normalize_db_url(db_url: str) -> str:
+        # SQLAlchemy requires 'postgresql://' but Neon gives 'postgres://'
+        if db_url and db_url.startswith("postgres://"):
+            db_url = db_url.replace("postgres://", "postgresql://", 1)
+        return db_url
+
+    @property
+    def READ_REPLICA_URI(self) -> str:
+        return self._normalize_db_url(self.READ_REPLICA_URL)
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         # Grab from Render Environment, fallback to your local Docker settings
@@ -32,12 +136,7 @@ class Settings(BaseSettings):
             "DATABASE_URL", 
             f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
-        
-        # SQLAlchemy requires 'postgresql://' but Neon gives 'postgres://'
-        if db_url and db_url.startswith("postgres://"):
-            db_url = db_url.replace("postgres://", "postgresql://", 1)
-            
-        return db_url
+        return self._normalize_db_url(db_url)
 
     class Config:
         env_file = ".env"
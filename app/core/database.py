@@ -1,11 +1,38 @@
 # app/core/database.py
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+def _driver_options(url: str) -> dict:
+    """Statement caching shared by both engines, plus server-side prepares where the driver has them."""
+    options = {"query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    if make_url(url).get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD or None}
+    return options
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    **_driver_options(settings.SQLALCHEMY_DATABASE_URI)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only GET endpoints may be served from a replica (see app.core.replica); without one it's the primary
+read_engine = create_engine(
+    settings.READ_REPLICA_URI,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    # Every transaction is READ ONLY, so a handler can't write here even if the replica is a plain database
+    execution_options={"postgresql_readonly": True},
+    **_driver_options(settings.READ_REPLICA_URI)
+) if settings.READ_REPLICA_URL else engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +40,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def create_tables() -> None:
+    """Initialize Database Schema (In a real production environment, use Alembic migrations instead)."""
+    from app.models import analytics, archive, audit, inbox_counter, organization, outbox, versioning, workflow  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+
+def warm_up_pool(size: int) -> None:
+    """Opens `size` pooled connections in parallel so the first requests don't pay for TLS/auth handshakes."""
+    if size <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=size) as pool:
+        connections = list(pool.map(lambda _: engine.connect(), range(size)))
+    for connection in connections:
+        connection.close() # Returns it to the pool, still open
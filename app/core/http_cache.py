@@ -0,0 +1,57 @@
+# app/core/http_cache.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple, Optional
+from fastapi import Request, Response
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime] = None
+
+def build_validators(*parts: Any, last_modified: Optional[datetime] = None) -> Validators:
+    """Folds cheap version stamps (counters, max timestamps) into a weak ETag."""
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return Validators(etag=f'W/"{digest}"', last_modified=last_modified)
+
+def _http_date(value: datetime) -> str:
+    # Our timestamps are naive UTC (datetime.utcnow), HTTP dates carry no sub-second precision
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function (RFC 9110, 13.1.2)
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+def not_modified(request: Request, response: Response, validators: Validators) -> Optional[Response]:
+    """
+    Stamps the validators onto the outgoing response and, when the client already holds
+    the current representation, returns a bare 304 so the caller can skip serialization.
+    """
+    headers = {"ETag": validators.etag, "Cache-Control": "private, no-cache"}
+    if validators.last_modified:
+        headers["Last-Modified"] = _http_date(validators.last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        is_fresh = _etag_matches(if_none_match, validators.etag)
+    else:
+        # If-Modified-Since is only consulted when no ETag was sent
+        if_modified_since = request.headers.get("if-modified-since")
+        is_fresh = bool(if_modified_since and validators.last_modified) and _not_modified_since(
+            if_modified_since, validators.last_modified
+        )
+
+    if is_fresh:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,185 @@
+# app/core/inbox_broker.py
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+from sqlalchemy import event, func, select as sa_select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INBOX_CHANNEL = "approveflow_inbox"
+
+class InboxSubscription:
+    """
+    One connected client (SSE stream or WebSocket).
+    The queue is bounded: a client that falls behind gets a single 'resync' event
+    instead of an ever-growing backlog, since every event only means "refetch".
+    """
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _offer(self, payload: Dict[str, Any]) -> None:
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            payload = {"type": "resync"}
+        self.queue.put_nowait(payload)
+
+    def push(self, payload: Dict[str, Any]) -> None:
+        """Thread-safe: called from request threads or the LISTEN thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._offer, payload)
+        except RuntimeError:
+            pass  # The client's loop is already gone
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class LocalInboxBroker:
+    """
+    In-process broker: events are fanned out to this worker's subscribers after commit.
+    Enough for tests and single-worker development.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscriptions: Dict[str, Set[InboxSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    # --- Subscriber side ---
+    def subscribe(self, user_id: UUID) -> InboxSubscription:
+        subscription = InboxSubscription(str(user_id), asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscriptions[subscription.user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: InboxSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.user_id]
+
+    def deliver(self, user_id: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.push(payload)
+
+    # --- Publisher side ---
+    def publish(self, db: Session, user_id: UUID, payload: Dict[str, Any]) -> None:
+        """Queues an event on the session; nothing leaves the process unless the transaction commits."""
+        db.info.setdefault("inbox_events", []).append((str(user_id), payload))
+
+    def before_commit(self, db: Session) -> None:
+        pass
+
+    def after_commit(self, db: Session) -> None:
+        for user_id, payload in db.info.pop("inbox_events", []):
+            self.deliver(user_id, payload)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+class PostgresInboxBroker(LocalInboxBroker):
+    """
+    Cross-worker broker on Postgres LISTEN/NOTIFY.
+    NOTIFY is issued inside the writer's transaction, so Postgres only delivers it on commit.
+    Each worker keeps one dedicated LISTEN connection and fans out to its local subscribers.
+    """
+
+    def __init__(self, engine, max_queue: int = 100):
+        super().__init__(max_queue)
+        self.engine = engine
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def before_commit(self, db: Session) -> None:
+        for user_id, payload in db.info.pop("inbox_events", []):
+            message = json.dumps({"user_id": user_id, **payload}, default=str)
+            db.execute(sa_select(func.pg_notify(INBOX_CHANNEL, message)))
+
+    def after_commit(self, db: Session) -> None:
+        pass  # Delivered by the listener thread, including back to this worker
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="inbox-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _listen_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Inbox listener lost its connection, reconnecting")
+                self._stop.wait(2)
+
+    def _listen(self) -> None:
+        pooled = self.engine.raw_connection()
+        connection = pooled.driver_connection # Read first: a detached fairy no longer exposes it
+        pooled.detach()  # Long-lived LISTEN connection must not go back to the pool
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {INBOX_CHANNEL}")
+
+            while not self._stop.is_set():
+                if select.select([connection], [], [], 5) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    payload = json.loads(notification.payload)
+                    self.deliver(payload.pop("user_id"), payload)
+        finally:
+            connection.close()
+
+def build_inbox_broker():
+    if settings.INBOX_BROKER == "memory":
+        return LocalInboxBroker(settings.INBOX_QUEUE_SIZE)
+    from app.core.database import engine
+    return PostgresInboxBroker(engine, settings.INBOX_QUEUE_SIZE)
+
+inbox_broker = build_inbox_broker()
+
+@event.listens_for(Session, "before_commit")
+def _inbox_before_commit(session: Session) -> None:
+    if session.info.get("inbox_events"):
+        inbox_broker.before_commit(session)
+
+@event.listens_for(Session, "after_commit")
+def _inbox_after_commit(session: Session) -> None:
+    if session.info.get("inbox_events"):
+        inbox_broker.after_commit(session)
+
+@event.listens_for(Session, "after_rollback")
+def _inbox_after_rollback(session: Session) -> None:
+    session.info.pop("inbox_events", None)
@@ -0,0 +1,301 @@
+# app/core/metrics.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+# --- Minimal Prometheus primitives (text exposition format 0.0.4) ---
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """Computes the samples at scrape time instead of tracking them continuously."""
+        self._callback = callback
+
+    def _samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                items = list(self._callback().items())
+            except Exception:
+                logger.exception("Gauge callback for %s failed", self.name)
+                items = []
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {} # per bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[idx] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for idx, bound in enumerate(self.buckets):
+                cumulative += series[idx]
+                bucket_labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series[-1]}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labels)
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labels, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "approveflow_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+REQUEST_SQL_STATEMENTS = registry.histogram(
+    "approveflow_http_request_sql_statements", "SQL statements issued per request.", ("route",), COUNT_BUCKETS
+)
+REQUEST_SEGMENT_SECONDS = registry.histogram(
+    "approveflow_http_request_segment_seconds", "Time per request spent in db, pdf and storage calls.", ("route", "segment")
+)
+SLOW_QUERIES = registry.counter(
+    "approveflow_sql_slow_queries_total", "Statements slower than SLOW_QUERY_MS.", ("route",)
+)
+
+# --- Per-request accounting ---
+class RequestStats:
+    __slots__ = ("route", "sql_count", "segments")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.sql_count = 0
+        self.segments: Dict[str, float] = {"db": 0.0}
+
+    def add(self, segment: str, seconds: float) -> None:
+        self.segments[segment] = self.segments.get(segment, 0.0) + seconds
+
+# Sync endpoints run in the threadpool with a copy of this context, so they mutate the same object
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("approveflow_request_stats", default=None)
+
+def current_route() -> str:
+    stats = _current_stats.get()
+    return stats.route if stats else "background"
+
+@contextmanager
+def timed_segment(segment: str) -> Iterator[None]:
+    """Attributes the wrapped block (e.g. PDF rendering, MinIO calls) to the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add(segment, time.perf_counter() - start)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("approveflow_query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("approveflow_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.add("db", elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = current_route()
+        SLOW_QUERIES.inc(route=route)
+        slow_query_logger.warning("Slow query (%.1f ms) from %s: %s", elapsed * 1000, route, statement)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start so the stack stays
+    # paired on this (pooled, long-lived) connection, but still charge the time to the request
+    connection = context.connection
+    starts = connection.info.get("approveflow_query_start") if connection is not None else None
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.add("db", elapsed)
+
+def resolve_route_template(scope: Scope) -> str:
+    """Maps a concrete path to its route template so metric labels stay low-cardinality."""
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+class MetricsMiddleware:
+    """Records latency, SQL count and segment timings per route; optionally emits Server-Timing."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(resolve_route_template(scope))
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    message.setdefault("headers", []).append(
+                        (b"server-timing", self._server_timing(stats, time.perf_counter() - start).encode("latin-1"))
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUEST_LATENCY.observe(elapsed, method=scope["method"], route=stats.route, status=str(status_code))
+            REQUEST_SQL_STATEMENTS.observe(stats.sql_count, route=stats.route)
+            for segment, seconds in stats.segments.items():
+                if seconds or segment == "db":
+                    REQUEST_SEGMENT_SECONDS.observe(seconds, route=stats.route, segment=segment)
+            _current_stats.reset(token)
+
+    @staticmethod
+    def _server_timing(stats: RequestStats, elapsed: float) -> str:
+        entries = [f'db;dur={stats.segments["db"] * 1000:.1f};desc="{stats.sql_count} queries"']
+        for segment, seconds in stats.segments.items():
+            if segment != "db" and seconds:
+                entries.append(f"{segment};dur={seconds * 1000:.1f}")
+        entries.append(f"app;dur={elapsed * 1000:.1f}")
+        return ", ".join(entries)
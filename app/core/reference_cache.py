@@ -0,0 +1,248 @@
+# app/core/reference_cache.py
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.versioning import REFERENCE_CHANNEL
+from app.repositories.hierarchy_repo import HierarchyRepository
+from app.repositories.version_repo import VersionRepository
+from app.repositories.workflow_repo import WorkflowRepository
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_LOOKUPS = registry.counter(
+    "approveflow_reference_cache_lookups_total", "Reference-data lookups by group and result.", ("group", "result")
+)
+REFERENCE_CACHE_INVALIDATIONS = registry.counter(
+    "approveflow_reference_cache_invalidations_total", "Reference-data groups dropped after a change.", ("group",)
+)
+
+@dataclass(frozen=True)
+class StageSpec:
+    """Detached, immutable copy of a WorkflowStage (same attribute names, so the engine reads either)."""
+    id: UUID
+    workflow_id: UUID
+    stage_order: int
+    required_role: str
+    conditions: Optional[Dict[str, Any]]
+    sla_hours: Optional[int]
+    sla_action: Optional[str]
+    join_policy: Optional[str]
+    quorum: Optional[int]
+
+@dataclass(frozen=True)
+class WorkflowBlueprint:
+    id: UUID
+    form_template_id: UUID
+    name: str
+    stages: Tuple[StageSpec, ...] # Ordered by stage_order
+
+    def stage_group(self, stage_id: UUID) -> List[StageSpec]:
+        """The parallel group (same stage_order) containing `stage_id`; empty if the stage is gone."""
+        stage = next((stage for stage in self.stages if stage.id == stage_id), None)
+        if stage is None:
+            return []
+        return sorted((s for s in self.stages if s.stage_order == stage.stage_order), key=lambda s: s.id)
+
+@dataclass(frozen=True)
+class PositionNode:
+    id: UUID
+    parent_position_id: Optional[UUID]
+    role_type: str
+    title: str
+
+@dataclass(frozen=True)
+class _Snapshot:
+    data: Dict[UUID, Any]
+    versions: Dict[str, int] # table_versions the data was loaded at
+
+def _load_workflows(db: Session) -> Dict[UUID, WorkflowBlueprint]:
+    blueprints = {}
+    for workflow, stages in WorkflowRepository(db).get_all_workflow_stages():
+        if workflow.form_template_id in blueprints:
+            continue # One workflow per template; like get_workflow_for_template, the first one wins
+        blueprints[workflow.form_template_id] = _blueprint(workflow, stages)
+    return blueprints
+
+def _load_org(db: Session) -> Dict[UUID, PositionNode]:
+    return {row[0]: PositionNode(*row) for row in HierarchyRepository(db).get_position_tree()}
+
+def _blueprint(workflow, stages) -> WorkflowBlueprint:
+    return WorkflowBlueprint(
+        id=workflow.id,
+        form_template_id=workflow.form_template_id,
+        name=workflow.name,
+        stages=tuple(
+            StageSpec(
+                id=stage.id, workflow_id=stage.workflow_id, stage_order=stage.stage_order,
+                required_role=stage.required_role, conditions=stage.conditions, sla_hours=stage.sla_hours,
+                sla_action=stage.sla_action, join_policy=stage.join_policy, quorum=stage.quorum
+            ) for stage in stages
+        )
+    )
+
+# group -> (tables whose version bump invalidates it, loader)
+GROUPS: Dict[str, Tuple[Tuple[str, ...], Callable[[Session], Dict[UUID, Any]]]] = {
+    "workflows": (("workflows", "workflow_stages"), _load_workflows),
+    "org": (("positions",), _load_org),
+}
+
+class ReferenceDataCache:
+    """
+    Process-wide copies of workflow blueprints and the position tree, the reference data
+    every submission and approval routes through.
+
+    Each group is loaded whole (they are small) as immutable objects, so readers never lock and
+    snapshots loaded in a pre-fork master stay shared copy-on-write. A group is dropped when a
+    NOTIFY on REFERENCE_CHANNEL names one of its tables (sent by the table_versions flush hook on
+    commit), or when its table_versions moved while the listener was not connected. A load that
+    races an invalidation is used once but not stored (generation check).
+
+    Disabled, every lookup goes to the repositories as before.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._generations: Dict[str, int] = {group: 0 for group in GROUPS}
+
+    # --- Lookups ---
+    def workflow_blueprint(self, db: Session, template_id: UUID) -> Optional[WorkflowBlueprint]:
+        if not self.enabled:
+            repo = WorkflowRepository(db)
+            workflow = repo.get_workflow_for_template(template_id)
+            return _blueprint(workflow, repo.get_workflow_stages(workflow.id)) if workflow else None
+        return self._group(db, "workflows").get(template_id)
+
+    def ancestor_positions(self, db: Session, position_id: UUID) -> list:
+        """The position and its ancestors, bottom to top (the hierarchy CTE, answered from memory)."""
+        if not self.enabled:
+            return HierarchyRepository(db).get_ancestor_positions(position_id)
+        tree = self._group(db, "org")
+        chain, node = [], tree.get(position_id)
+        while node is not None and len(chain) <= len(tree): # Bounded even if the data has a cycle
+            chain.append(node)
+            node = tree.get(node.parent_position_id)
+        return chain
+
+    # --- Loading ---
+    def warm(self, db: Session) -> None:
+        if self.enabled:
+            for group in GROUPS:
+                self._group(db, group)
+
+    def _group(self, db: Session, group: str) -> Dict[UUID, Any]:
+        snapshot = self._snapshots.get(group)
+        if snapshot is not None:
+            REFERENCE_CACHE_LOOKUPS.inc(group=group, result="hit")
+            return snapshot.data
+        REFERENCE_CACHE_LOOKUPS.inc(group=group, result="miss")
+        tables, loader = GROUPS[group]
+        with self._lock:
+            generation = self._generations[group]
+        # Versions first: a change committed during the load leaves an older version behind, never a newer one
+        versions = VersionRepository(db).get_versions(*tables)
+        data = loader(db)
+        with self._lock:
+            if self._generations[group] == generation:
+                self._snapshots[group] = _Snapshot(data, versions)
+        return data
+
+    # --- Invalidation ---
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        touched = set(tables)
+        with self._lock:
+            for group, (group_tables, _) in GROUPS.items():
+                if touched & set(group_tables):
+                    self._generations[group] += 1
+                    if self._snapshots.pop(group, None) is not None:
+                        REFERENCE_CACHE_INVALIDATIONS.inc(group=group)
+
+    def revalidate(self, db: Session) -> None:
+        """Drops groups whose tables were written since they were loaded (e.g. while LISTEN was down)."""
+        snapshots = dict(self._snapshots)
+        if not snapshots:
+            return
+        tables = sorted({table for snapshot in snapshots.values() for table in snapshot.versions})
+        current = VersionRepository(db).get_versions(*tables)
+        self.invalidate_tables(
+            table for snapshot in snapshots.values()
+            for table, version in snapshot.versions.items() if current[table] != version
+        )
+
+class ReferenceInvalidationListener:
+    """
+    One LISTEN connection per worker (like PostgresInboxBroker). Revalidates on every (re)connect,
+    since notifications sent while disconnected are lost, and every `revalidate_seconds` as a backstop.
+    """
+
+    def __init__(self, engine, session_factory, cache: ReferenceDataCache, revalidate_seconds: float = 60.0):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.cache = cache
+        self.revalidate_seconds = revalidate_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="reference-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _listen_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Reference cache listener lost its connection, reconnecting")
+                self._stop.wait(2)
+
+    def _revalidate(self) -> None:
+        db = self.session_factory()
+        try:
+            self.cache.revalidate(db)
+        finally:
+            db.close()
+
+    def _listen(self) -> None:
+        pooled = self.engine.raw_connection()
+        connection = pooled.driver_connection # Read first: a detached fairy no longer exposes it
+        pooled.detach()  # Long-lived LISTEN connection must not go back to the pool
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {REFERENCE_CHANNEL}")
+            self._revalidate()
+            revalidated_at = time.monotonic()
+            while not self._stop.is_set():
+                if select.select([connection], [], [], 5) != ([], [], []):
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self.cache.invalidate_tables(notification.payload.split(","))
+                if time.monotonic() - revalidated_at >= self.revalidate_seconds:
+                    self._revalidate()
+                    revalidated_at = time.monotonic()
+        finally:
+            connection.close()
+
+reference_cache = ReferenceDataCache(settings.REFERENCE_CACHE_ENABLED)
+
+def build_reference_listener() -> ReferenceInvalidationListener:
+    from app.core.database import SessionLocal, engine
+    return ReferenceInvalidationListener(engine, SessionLocal, reference_cache, settings.REFERENCE_CACHE_REVALIDATE_SECONDS)
@@ -0,0 +1,216 @@
+# app/core/replica.py
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, SessionLocal, engine, read_engine
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG = registry.gauge(
+    "approveflow_db_replica_lag_seconds", "Replay lag of the read replica (-1 = unreachable)."
+)
+READ_ROUTING = registry.counter(
+    "approveflow_db_read_routing_total", "Read-only sessions by target and reason.", ("target", "reason")
+)
+
+READ_AFTER_COOKIE = "approveflow_read_after"
+READ_AFTER_HEADER = "X-Read-After"
+
+CURRENT_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+
+# Lag is zero when the replica has replayed everything it received, even if the primary has been idle.
+# The replayed LSN is what read-your-writes tokens are compared against (NULL when not a standby).
+HEALTH_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END,
+    pg_last_wal_replay_lsn()::text
+""")
+
+class ConsistencyState:
+    """Per-request read-your-writes state, shared with the threadpool that runs sync handlers."""
+    __slots__ = ("read_after_lsn", "committed_lsn")
+
+    def __init__(self, read_after_lsn: Optional[int] = None):
+        self.read_after_lsn = read_after_lsn # From the client's token: reads must see this position
+        self.committed_lsn: Optional[int] = None # WAL position after this request's last commit
+
+_consistency: ContextVar[Optional[ConsistencyState]] = ContextVar("approveflow_consistency", default=None)
+
+def parse_lsn(value: str) -> int:
+    """'16/B374D848' -> a comparable integer."""
+    high, low = value.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+def _signature(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+def issue_read_after_token(lsn: int, ttl_seconds: float) -> str:
+    payload = f"{format_lsn(lsn)}.{int(time.time() + ttl_seconds)}"
+    return f"{payload}.{_signature(payload)}"
+
+def verify_read_after_token(token: Optional[str]) -> Optional[int]:
+    """The LSN in a valid, unexpired token; None for anything else (unsigned, tampered, expired)."""
+    if not token:
+        return None
+    try:
+        lsn, expires, signature = token.rsplit(".", 2)
+        if not hmac.compare_digest(signature, _signature(f"{lsn}.{expires}")) or int(expires) < time.time():
+            return None
+        return parse_lsn(lsn)
+    except ValueError:
+        return None
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only sessions.
+    Reads go to the replica unless the client carries a write position (see ReadYourWritesMiddleware)
+    the replica has not replayed yet, or the replica is unreachable or lagging beyond the configured limit.
+    """
+
+    def __init__(self, max_lag_seconds: float, lag_check_seconds: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.enabled = read_engine is not engine
+        self._lock = threading.Lock()
+        # (checked_at, lag seconds or None, replayed LSN or None)
+        self._health: Tuple[float, Optional[float], Optional[int]] = (0.0, None, None)
+
+    # --- replica health ---
+    def _probe(self) -> Tuple[Optional[float], Optional[int]]:
+        """Cached (replay lag, replayed LSN); lag is None when the replica can't be reached."""
+        if not self.enabled:
+            return 0.0, None
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag, replayed = self._health
+            if now - checked_at < self.lag_check_seconds:
+                return lag, replayed
+            # Claim the probe so concurrent requests keep using the cached value meanwhile
+            self._health = (now, lag, replayed)
+        try:
+            with read_engine.connect() as connection:
+                row = connection.execute(HEALTH_QUERY).one()
+            lag, replayed = float(row[0]), parse_lsn(row[1]) if row[1] else None
+        except Exception:
+            logger.warning("Read replica unreachable, routing reads to the primary", exc_info=True)
+            lag, replayed = None, None
+        with self._lock:
+            self._health = (time.monotonic(), lag, replayed)
+        return lag, replayed
+
+    def lag_seconds(self) -> Optional[float]:
+        return self._probe()[0]
+
+    def session_for(self, read_after_lsn: Optional[int]) -> Session:
+        if not self.enabled:
+            return SessionLocal()
+        lag, replayed = self._probe()
+        if lag is None:
+            READ_ROUTING.inc(target="primary", reason="replica_down")
+            return SessionLocal()
+        # replayed is None when the "replica" is not in recovery (a plain second database)
+        if read_after_lsn is not None and replayed is not None and replayed < read_after_lsn:
+            READ_ROUTING.inc(target="primary", reason="read_your_writes")
+            return SessionLocal()
+        if lag > self.max_lag_seconds:
+            READ_ROUTING.inc(target="primary", reason="replica_lag")
+            return SessionLocal()
+        READ_ROUTING.inc(target="replica", reason="ok")
+        return ReadSessionLocal()
+
+    def read_session(self) -> Session:
+        """Read-only session for the current request, honouring the client's write position."""
+        state = _consistency.get()
+        return self.session_for(state.read_after_lsn if state else None)
+
+replica_router = ReplicaRouter(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_seconds=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+def _lag_samples() -> Dict[Tuple[str, ...], float]:
+    lag = replica_router.lag_seconds()
+    return {(): -1.0 if lag is None else lag}
+
+if replica_router.enabled:
+    REPLICA_LAG.set_function(_lag_samples)
+
+# Only sessions that flushed something need a write position
+@event.listens_for(Session, "after_flush")
+def _mark_session_written(session, flush_context):
+    session.info["has_writes"] = True
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session):
+    if not session.info.pop("has_writes", False):
+        return
+    state = _consistency.get()
+    if state is None or not replica_router.enabled:
+        return # Background jobs and replica-less deployments have no client to hand a position to
+    try:
+        # Read after the commit returned, so the position covers the commit record itself
+        with engine.connect() as connection:
+            state.committed_lsn = parse_lsn(connection.execute(CURRENT_LSN_QUERY).scalar())
+    except Exception:
+        logger.warning("Could not read the WAL position after a commit", exc_info=True)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop("has_writes", None)
+
+class ReadYourWritesMiddleware:
+    """
+    Carries each client's write position between requests (and workers/nodes), instead of
+    remembering it in process memory.
+
+    After a request commits a write, the response gets a signed token holding the primary's WAL
+    LSN, both as an HttpOnly cookie and as the X-Read-After header (for clients that don't send
+    cookies). A later request presenting it is routed to the primary until the replica has
+    replayed that LSN. Tokens expire after `ttl_seconds`; past that, the lag limit still applies.
+    """
+
+    def __init__(self, app: ASGIApp, ttl_seconds: float):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        state = ConsistencyState(verify_read_after_token(
+            request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE)
+        ))
+        token = _consistency.set(state)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.committed_lsn is not None:
+                read_after = issue_read_after_token(state.committed_lsn, self.ttl_seconds)
+                cookie = f"{READ_AFTER_COOKIE}={read_after}; Max-Age={int(self.ttl_seconds)}; Path=/; HttpOnly; SameSite=Lax"
+                headers = message.setdefault("headers", [])
+                headers.append((READ_AFTER_HEADER.encode("latin-1"), read_after.encode("latin-1")))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _consistency.reset(token)
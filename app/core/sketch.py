@@ -0,0 +1,105 @@
+# app/core/sketch.py
+import math
+from typing import Dict, Iterable, Optional
+
+class LogHistogram:
+    """
+    Mergeable quantile sketch with bounded relative error (the DDSketch bucketing scheme).
+
+    Positive values land in bucket ceil(log_gamma(x)), where gamma = (1 + a) / (1 - a). Any
+    quantile comes back within relative accuracy `a` of a real sample, whatever the
+    distribution. Two sketches merge by adding bucket counts, so per-day rollups combine
+    into any date range exactly as if the raw values had been sketched together.
+    Values at or below `min_value` (e.g. sub-second durations) share a zero bucket.
+
+    Serialized form (JSONB): {"a": accuracy, "n": count, "sum": ..., "min": ..., "max": ...,
+    "z": zero_count, "b": {"<index>": count}}.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1.0):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= self.min_value:
+            self.zero_count += weight
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def add_all(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        if other.relative_accuracy != self.relative_accuracy or other.min_value != self.min_value:
+            raise ValueError("Only sketches with the same accuracy and zero threshold can be merged")
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return min(self.min_value, self.max)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint (in relative terms) of (gamma^(i-1), gamma^i], clamped to what was actually seen
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        return {
+            "a": self.relative_accuracy,
+            "m": self.min_value,
+            "n": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "z": self.zero_count,
+            "b": {str(index): bucket_count for index, bucket_count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogHistogram":
+        sketch = cls(relative_accuracy=data["a"], min_value=data.get("m", 1.0))
+        sketch.count = data["n"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.zero_count = data["z"]
+        sketch.buckets = {int(index): bucket_count for index, bucket_count in data["b"].items()}
+        return sketch
@@ -0,0 +1,224 @@
+# app/core/tracing.py
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import resolve_route_template
+
+logger = logging.getLogger("app.tracing")
+
+class SpanContext:
+    """W3C trace context (the format OpenTelemetry propagates in `traceparent`)."""
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, header: Optional[str]) -> Optional["SpanContext"]:
+        if not header:
+            return None
+        parts = header.strip().split("-")
+        if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        try:
+            flags = int(parts[3][:2], 16)
+            int(parts[1], 16), int(parts[2], 16)
+        except ValueError:
+            return None
+        if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+            return None
+        return cls(parts[1], parts[2], bool(flags & 0x01))
+
+_current: ContextVar[Optional[SpanContext]] = ContextVar("approveflow_span_context", default=None)
+
+# --- Exporters ---
+class ConsoleExporter:
+    def export(self, record: Dict[str, Any]) -> None:
+        logger.info(json.dumps(record, default=str))
+
+class FileExporter:
+    """Appends one JSON object per finished span, for offline analysis."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+
+# --- Spans ---
+class _NoopSpan:
+    """Returned whenever nothing is recorded; entering it costs a method call."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class _UnsampledSpan(_NoopSpan):
+    """Keeps the (unsampled) trace context current so children don't start new sampled roots."""
+    __slots__ = ("context", "_token")
+
+    def __init__(self, context: SpanContext):
+        self.context = context
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self.context)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+class Span:
+    __slots__ = ("tracer", "name", "context", "parent_span_id", "attributes", "start_ns", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.start_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self.context)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.time_ns()
+        _current.reset(self._token)
+        status = {"code": "OK"}
+        if exc_type is not None:
+            status = {"code": "ERROR", "message": f"{exc_type.__name__}: {exc}"}
+        self.tracer.exporter.export({
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": end_ns,
+            "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": status,
+            "service": settings.PROJECT_NAME,
+        })
+        return False
+
+class Tracer:
+    def __init__(self, enabled: bool, sample_ratio: float, exporter):
+        self.enabled = enabled
+        self.sample_ratio = sample_ratio
+        self.exporter = exporter
+        # Same rule as OpenTelemetry's TraceIdRatioBased sampler: compare the low 64 bits of the trace id
+        self._sample_bound = int(max(0.0, min(1.0, sample_ratio)) * (2 ** 64 - 1))
+
+    def _new_id(self, bits: int) -> str:
+        return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+    def start_span(self, name: str, parent: Optional[SpanContext] = None, **attributes: Any):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = parent or _current.get()
+        if parent is None:
+            trace_id = self._new_id(128)
+            sampled = int(trace_id[16:], 16) <= self._sample_bound
+        else:
+            trace_id, sampled = parent.trace_id, parent.sampled
+
+        context = SpanContext(trace_id, self._new_id(64), sampled)
+        if not sampled:
+            return _UnsampledSpan(context)
+        return Span(self, name, context, parent.span_id if parent else None, attributes)
+
+def _build_exporter():
+    if settings.TRACING_EXPORTER == "file":
+        return FileExporter(settings.TRACING_FILE_PATH)
+    return ConsoleExporter()
+
+tracer = Tracer(settings.TRACING_ENABLED, settings.TRACING_SAMPLE_RATIO, _build_exporter())
+
+def span(name: str, **attributes: Any):
+    """`with span("document.render_pdf", submission_id=...):` — a no-op when tracing is disabled."""
+    return tracer.start_span(name, **attributes)
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator form of `span`; the span name defaults to the function's qualified name."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.start_span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def trace_repository(cls):
+    """Class decorator: one span per public repository method call ("WorkflowRepository.get_stage")."""
+    for attr_name, attr in list(vars(cls).items()):
+        if callable(attr) and not attr_name.startswith("_"):
+            setattr(cls, attr_name, traced(f"{cls.__name__}.{attr_name}")(attr))
+    return cls
+
+def inject_trace_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Adds `traceparent` for outbound HTTP calls so downstream services join the trace."""
+    context = _current.get()
+    if context is not None:
+        headers["traceparent"] = context.to_traceparent()
+    return headers
+
+class TracingMiddleware:
+    """Opens a server span per request, continuing any incoming W3C `traceparent`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route = resolve_route_template(scope)
+        remote = SpanContext.from_traceparent(Headers(scope=scope).get("traceparent"))
+        with tracer.start_span(f"{scope['method']} {route}", parent=remote, **{
+            "http.method": scope["method"], "http.route": route
+        }) as server_span:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
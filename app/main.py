@@ -1,21 +1,175 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+# Every model module first, so the mappers can resolve each other whatever a later import configures
+# (this also registers the inbox_counters and table_versions flush hooks)
+from app.models import analytics, archive, audit, inbox_counter, organization, outbox, versioning, workflow  # noqa: F401
+from app.core.admission import AdmissionControlMiddleware, AdmissionPool, TokenBucketLimiter, TrustedProxies
+from app.core.background import PeriodicWorker
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import SessionLocal, create_tables, engine, read_engine, warm_up_pool
+from app.core.inbox_broker import inbox_broker
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.reference_cache import build_reference_listener, reference_cache
+from app.core.replica import READ_AFTER_HEADER, ReadYourWritesMiddleware, replica_router
+from app.core.tracing import TracingMiddleware
+from app.services.archiver import SubmissionArchiver
+from app.services.attachment_service import AttachmentSweeper
+from app.services.document_service import warm_up_storage
+from app.services.cycle_time import CycleTimeAggregator
+from app.services.inbox_reconciler import InboxCounterReconciler
+from app.services.integrity_service import IntegrityScanner
+from app.services.outbox_relay import build_outbox_relay
+from app.services.sla_scheduler import SlaScheduler
+from app.services.storage_gc import StorageGarbageCollector
 from app.api.v1 import auth, admin, submissions
 
-# Initialize Database Schema (In a real production environment, use Alembic migrations instead)
-Base.metadata.create_all(bind=engine)
+def build_background_workers() -> list:
+    workers = []
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay = build_outbox_relay()
+        workers.append(PeriodicWorker("outbox-relay", outbox_relay.relay_once, settings.OUTBOX_POLL_SECONDS))
+    if settings.SLA_SCHEDULER_ENABLED:
+        sla_scheduler = SlaScheduler(
+            SessionLocal,
+            horizon_seconds=settings.SLA_HORIZON_SECONDS,
+            max_loaded=settings.SLA_MAX_LOADED
+        )
+        workers.append(PeriodicWorker("sla-scheduler", sla_scheduler.tick, settings.SLA_TICK_SECONDS))
+    if settings.STORAGE_GC_ENABLED:
+        storage_gc = StorageGarbageCollector(SessionLocal, grace_seconds=settings.STORAGE_GC_GRACE_SECONDS)
+        workers.append(PeriodicWorker("storage-gc", storage_gc.collect_once, settings.STORAGE_GC_INTERVAL_SECONDS))
+    if settings.INTEGRITY_SCAN_ENABLED:
+        integrity_scanner = IntegrityScanner(
+            SessionLocal,
+            workers=settings.INTEGRITY_SCAN_WORKERS,
+            reverify_after_seconds=settings.INTEGRITY_REVERIFY_SECONDS
+        )
+        workers.append(PeriodicWorker("integrity-scan", integrity_scanner.scan, settings.INTEGRITY_SCAN_INTERVAL_SECONDS))
+    if settings.CYCLE_ROLLUP_ENABLED:
+        cycle_aggregator = CycleTimeAggregator(SessionLocal)
+        workers.append(PeriodicWorker("cycle-rollup", cycle_aggregator.run_once, settings.CYCLE_ROLLUP_INTERVAL_SECONDS))
+    if settings.ARCHIVE_ENABLED:
+        archiver = SubmissionArchiver(SessionLocal, older_than_days=settings.ARCHIVE_AFTER_DAYS)
+        workers.append(PeriodicWorker("submission-archiver", archiver.archive_once, settings.ARCHIVE_INTERVAL_SECONDS))
+    if settings.INBOX_COUNTER_RECONCILE_ENABLED:
+        inbox_reconciler = InboxCounterReconciler(SessionLocal)
+        workers.append(PeriodicWorker("inbox-counter-reconcile", inbox_reconciler.reconcile_once, settings.INBOX_COUNTER_RECONCILE_SECONDS))
+    if settings.ATTACHMENT_SWEEP_ENABLED:
+        attachment_sweeper = AttachmentSweeper(SessionLocal, upload_expiry_seconds=settings.ATTACHMENT_UPLOAD_EXPIRY_SECONDS)
+        workers.append(PeriodicWorker("attachment-sweep", attachment_sweeper.sweep_once, settings.ATTACHMENT_SWEEP_INTERVAL_SECONDS))
+    return workers
+
+def admission_route_classes() -> dict:
+    """Routes that don't fit the default (GET/HEAD -> light, anything else -> db)."""
+    api = settings.API_V1_STR
+    return {
+        # bcrypt
+        ("POST", f"{api}/auth/login"): "cpu",
+        # The final approval renders and uploads the PDF inline
+        ("POST", f"{api}/submissions/approvals/{{approval_id}}/action"): "cpu",
+        # Evaluates every stage condition over the template's whole history
+        ("POST", f"{api}/admin/workflows/{{workflow_id}}/simulate"): "cpu",
+        # Streams and re-hashes the stored PDF
+        ("POST", f"{api}/submissions/{{submission_id}}/verify"): "cpu",
+        # Heavy reads: feeds, searches and aggregates
+        ("GET", f"{api}/admin/audit-logs"): "db",
+        ("GET", f"{api}/admin/audit-logs/search"): "db",
+        ("GET", f"{api}/admin/stats"): "db",
+        ("GET", f"{api}/admin/analytics/cycle-times"): "db",
+        ("GET", f"{api}/admin/users"): "db",
+    }
+
+def prepare_database() -> None:
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        create_tables()
+    if settings.STARTUP_WARM_UP:
+        warm_up_pool(settings.DB_POOL_SIZE)
+
+def prefork_warm_up() -> None:
+    """
+    Runs once in the gunicorn master (see gunicorn.conf.py) before the workers fork, so they
+    inherit this work copy-on-write instead of each repeating it: the lazily imported PDF, crypto
+    and numeric libraries, the schema check and the reference cache.
+    """
+    import numpy  # noqa: F401 (workflow simulator)
+    from jose import jwt  # noqa: F401
+    from xhtml2pdf import pisa  # noqa: F401
+    from app.core.security import get_pwd_context
+    from app.services.document_service import get_template_env
+    get_pwd_context()
+    get_template_env().get_template("document_template.html")
+
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        create_tables()
+        settings.DB_CREATE_TABLES_ON_STARTUP = False # Inherited by the workers: the schema is in place
+    db = SessionLocal()
+    try:
+        reference_cache.warm(db)
+    finally:
+        db.close()
+    # No pooled connection may cross the fork; each worker opens its own
+    engine.dispose()
+    read_engine.dispose()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here rather than at import time, so `import app.main` stays cheap.
+    # The database and object storage are warmed up concurrently.
+    startup_tasks = [asyncio.to_thread(prepare_database)]
+    if settings.STARTUP_WARM_UP:
+        startup_tasks.append(asyncio.to_thread(warm_up_storage))
+    await asyncio.gather(*startup_tasks)
+
+    background_workers = build_background_workers()
+    reference_listener = build_reference_listener() if reference_cache.enabled else None
+    inbox_broker.start()
+    if reference_listener:
+        reference_listener.start()
+    for worker in background_workers:
+        worker.start()
+    try:
+        yield
+    finally:
+        for worker in background_workers:
+            worker.stop()
+        if reference_listener:
+            reference_listener.stop()
+        inbox_broker.stop()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Dynamic Hierarchical Approval & Intelligent Workflow Automation System API",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # orjson natively handles UUIDs/datetimes and is several times faster than stdlib json
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Added before CORS so that it sits inside it: 429/503 rejections still carry CORS headers
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        pools={
+            "cpu": AdmissionPool("cpu", settings.ADMISSION_CPU_CONCURRENCY, settings.ADMISSION_CPU_QUEUE, initial_service_seconds=0.5),
+            "db": AdmissionPool("db", settings.ADMISSION_DB_CONCURRENCY, settings.ADMISSION_DB_QUEUE),
+            "light": AdmissionPool("light", settings.ADMISSION_LIGHT_CONCURRENCY, settings.ADMISSION_LIGHT_QUEUE),
+        },
+        route_classes=admission_route_classes(),
+        # Long-lived streams would pin a slot; health and scrapes must answer even when saturated
+        exempt_routes=("/health", "/metrics", f"{settings.API_V1_STR}/submissions/inbox/stream"),
+        max_queue_wait=settings.ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+        limiter=TokenBucketLimiter(settings.ADMISSION_CLIENT_RATE, settings.ADMISSION_CLIENT_BURST),
+        class_costs={"cpu": 5.0, "db": 2.0, "light": 1.0},
+        trusted_proxies=TrustedProxies(settings.FORWARDED_ALLOW_IPS),
+    )
+
 # Set all CORS enabled origins
 # The frontend URL (e.g., Vercel deployment or localhost:3000) must be allowed here
 origins = [
@@ -30,6 +184,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[READ_AFTER_HEADER],
+)
+
+if replica_router.enabled:
+    # Hands writers a signed WAL position and routes their next reads accordingly (app.core.replica)
+    app.add_middleware(ReadYourWritesMiddleware, ttl_seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# Added last so it wraps every response, including CORS preflights and errors
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
 # Include API Routers
@@ -40,4 +213,11 @@ app.include_router(submissions.router, prefix=f"{settings.API_V1_STR}/submission
 @app.get("/health")
 def health_check():
     """Simple health check endpoint for monitoring."""
-    return {"status": "healthy", "service": settings.PROJECT_NAME}
\ No newline at end of file
+    return {"status": "healthy", "service": settings.PROJECT_NAME}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
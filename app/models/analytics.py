@@ -0,0 +1,26 @@
+# app/models/analytics.py
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, Integer, String, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+class ApprovalCycleRollup(Base):
+    """
+    Per-day decision-time distribution for one stage, approver or template.
+    `sketch` is a serialized LogHistogram of seconds from stage entry to decision;
+    sketches for any date range merge into one, so percentile queries never touch raw rows.
+    """
+    __tablename__ = "approval_cycle_rollups"
+
+    day = Column(Date, primary_key=True) # UTC day of the decision
+    dimension = Column(String(16), primary_key=True) # stage, approver, template
+    key_id = Column(UUID(as_uuid=True), primary_key=True) # stage_id / approver user id / form_template_id
+    outcome = Column(String(16), primary_key=True) # APPROVED, REJECTED
+    decisions = Column(Integer, nullable=False, default=0)
+    sketch = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Range queries pick a dimension (and optionally one key) first
+        Index("ix_approval_cycle_rollups_dimension_day", "dimension", "day"),
+    )
@@ -0,0 +1,50 @@
+# app/models/archive.py
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Index, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+class ArchivedSubmission(Base):
+    """
+    A finished (COMPLETED/REJECTED) submission moved out of form_submissions by the archiver.
+    Same columns as the hot row, so readers can serve either one through the same schema.
+    No foreign keys: history outlives the rows it once pointed at.
+    """
+    __tablename__ = "form_submissions_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    form_template_id = Column(UUID(as_uuid=True))
+    submitter_id = Column(UUID(as_uuid=True))
+    form_data = Column(JSONB, nullable=False)
+    status = Column(String, nullable=False)
+    current_stage_id = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 'My Requests' fallback
+        Index("ix_form_submissions_archive_submitter_created", "submitter_id", "created_at"),
+        Index("ix_form_submissions_archive_template_created", "form_template_id", "created_at"),
+    )
+
+class ArchivedApprovalRequest(Base):
+    __tablename__ = "approval_requests_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    submission_id = Column(UUID(as_uuid=True), nullable=False)
+    stage_id = Column(UUID(as_uuid=True))
+    assigned_user_id = Column(UUID(as_uuid=True))
+    status = Column(String, nullable=False)
+    action_timestamp = Column(DateTime, nullable=True)
+    comments = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    stage_entered_at = Column(DateTime, nullable=True)
+    due_at = Column(DateTime, nullable=True)
+    escalation_level = Column(Integer, default=0)
+    reminder_count = Column(Integer, default=0)
+    rolled_up = Column(Boolean, nullable=False, default=True) # Only counted requests are archived
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_approval_requests_archive_submission_id", "submission_id"),
+    )
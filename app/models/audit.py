@@ -1,9 +1,9 @@
 # app/models/audit.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, String, ForeignKey, DateTime, Index, Integer, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
 
 class AuditLog(Base):
@@ -16,11 +16,86 @@ class AuditLog(Base):
     actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     snapshot = Column(JSONB, nullable=True) # Immutable record at the time
+    # Maintained by Postgres on insert: approver comments rank above the rest of the snapshot's string values
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(snapshot->>'comments', '')), 'A') || "
+        "setweight(to_tsvector('english', action || ' ' || entity_type), 'B') || "
+        "setweight(jsonb_to_tsvector('english', coalesce(snapshot, '{}'::jsonb), '[\"string\", \"numeric\"]'), 'C')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        # Timeline lookups and their ETag stamps (count/max per submission)
+        Index("ix_audit_logs_entity_timestamp", "entity_id", "timestamp"),
+        # Admin feed ordering and its max(timestamp) stamp
+        Index("ix_audit_logs_timestamp", "timestamp"),
+        # Full-text search over snapshots and comments
+        Index("ix_audit_logs_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    submission_id = Column(UUID(as_uuid=True), ForeignKey("form_submissions.id"))
+    # No FK: the submission may live in form_submissions or form_submissions_archive
+    submission_id = Column(UUID(as_uuid=True))
     minio_object_key = Column(String, nullable=False)
-    document_hash = Column(String, nullable=False)
\ No newline at end of file
+    document_hash = Column(String, ForeignKey("stored_objects.content_hash"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_documents_submission_id", "submission_id"),
+    )
+
+class StoredObject(Base):
+    """
+    One row per unique blob in object storage, keyed by its SHA-256.
+    `ref_count` is the number of documents pointing at it; at zero the object becomes
+    eligible for garbage collection once `orphaned_at` is older than the grace period.
+    """
+    __tablename__ = "stored_objects"
+
+    content_hash = Column(String(64), primary_key=True)
+    object_key = Column(String, nullable=False) # sha256/ab/cd/<hash>.pdf
+    size_bytes = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=False, default="application/pdf")
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    orphaned_at = Column(DateTime, nullable=True)
+    # Integrity bookkeeping: last time the stored bytes were re-hashed, and the outcome
+    verified_at = Column(DateTime, nullable=True)
+    verification_status = Column(String(16), nullable=True) # OK, MISMATCH, MISSING
+
+    __table_args__ = (
+        # The GC only ever scans unreferenced rows
+        Index("ix_stored_objects_orphaned_at", "orphaned_at", postgresql_where=text("ref_count = 0")),
+        # Incremental scans walk it in order: never verified (NULL) first, then least recently verified
+        Index("ix_stored_objects_verification", "verified_at", "content_hash"),
+    )
+class Attachment(Base):
+    """
+    A file the submitter uploaded straight to object storage with a presigned URL.
+    The API only ever sees metadata: the row is created PENDING when the upload is
+    authorized and becomes UPLOADED (or REJECTED) once the stored object has been checked.
+    """
+    __tablename__ = "attachments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    submission_id = Column(UUID(as_uuid=True), nullable=False) # No FK: archived submissions keep their files
+    uploader_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    declared_size = Column(BigInteger, nullable=False) # What the client announced; the upload policy caps it
+    object_key = Column(String, nullable=False) # attachments/<submission_id>/<attachment_id>
+    status = Column(String(16), nullable=False, default="PENDING") # PENDING, UPLOADED, REJECTED
+    size_bytes = Column(BigInteger, nullable=True) # Filled in on confirmation from the stored object
+    content_hash = Column(String(64), nullable=True) # SHA-256 of the stored bytes, printed on the final PDF
+    rejection_reason = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    confirmed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_attachments_submission_id", "submission_id", "created_at"),
+        # The confirmation sweep only looks at uploads still waiting
+        Index("ix_attachments_pending", "created_at", postgresql_where=text("status = 'PENDING'")),
+    )
@@ -0,0 +1,116 @@
+# app/models/inbox_counter.py
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, event, inspect
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.workflow import ApprovalRequest, FormSubmission
+
+class InboxCounter(Base):
+    """
+    Badge counts per user, kept in step with approval_requests / form_submissions by the
+    session hooks below (same transaction as the status change), so reading them is a primary-key
+    lookup. InboxCounterReconciler periodically recounts and corrects any drift.
+    """
+    __tablename__ = "inbox_counters"
+
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    pending_approvals = Column(Integer, nullable=False, default=0) # Approval requests assigned to the user, PENDING
+    pending_requests = Column(Integer, nullable=False, default=0) # The user's own submissions, PENDING
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# model -> (counter column, owner attribute)
+COUNTED = {
+    ApprovalRequest: ("pending_approvals", "assigned_user_id"),
+    FormSubmission: ("pending_requests", "submitter_id"),
+}
+
+def _old_and_new(obj, attr: str) -> Tuple[Optional[object], Optional[object]]:
+    """The attribute's value before and after this flush."""
+    history = inspect(obj).attrs[attr].history
+    if history.added or history.deleted:
+        return (history.deleted[0] if history.deleted else None), (history.added[0] if history.added else None)
+    value = history.unchanged[0] if history.unchanged else getattr(obj, attr)
+    return value, value
+
+def _collect_deltas(session: Session) -> Dict[UUID, Dict[str, int]]:
+    deltas: Dict[UUID, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def apply(column: str, owner: Optional[UUID], status: Optional[str], sign: int) -> None:
+        if owner is not None and status == "PENDING":
+            deltas[owner][column] += sign
+
+    for obj in session.new:
+        if type(obj) in COUNTED:
+            column, owner_attr = COUNTED[type(obj)]
+            apply(column, getattr(obj, owner_attr), obj.status, +1)
+    for obj in session.dirty:
+        if type(obj) in COUNTED:
+            column, owner_attr = COUNTED[type(obj)]
+            old_owner, new_owner = _old_and_new(obj, owner_attr)
+            old_status, new_status = _old_and_new(obj, "status")
+            if (old_owner, old_status) != (new_owner, new_status):
+                apply(column, old_owner, old_status, -1)
+                apply(column, new_owner, new_status, +1)
+    for obj in session.deleted:
+        if type(obj) in COUNTED:
+            column, owner_attr = COUNTED[type(obj)]
+            apply(column, _old_and_new(obj, owner_attr)[0], _old_and_new(obj, "status")[0], -1)
+
+    return {
+        user_id: dict(changes) for user_id, changes in deltas.items()
+        if any(changes.values())
+    }
+
+def apply_counter_deltas(connection, deltas: Dict[UUID, Dict[str, int]]) -> None:
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    # Sorted so concurrent writers (and the reconciler) always lock counter rows in the same order
+    stmt = insert(InboxCounter).values([
+        {
+            "user_id": user_id,
+            "pending_approvals": changes.get("pending_approvals", 0),
+            "pending_requests": changes.get("pending_requests", 0),
+            "updated_at": now,
+        } for user_id, changes in sorted(deltas.items(), key=lambda item: str(item[0]))
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[InboxCounter.user_id],
+        set_={
+            "pending_approvals": InboxCounter.pending_approvals + stmt.excluded.pending_approvals,
+            "pending_requests": InboxCounter.pending_requests + stmt.excluded.pending_requests,
+            "updated_at": now,
+        },
+    )
+    connection.execute(stmt)
+
+PENDING_DELTAS = "inbox_counter_deltas" # session.info key: the transaction's changes so far
+
+@event.listens_for(Session, "after_flush")
+def collect_inbox_counter_deltas(session: Session, flush_context) -> None:
+    """Adds the PENDING transitions of this flush to the transaction's running totals."""
+    pending = session.info.setdefault(PENDING_DELTAS, defaultdict(lambda: defaultdict(int)))
+    for user_id, changes in _collect_deltas(session).items():
+        for column, delta in changes.items():
+            pending[user_id][column] += delta
+
+@event.listens_for(Session, "before_commit")
+def update_inbox_counters(session: Session) -> None:
+    """
+    Applies the whole transaction's counter changes as one sorted upsert, just before COMMIT.
+    Applied per flush instead, a transaction that flushes several times would lock counter
+    rows in flush order rather than user order, and two such transactions deadlock.
+    """
+    session.flush()
+    pending = session.info.pop(PENDING_DELTAS, None) or {}
+    deltas = {user_id: dict(changes) for user_id, changes in pending.items() if any(changes.values())}
+    if deltas:
+        apply_counter_deltas(session.connection(), deltas)
+
+@event.listens_for(Session, "after_rollback")
+def discard_inbox_counter_deltas(session: Session) -> None:
+    session.info.pop(PENDING_DELTAS, None)
@@ -0,0 +1,29 @@
+# app/models/outbox.py
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # Writer's transaction id: the relay orders by (transaction_id, id) and never reads past
+    # the oldest in-flight transaction, so late-committing rows can't be skipped
+    transaction_id = Column(BigInteger, nullable=False, server_default=text("txid_current()"))
+    event_type = Column(String, nullable=False) # "SUBMISSION_PENDING", "STAGE_ROUTED", "SUBMISSION_COMPLETED", "SUBMISSION_REJECTED"
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False) # Submission ID
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_outbox_events_txid_id", "transaction_id", "id"),
+    )
+
+class OutboxCursor(Base):
+    __tablename__ = "outbox_cursors"
+
+    sink_name = Column(String, primary_key=True)
+    last_transaction_id = Column(BigInteger, nullable=False, default=0)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
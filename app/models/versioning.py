@@ -0,0 +1,54 @@
+# app/models/versioning.py
+from datetime import datetime
+from itertools import chain
+from sqlalchemy import Column, String, BigInteger, DateTime, event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.database import Base
+
+# Reference tables whose list endpoints are served with ETags.
+# Hot tables (submissions, approvals, audit) are deliberately excluded to avoid row contention.
+VERSIONED_TABLES = {
+    "departments",
+    "positions",
+    "users",
+    "user_positions",
+    "form_templates",
+    "workflows",
+    "workflow_stages",
+}
+
+# Workers LISTEN here to drop cached reference data (app.core.reference_cache); payload = table names
+REFERENCE_CHANNEL = "approveflow_reference"
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+@event.listens_for(Session, "after_flush")
+def bump_table_versions(session: Session, flush_context) -> None:
+    """Bumps the version counter of every reference table touched by this flush and signals the reference caches (same transaction)."""
+    touched = {
+        obj.__tablename__
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__tablename__", None) in VERSIONED_TABLES
+    }
+    if not touched:
+        return
+
+    now = datetime.utcnow()
+    # Sorted so concurrent writers always lock the counter rows in the same order
+    stmt = insert(TableVersion).values(
+        [{"table_name": name, "version": 1, "updated_at": now} for name in sorted(touched)]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableVersion.table_name],
+        set_={"version": TableVersion.version + 1, "updated_at": now},
+    )
+    connection = session.connection()
+    connection.execute(stmt)
+    # Transactional: delivered to every worker only if (and when) this transaction commits
+    connection.execute(select(func.pg_notify(REFERENCE_CHANNEL, ",".join(sorted(touched)))))
@@ -1,9 +1,9 @@
 # app/models/workflow.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Boolean, Index, Text, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from app.core.database import Base
 
 class FormTemplate(Base):
@@ -14,9 +14,13 @@ class FormTemplate(Base):
     description = Column(String)
     form_schema = Column(JSONB, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Bumped by SQLAlchemy on every UPDATE; compiled form validators are cached per version
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
     workflows = relationship("Workflow", back_populates="template")
 
+    __mapper_args__ = {"version_id_col": version}
+
 class Workflow(Base):
     __tablename__ = "workflows"
 
@@ -35,6 +39,11 @@ class WorkflowStage(Base):
     stage_order = Column(Integer, nullable=False)
     required_role = Column(String, nullable=False) # e.g., "MANAGER"
     conditions = Column(JSONB, nullable=True) # e.g., {"leave_days": {">": 3}}
+    sla_hours = Column(Integer, nullable=True) # None = no deadline for this stage
+    sla_action = Column(String, default="ESCALATE") # ESCALATE (to the approver's manager) or REMIND
+    # Stages sharing a stage_order run in parallel; the group's join rule lives on each member
+    join_policy = Column(String, default="ALL") # ALL, ANY, QUORUM
+    quorum = Column(Integer, nullable=True) # k for QUORUM
 
     workflow = relationship("Workflow", back_populates="stages")
 
@@ -45,13 +54,26 @@ class FormSubmission(Base):
     form_template_id = Column(UUID(as_uuid=True), ForeignKey("form_templates.id"))
     submitter_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     form_data = Column(JSONB, nullable=False)
-    status = Column(String, default="DRAFT") # DRAFT, PENDING, APPROVED, REJECTED, COMPLETED
+    # active_history: the old status is loaded before it is overwritten, so the inbox counter hook sees the transition
+    status = column_property(Column(String, default="DRAFT"), active_history=True) # DRAFT, PENDING, APPROVED, REJECTED, COMPLETED
     current_stage_id = Column(UUID(as_uuid=True), ForeignKey("workflow_stages.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     submitter = relationship("User", back_populates="submissions")
     approval_requests = relationship("ApprovalRequest", back_populates="submission")
 
+    __table_args__ = (
+        # Admin search: containment filters on form_data, keyset pages on (created_at, id)
+        Index(
+            "ix_form_submissions_form_data", "form_data",
+            postgresql_using="gin", postgresql_ops={"form_data": "jsonb_path_ops"}
+        ),
+        Index("ix_form_submissions_created", "created_at", "id"),
+        Index("ix_form_submissions_status_created", "status", "created_at", "id"),
+        Index("ix_form_submissions_template_created", "form_template_id", "created_at", "id"),
+        Index("ix_form_submissions_submitter_created", "submitter_id", "created_at"),
+    )
+
 class ApprovalRequest(Base):
     __tablename__ = "approval_requests"
 
@@ -59,8 +81,33 @@ class ApprovalRequest(Base):
     submission_id = Column(UUID(as_uuid=True), ForeignKey("form_submissions.id"))
     stage_id = Column(UUID(as_uuid=True), ForeignKey("workflow_stages.id"))
     assigned_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    status = Column(String, default="PENDING") # PENDING, APPROVED, REJECTED
+    status = column_property(Column(String, default="PENDING"), active_history=True) # PENDING, APPROVED, REJECTED, ESCALATED, CANCELLED
     action_timestamp = Column(DateTime, nullable=True)
+    comments = Column(Text, nullable=True) # Approver's note on APPROVE/REJECT
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Stage entry: when the submission reached this stage. Escalations carry it over, so the
+    # stage's cycle time includes the wait before escalation. Exit is action_timestamp.
+    stage_entered_at = Column(DateTime, nullable=True)
+    due_at = Column(DateTime, nullable=True) # created_at + stage SLA
+    escalation_level = Column(Integer, default=0)
+    reminder_count = Column(Integer, default=0)
+    rolled_up = Column(Boolean, nullable=False, default=False, server_default=text("false")) # Counted in approval_cycle_rollups
 
     submission = relationship("FormSubmission", back_populates="approval_requests")
 
+    __table_args__ = (
+        # The SLA scheduler and the overdue counter only ever look at pending rows with a deadline
+        Index(
+            "ix_approval_requests_pending_due_at", "due_at",
+            postgresql_where=text("status = 'PENDING' AND due_at IS NOT NULL")
+        ),
+        Index("ix_approval_requests_assignee_status", "assigned_user_id", "status"),
+        # Per-submission lookups (stage groups, the archiver's eligibility check)
+        Index("ix_approval_requests_submission_id", "submission_id"),
+        # The cycle-time aggregator only scans finished requests it hasn't counted yet
+        Index(
+            "ix_approval_requests_unrolled", "action_timestamp",
+            postgresql_where=text("rolled_up = false AND action_timestamp IS NOT NULL")
+        ),
+    )
+
@@ -0,0 +1,74 @@
+# app/repositories/analytics_repo.py
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_repository
+from app.models.analytics import ApprovalCycleRollup
+from app.models.workflow import ApprovalRequest, FormSubmission
+
+RollupKey = Tuple[date, str, UUID, str] # (day, dimension, key_id, outcome)
+
+@trace_repository
+class AnalyticsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_unrolled_requests(self, limit: int) -> List[tuple]:
+        """
+        Finished approval requests not yet counted, with their template, row-locked
+        (SKIP LOCKED) so each is rolled up exactly once.
+        """
+        return self.db.query(
+            ApprovalRequest.id,
+            ApprovalRequest.stage_id,
+            ApprovalRequest.assigned_user_id,
+            ApprovalRequest.status,
+            ApprovalRequest.stage_entered_at,
+            ApprovalRequest.created_at,
+            ApprovalRequest.action_timestamp,
+            FormSubmission.form_template_id
+        ).join(FormSubmission, FormSubmission.id == ApprovalRequest.submission_id).filter(
+            ApprovalRequest.rolled_up == False,
+            ApprovalRequest.action_timestamp.isnot(None)
+        ).order_by(ApprovalRequest.action_timestamp.asc()).limit(limit).with_for_update(
+            of=ApprovalRequest, skip_locked=True
+        ).all()
+
+    def mark_rolled_up(self, request_ids: List[UUID]) -> None:
+        self.db.query(ApprovalRequest).filter(ApprovalRequest.id.in_(request_ids)).update(
+            {ApprovalRequest.rolled_up: True}, synchronize_session=False
+        )
+
+    def lock_rollups(self, keys: Sequence[RollupKey]) -> Dict[RollupKey, ApprovalCycleRollup]:
+        if not keys:
+            return {}
+        rows = self.db.query(ApprovalCycleRollup).filter(
+            tuple_(
+                ApprovalCycleRollup.day, ApprovalCycleRollup.dimension,
+                ApprovalCycleRollup.key_id, ApprovalCycleRollup.outcome
+            ).in_(list(keys))
+        ).with_for_update().all()
+        return {(row.day, row.dimension, row.key_id, row.outcome): row for row in rows}
+
+    def get_rollups(
+        self,
+        dimension: str,
+        since: date,
+        until: date,
+        outcome: Optional[str] = None,
+        key_id: Optional[UUID] = None
+    ) -> List[ApprovalCycleRollup]:
+        """Day rows for [since, until] inclusive; at most days x keys rows, never raw requests."""
+        query = self.db.query(ApprovalCycleRollup).filter(
+            ApprovalCycleRollup.dimension == dimension,
+            ApprovalCycleRollup.day >= since,
+            ApprovalCycleRollup.day <= until
+        )
+        if outcome:
+            query = query.filter(ApprovalCycleRollup.outcome == outcome)
+        if key_id:
+            query = query.filter(ApprovalCycleRollup.key_id == key_id)
+        return query.all()
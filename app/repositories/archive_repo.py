@@ -0,0 +1,74 @@
+# app/repositories/archive_repo.py
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import and_, exists, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_repository
+from app.models.archive import ArchivedApprovalRequest, ArchivedSubmission
+from app.models.workflow import ApprovalRequest, FormSubmission
+
+TERMINAL_STATUSES = ("COMPLETED", "REJECTED")
+
+SUBMISSION_COLUMNS = ("id", "form_template_id", "submitter_id", "form_data", "status", "current_stage_id", "created_at")
+APPROVAL_COLUMNS = (
+    "id", "submission_id", "stage_id", "assigned_user_id", "status", "action_timestamp", "comments",
+    "created_at", "stage_entered_at", "due_at", "escalation_level", "reminder_count", "rolled_up"
+)
+
+@trace_repository
+class ArchiveRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_archivable(self, cutoff: datetime, limit: int) -> List[UUID]:
+        """
+        Terminal submissions with no activity since `cutoff`, row-locked (SKIP LOCKED).
+        A submission waits while any of its decisions is still to be folded into the cycle-time rollups.
+        """
+        blocking = exists().where(
+            ApprovalRequest.submission_id == FormSubmission.id,
+            or_(
+                ApprovalRequest.status == "PENDING",
+                ApprovalRequest.action_timestamp >= cutoff,
+                and_(ApprovalRequest.rolled_up == False, ApprovalRequest.action_timestamp.isnot(None))
+            )
+        )
+        rows = self.db.query(FormSubmission.id).filter(
+            FormSubmission.status.in_(TERMINAL_STATUSES),
+            FormSubmission.created_at < cutoff,
+            ~blocking
+        ).order_by(FormSubmission.created_at.asc()).limit(limit).with_for_update(skip_locked=True).all()
+        return [row[0] for row in rows]
+
+    def move(self, submission_ids: List[UUID], archived_at: datetime) -> int:
+        """
+        Copies the submissions and their approval requests into the archive tables and deletes
+        the hot rows, as set-based statements in the caller's transaction. Approval requests go
+        first (they reference form_submissions).
+        """
+        self._copy(ApprovalRequest, ArchivedApprovalRequest, APPROVAL_COLUMNS, ApprovalRequest.submission_id.in_(submission_ids), archived_at)
+        self.db.query(ApprovalRequest).filter(ApprovalRequest.submission_id.in_(submission_ids)).delete(synchronize_session=False)
+        self._copy(FormSubmission, ArchivedSubmission, SUBMISSION_COLUMNS, FormSubmission.id.in_(submission_ids), archived_at)
+        return self.db.query(FormSubmission).filter(FormSubmission.id.in_(submission_ids)).delete(synchronize_session=False)
+
+    def _copy(self, source, target, columns, criterion, archived_at: datetime) -> None:
+        self.db.execute(insert(target).from_select(
+            [*columns, "archived_at"],
+            select(*[getattr(source, name) for name in columns], literal(archived_at)).where(criterion)
+        ))
+
+    def get_submission(self, submission_id: UUID) -> Optional[ArchivedSubmission]:
+        return self.db.query(ArchivedSubmission).filter(ArchivedSubmission.id == submission_id).first()
+
+    def get_submissions_for_submitter(self, submitter_id: UUID) -> List[ArchivedSubmission]:
+        return self.db.query(ArchivedSubmission).filter(
+            ArchivedSubmission.submitter_id == submitter_id
+        ).order_by(ArchivedSubmission.created_at.desc()).all()
+
+    def count_submissions(self, status: Optional[str] = None) -> int:
+        query = self.db.query(ArchivedSubmission)
+        if status:
+            query = query.filter(ArchivedSubmission.status == status)
+        return query.count()
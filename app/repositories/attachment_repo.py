@@ -0,0 +1,49 @@
+# app/repositories/attachment_repo.py
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_repository
+from app.models.audit import Attachment
+
+def attachment_object_key(submission_id: UUID, attachment_id: UUID) -> str:
+    """attachments/<submission_id>/<attachment_id>: outside sha256/, so the document GC never touches it."""
+    return f"attachments/{submission_id}/{attachment_id}"
+
+@trace_repository
+class AttachmentRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, attachment_id: UUID) -> Optional[Attachment]:
+        return self.db.query(Attachment).filter(Attachment.id == attachment_id).first()
+
+    def list_for_submission(self, submission_id: UUID, status: Optional[str] = None) -> List[Attachment]:
+        query = self.db.query(Attachment).filter(Attachment.submission_id == submission_id)
+        if status:
+            query = query.filter(Attachment.status == status)
+        return query.order_by(Attachment.created_at.asc(), Attachment.id.asc()).all()
+
+    def count_active(self, submission_id: UUID) -> int:
+        return self.db.query(Attachment).filter(
+            Attachment.submission_id == submission_id,
+            Attachment.status != "REJECTED"
+        ).count()
+
+    def lock_for_confirmation(self, attachment_id: UUID) -> Optional[Attachment]:
+        """Row-locks a PENDING attachment; None if it is gone, already confirmed, or being confirmed elsewhere."""
+        return self.db.execute(
+            select(Attachment).where(
+                Attachment.id == attachment_id,
+                Attachment.status == "PENDING"
+            ).with_for_update(skip_locked=True)
+        ).scalars().first()
+
+    def pending_ids(self, created_before: datetime, limit: int) -> List[UUID]:
+        rows = self.db.query(Attachment.id).filter(
+            Attachment.status == "PENDING",
+            Attachment.created_at < created_before
+        ).order_by(Attachment.created_at.asc()).limit(limit).all()
+        return [row[0] for row in rows]
@@ -0,0 +1,64 @@
+# app/repositories/audit_repo.py
+from datetime import datetime
+from sqlalchemy import cast, func, select, Text
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+
+from app.core.tracing import trace_repository
+from app.models.audit import AuditLog
+
+TS_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+@trace_repository
+class AuditSearchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self,
+        query: str,
+        entity_type: Optional[str] = None,
+        action: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        limit: int = 25,
+        offset: int = 0,
+    ) -> List[Tuple[AuditLog, float, str]]:
+        """
+        Ranked full-text search over audit snapshots and approver comments.
+        `query` uses web-search syntax ("budget overrun" -travel OR hotel).
+        The GIN index narrows the candidates and only the requested page is ranked and highlighted.
+        Returns (log, rank, headline) tuples, at most limit + 1 so callers can detect a next page.
+        """
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+        rank = func.ts_rank_cd(AuditLog.search_vector, tsquery).label("rank")
+
+        page = select(AuditLog.id, rank).where(AuditLog.search_vector.op("@@")(tsquery))
+        if entity_type:
+            page = page.where(AuditLog.entity_type == entity_type)
+        if action:
+            page = page.where(AuditLog.action == action)
+        if since:
+            page = page.where(AuditLog.timestamp >= since)
+        if until:
+            page = page.where(AuditLog.timestamp < until)
+        if sort == "recent":
+            page = page.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+        else:
+            page = page.order_by(rank.desc(), AuditLog.timestamp.desc(), AuditLog.id.desc())
+        page = page.limit(limit + 1).offset(offset).subquery()
+
+        # ts_headline re-parses the document, so it's only computed for the rows being returned
+        headline = func.ts_headline(
+            TS_CONFIG,
+            func.concat_ws(" ", AuditLog.action, cast(AuditLog.snapshot, Text)),
+            tsquery,
+            HEADLINE_OPTIONS
+        )
+        order = [AuditLog.timestamp.desc()] if sort == "recent" else [page.c.rank.desc(), AuditLog.timestamp.desc()]
+        rows = self.db.query(AuditLog, page.c.rank, headline).join(page, AuditLog.id == page.c.id).order_by(
+            *order, AuditLog.id.desc()
+        ).all()
+        return [(log, float(row_rank), row_headline) for log, row_rank, row_headline in rows]
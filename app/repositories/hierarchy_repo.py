@@ -1,10 +1,41 @@
 # app/repositories/hierarchy_repo.py
+from functools import lru_cache
 from uuid import UUID
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from app.models.organization import Position, UserPosition, User
+from app.core.tracing import trace_repository
 
+# Built once, on first use (see user_repo): the CTE is resolved for every approver assignment, and
+# rebuilding it (alias, CTE and union construction plus a fresh cache key) showed up in request
+# profiles. Not at import time: aliased() configures every mapper, which fails until all the
+# model modules have been imported.
+@lru_cache(maxsize=1)
+def ancestor_positions_statement():
+    """
+    THE INFINITE HIERARCHY RESOLVER.
+    Uses a Recursive CTE to traverse UP the organization chart, from :starting_position_id.
+    """
+    # 1. Base Case: The starting position
+    base_query = (
+        select(Position)
+        .where(Position.id == bindparam("starting_position_id"))
+        .cte(name="position_hierarchy", recursive=True)
+    )
+
+    # 2. Recursive Case: Join the Position table to the CTE going UP the tree
+    PositionAlias = aliased(Position)
+    recursive_query = (
+        select(PositionAlias)
+        .join(base_query, PositionAlias.id == base_query.c.parent_position_id)
+    )
+
+    # 3. Combine them
+    hierarchy_cte = base_query.union_all(recursive_query)
+    return select(hierarchy_cte)
+
+@trace_repository
 class HierarchyRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -17,33 +48,16 @@ class HierarchyRepository:
 
     def get_ancestor_positions(self, starting_position_id: UUID):
         """
-        THE INFINITE HIERARCHY RESOLVER.
-        Uses a Recursive CTE to traverse UP the organization chart.
-        Returns a list of all parent positions in order from bottom to top.
+        Returns a list of all parent positions in order from bottom to top
+        (Row objects representing the positions).
         """
-        # 1. Base Case: The starting position
-        base_query = (
-            select(Position)
-            .where(Position.id == starting_position_id)
-            .cte(name="position_hierarchy", recursive=True)
-        )
-
-        # 2. Recursive Case: Join the Position table to the CTE going UP the tree
-        PositionAlias = aliased(Position)
-        recursive_query = (
-            select(PositionAlias)
-            .join(base_query, PositionAlias.id == base_query.c.parent_position_id)
-        )
-
-        # 3. Combine them
-        hierarchy_cte = base_query.union_all(recursive_query)
-
-        # 4. Execute the query
-        statement = select(hierarchy_cte)
-        result = self.db.execute(statement).all()
-        
-        # Returns a list of Row objects representing the positions
-        return result
+        return self.db.execute(ancestor_positions_statement(), {"starting_position_id": starting_position_id}).all()
+
+    def get_position_tree(self) -> list[tuple]:
+        """(id, parent_position_id, role_type, title) of every position (reference-cache loads)."""
+        return self.db.query(
+            Position.id, Position.parent_position_id, Position.role_type, Position.title
+        ).all()
 
     def get_users_by_position(self, position_id: UUID) -> list[User]:
         """Finds which actual humans occupy a specific position (e.g., Who is the HOD?)."""
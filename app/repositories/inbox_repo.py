@@ -0,0 +1,57 @@
+# app/repositories/inbox_repo.py
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_repository
+from app.models.inbox_counter import InboxCounter
+from app.models.organization import User
+from app.models.workflow import ApprovalRequest, FormSubmission
+
+@trace_repository
+class InboxCounterRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_counts(self, user_id: UUID) -> Tuple[int, int]:
+        """(pending_approvals, pending_requests): one primary-key lookup."""
+        row = self.db.query(InboxCounter.pending_approvals, InboxCounter.pending_requests).filter(
+            InboxCounter.user_id == user_id
+        ).first()
+        if row is None:
+            # Not reconciled yet (new user or fresh deployment): count directly this once
+            return self.count_actual([user_id]).get(user_id, (0, 0))
+        return max(row[0], 0), max(row[1], 0)
+
+    def user_id_batch(self, after: Optional[UUID], limit: int) -> List[UUID]:
+        query = self.db.query(User.id)
+        if after is not None:
+            query = query.filter(User.id > after)
+        return [row[0] for row in query.order_by(User.id.asc()).limit(limit).all()]
+
+    def lock_counters(self, user_ids: List[UUID]) -> Dict[UUID, InboxCounter]:
+        """Creates missing rows, then row-locks the batch in user_id order (the commit-time counter upsert's order too)."""
+        now = datetime.utcnow()
+        self.db.execute(insert(InboxCounter).values([
+            {"user_id": user_id, "pending_approvals": 0, "pending_requests": 0, "updated_at": now}
+            for user_id in user_ids
+        ]).on_conflict_do_nothing(index_elements=[InboxCounter.user_id]))
+        counters = self.db.execute(
+            select(InboxCounter).where(InboxCounter.user_id.in_(user_ids))
+            .order_by(InboxCounter.user_id.asc()).with_for_update()
+        ).scalars().all()
+        return {counter.user_id: counter for counter in counters}
+
+    def count_actual(self, user_ids: List[UUID]) -> Dict[UUID, Tuple[int, int]]:
+        approvals = dict(self.db.query(ApprovalRequest.assigned_user_id, func.count()).filter(
+            ApprovalRequest.assigned_user_id.in_(user_ids),
+            ApprovalRequest.status == "PENDING"
+        ).group_by(ApprovalRequest.assigned_user_id).all())
+        requests = dict(self.db.query(FormSubmission.submitter_id, func.count()).filter(
+            FormSubmission.submitter_id.in_(user_ids),
+            FormSubmission.status == "PENDING"
+        ).group_by(FormSubmission.submitter_id).all())
+        return {user_id: (approvals.get(user_id, 0), requests.get(user_id, 0)) for user_id in user_ids}
@@ -0,0 +1,77 @@
+# app/repositories/object_repo.py
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_repository
+from app.models.audit import StoredObject
+
+def content_addressed_key(content_hash: str, extension: str = "pdf") -> str:
+    """sha256/ab/cd/<hash>.pdf: fans objects out over prefixes so listings stay small."""
+    return f"sha256/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.{extension}"
+
+@trace_repository
+class StoredObjectRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def acquire(self, content_hash: str, object_key: str, size_bytes: int, content_type: str = "application/pdf") -> StoredObject:
+        """
+        Adds a reference (creating the row on first use) and row-locks it until commit,
+        so the garbage collector cannot delete the blob while it is being (re)uploaded.
+        """
+        stmt = insert(StoredObject).values(
+            content_hash=content_hash,
+            object_key=object_key,
+            size_bytes=size_bytes,
+            content_type=content_type,
+            ref_count=1,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=[StoredObject.content_hash],
+            set_={"ref_count": StoredObject.ref_count + 1, "orphaned_at": None}
+        )
+        self.db.execute(stmt)
+        return self.db.get(StoredObject, content_hash, populate_existing=True)
+
+    def release(self, content_hash: str) -> None:
+        """Drops a reference; the last one stamps orphaned_at for the garbage collector."""
+        remaining = StoredObject.ref_count - 1
+        self.db.query(StoredObject).filter(StoredObject.content_hash == content_hash).update({
+            StoredObject.ref_count: remaining,
+            StoredObject.orphaned_at: case((remaining <= 0, datetime.utcnow()), else_=None)
+        }, synchronize_session=False)
+
+    def lock_orphans(self, orphaned_before: datetime, limit: int) -> List[StoredObject]:
+        """Unreferenced rows past the grace period; rows an uploader currently holds are skipped."""
+        return self.db.execute(
+            select(StoredObject).where(
+                StoredObject.ref_count == 0,
+                StoredObject.orphaned_at < orphaned_before
+            ).order_by(StoredObject.orphaned_at.asc()).limit(limit).with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    def claim_untracked(self, objects: List[Tuple[str, str, int]]) -> List[str]:
+        """
+        Inserts a placeholder row for each (content_hash, object_key, size_bytes) nothing tracks yet
+        and returns the hashes it claimed. An uploader's acquire() of a claimed hash waits on the
+        uncommitted row until the caller commits (then re-checks storage), and a hash an uploader is
+        inserting right now is waited for and then skipped, so claimed blobs are safe to delete.
+        """
+        if not objects:
+            return []
+        now = datetime.utcnow()
+        stmt = insert(StoredObject).values([
+            {"content_hash": content_hash, "object_key": object_key, "size_bytes": size_bytes,
+             "ref_count": 0, "created_at": now, "orphaned_at": now}
+            for content_hash, object_key, size_bytes in sorted(objects) # Same lock order on every node
+        ]).on_conflict_do_nothing(index_elements=[StoredObject.content_hash]).returning(StoredObject.content_hash)
+        return [row[0] for row in self.db.execute(stmt)]
+
+    def discard(self, content_hashes: List[str]) -> None:
+        if content_hashes:
+            self.db.query(StoredObject).filter(
+                StoredObject.content_hash.in_(content_hashes)
+            ).delete(synchronize_session=False)
@@ -0,0 +1,48 @@
+# app/repositories/outbox_repo.py
+from uuid import UUID
+from typing import Dict, Any, List, Optional
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.outbox import OutboxEvent, OutboxCursor
+from app.core.tracing import trace_repository
+
+@trace_repository
+class OutboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_event(self, event_type: str, aggregate_id: UUID, payload: Dict[str, Any]) -> OutboxEvent:
+        """Written in the caller's transaction: the event exists if and only if the transition committed."""
+        event = OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=payload)
+        self.db.add(event)
+        return event
+
+    def lock_cursor(self, sink_name: str) -> OutboxCursor:
+        cursor = self.db.query(OutboxCursor).filter(
+            OutboxCursor.sink_name == sink_name
+        ).with_for_update().first()
+        if cursor is None:
+            cursor = OutboxCursor(sink_name=sink_name, last_transaction_id=0, last_event_id=0)
+            self.db.add(cursor)
+            self.db.flush()
+        return cursor
+
+    def get_events_after(self, cursor: OutboxCursor, limit: int) -> List[OutboxEvent]:
+        """Next batch in commit-safe order, stopping below the oldest still-running transaction."""
+        visible_horizon = func.txid_snapshot_xmin(func.txid_current_snapshot())
+        return self.db.query(OutboxEvent).filter(
+            tuple_(OutboxEvent.transaction_id, OutboxEvent.id)
+            > tuple_(cursor.last_transaction_id, cursor.last_event_id),
+            OutboxEvent.transaction_id < visible_horizon
+        ).order_by(OutboxEvent.transaction_id.asc(), OutboxEvent.id.asc()).limit(limit).all()
+
+    def rewind_cursor(self, sink_name: str, from_event_id: Optional[int] = None) -> OutboxCursor:
+        """Positions the cursor so the next relay pass starts at `from_event_id` (or the beginning)."""
+        cursor = self.lock_cursor(sink_name)
+        start = self.db.get(OutboxEvent, from_event_id) if from_event_id else None
+        if start is None:
+            cursor.last_transaction_id, cursor.last_event_id = 0, 0
+        else:
+            cursor.last_transaction_id, cursor.last_event_id = start.transaction_id, start.id - 1
+        return cursor
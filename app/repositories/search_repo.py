@@ -0,0 +1,114 @@
+# app/repositories/search_repo.py
+import base64
+import re
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import exists, func, literal, not_, or_, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
+from sqlalchemy.orm import Query, Session
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.tracing import trace_repository
+from app.models.organization import Position, UserPosition
+from app.models.workflow import FormSubmission
+
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+RANGE_OPERATORS = (">", "<", ">=", "<=")
+
+def encode_cursor(created_at: datetime, submission_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, submission_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(submission_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Malformed search cursor") from exc
+
+def _typed(value: Any) -> Any:
+    # Numeric-looking thresholds compare as numbers, mirroring ConditionEvaluator's float() casts
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+def form_data_clause(field: str, op_symbol: str, value: Any):
+    """
+    Translates one ConditionEvaluator-style check into SQL.
+    ==/IN become JSONB containment (served by the jsonb_path_ops GIN index); range
+    operators become a jsonpath filter, which is type-safe against non-numeric values.
+    """
+    if not FIELD_NAME.match(field):
+        raise ValueError(f"Invalid form field name: {field}")
+
+    if op_symbol == "==":
+        return FormSubmission.form_data.contains({field: value})
+    if op_symbol == "!=":
+        return not_(FormSubmission.form_data.contains({field: value}))
+    if op_symbol == "IN":
+        if not isinstance(value, list) or not value:
+            raise ValueError(f"IN on '{field}' expects a non-empty list")
+        return or_(*[FormSubmission.form_data.contains({field: item}) for item in value])
+    if op_symbol in RANGE_OPERATORS:
+        path = literal(f'$."{field}" ? (@ {op_symbol} $value)', JSONPATH)
+        return func.jsonb_path_exists(FormSubmission.form_data, path, literal({"value": _typed(value)}, JSONB))
+
+    raise ValueError(f"Unknown operator strictly forbidden: {op_symbol}")
+
+@trace_repository
+class SubmissionSearchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_query(
+        self,
+        statuses: Optional[List[str]] = None,
+        template_id: Optional[UUID] = None,
+        department_id: Optional[UUID] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        form_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        contains: Optional[Dict[str, Any]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> Query:
+        """
+        Newest-first page of submissions matching every filter.
+        Keyset pagination on (created_at, id): `after` is the last row of the previous page.
+        Fetches limit + 1 rows so the caller can tell whether another page exists.
+        """
+        clauses = []
+        if statuses:
+            clauses.append(FormSubmission.status.in_(statuses))
+        if template_id:
+            clauses.append(FormSubmission.form_template_id == template_id)
+        if created_from:
+            clauses.append(FormSubmission.created_at >= created_from)
+        if created_to:
+            clauses.append(FormSubmission.created_at < created_to)
+        if department_id:
+            clauses.append(exists().where(
+                UserPosition.user_id == FormSubmission.submitter_id,
+                UserPosition.position_id == Position.id,
+                Position.department_id == department_id
+            ))
+        if contains:
+            clauses.append(FormSubmission.form_data.contains(contains))
+        for field, checks in (form_data or {}).items():
+            if not isinstance(checks, dict):
+                raise ValueError(f"Filter for '{field}' must map operators to values")
+            for op_symbol, value in checks.items():
+                clauses.append(form_data_clause(field, op_symbol, value))
+        if after:
+            clauses.append(tuple_(FormSubmission.created_at, FormSubmission.id) < tuple_(*after))
+
+        return self.db.query(FormSubmission).filter(*clauses).order_by(
+            FormSubmission.created_at.desc(), FormSubmission.id.desc()
+        ).limit(limit + 1)
+
+    def search(self, **filters) -> List[FormSubmission]:
+        return self.build_query(**filters).all()
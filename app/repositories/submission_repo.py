@@ -1,10 +1,23 @@
 # app/repositories/submission_repo.py
 from uuid import UUID
+from datetime import datetime
+from sqlalchemy import bindparam, exists, or_, select
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 
+from app.core.inbox_broker import inbox_broker
+from app.models.archive import ArchivedApprovalRequest, ArchivedSubmission
 from app.models.workflow import FormSubmission, ApprovalRequest
+from app.repositories.archive_repo import ArchiveRepository
+from app.core.tracing import trace_repository
 
+# Built once (see user_repo): the approver inbox runs this on every page load
+PENDING_APPROVALS_FOR_USER = select(ApprovalRequest).where(
+    ApprovalRequest.assigned_user_id == bindparam("user_id"),
+    ApprovalRequest.status == "PENDING"
+)
+
+@trace_repository
 class SubmissionRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -27,6 +40,31 @@ class SubmissionRepository:
         self.db.flush() # Flush to get the ID without committing the whole transaction yet
         return submission
 
+    def get_submission(self, submission_id: UUID) -> Optional[Union[FormSubmission, ArchivedSubmission]]:
+        """The live row, or its archived copy once the archiver has moved it (read paths only)."""
+        submission = self.db.query(FormSubmission).filter(FormSubmission.id == submission_id).first()
+        if submission is None:
+            submission = ArchiveRepository(self.db).get_submission(submission_id)
+        return submission
+
+    def get_submissions_for_submitter(self, submitter_id: UUID) -> List[Union[FormSubmission, ArchivedSubmission]]:
+        """'My Requests': live rows first (newest first), then the archived history."""
+        live = self.db.query(FormSubmission).filter(
+            FormSubmission.submitter_id == submitter_id
+        ).order_by(FormSubmission.created_at.desc()).all()
+        return live + ArchiveRepository(self.db).get_submissions_for_submitter(submitter_id)
+
+    def is_participant(self, submission_id: UUID, user_id: UUID) -> bool:
+        """The submitter, or an approver the submission was ever routed to (live or archived)."""
+        return self.db.execute(select(or_(
+            exists().where(FormSubmission.id == submission_id, FormSubmission.submitter_id == user_id),
+            exists().where(ApprovalRequest.submission_id == submission_id, ApprovalRequest.assigned_user_id == user_id),
+            exists().where(ArchivedSubmission.id == submission_id, ArchivedSubmission.submitter_id == user_id),
+            exists().where(
+                ArchivedApprovalRequest.submission_id == submission_id, ArchivedApprovalRequest.assigned_user_id == user_id
+            ),
+        ))).scalar()
+
     def update_submission_status(self, submission_id: UUID, new_status: str, current_stage_id: UUID = None):
         submission = self.db.query(FormSubmission).filter(FormSubmission.id == submission_id).first()
         if submission:
@@ -34,20 +72,91 @@ class SubmissionRepository:
             if current_stage_id:
                 submission.current_stage_id = current_stage_id
             self.db.add(submission)
+            # Tell the submitter's "My Requests" view to refetch (sent on commit)
+            inbox_broker.publish(self.db, submission.submitter_id, {
+                "type": "submission_updated",
+                "submission_id": str(submission.id),
+                "status": new_status
+            })
 
-    def create_approval_request(self, submission_id: UUID, stage_id: UUID, assigned_user_id: UUID) -> ApprovalRequest:
+    def create_approval_request(
+        self,
+        submission_id: UUID,
+        stage_id: UUID,
+        assigned_user_id: UUID,
+        due_at: Optional[datetime] = None,
+        escalation_level: int = 0,
+        stage_entered_at: Optional[datetime] = None
+    ) -> ApprovalRequest:
         request = ApprovalRequest(
             submission_id=submission_id,
             stage_id=stage_id,
             assigned_user_id=assigned_user_id,
-            status="PENDING"
+            status="PENDING",
+            stage_entered_at=stage_entered_at or datetime.utcnow(),
+            due_at=due_at,
+            escalation_level=escalation_level
         )
         self.db.add(request)
+        self.db.flush() # Assign the ID so the push event can reference it
+        # Tell the approver's inbox to refetch (sent on commit)
+        inbox_broker.publish(self.db, assigned_user_id, {
+            "type": "approval_assigned",
+            "approval_request_id": str(request.id),
+            "submission_id": str(submission_id)
+        })
         return request
 
+    def get_active_requests_for_stages(self, submission_id: UUID, stage_ids: List[UUID]) -> List[ApprovalRequest]:
+        """Live requests of a stage group (escalated and cancelled ones have been superseded)."""
+        return self.db.query(ApprovalRequest).filter(
+            ApprovalRequest.submission_id == submission_id,
+            ApprovalRequest.stage_id.in_(stage_ids),
+            ApprovalRequest.status.notin_(["ESCALATED", "CANCELLED"])
+        ).all()
+
+    def cancel_pending_requests(self, submission_id: UUID, stage_ids: List[UUID]) -> int:
+        """Withdraws sibling requests once their parallel group has been decided."""
+        pending = self.db.query(ApprovalRequest).filter(
+            ApprovalRequest.submission_id == submission_id,
+            ApprovalRequest.stage_id.in_(stage_ids),
+            ApprovalRequest.status == "PENDING"
+        ).all()
+        now = datetime.utcnow()
+        for request in pending:
+            request.status = "CANCELLED"
+            request.action_timestamp = now
+            # Take it off the approver's live inbox (sent on commit)
+            inbox_broker.publish(self.db, request.assigned_user_id, {
+                "type": "approval_cancelled",
+                "approval_request_id": str(request.id),
+                "submission_id": str(submission_id)
+            })
+        return len(pending)
+
     def get_pending_approvals_for_user(self, user_id: UUID) -> List[ApprovalRequest]:
         """Populates the 'My Approvals' dashboard in the UI."""
+        return self.db.execute(PENDING_APPROVALS_FOR_USER, {"user_id": user_id}).scalars().all()
+
+    def get_due_approvals(self, due_before: datetime, limit: int) -> List[tuple]:
+        """(due_at, id) of pending approvals due before the cutoff. Served by the partial due_at index."""
+        return self.db.query(ApprovalRequest.due_at, ApprovalRequest.id).filter(
+            ApprovalRequest.status == "PENDING",
+            ApprovalRequest.due_at.isnot(None),
+            ApprovalRequest.due_at < due_before
+        ).order_by(ApprovalRequest.due_at.asc()).limit(limit).all()
+
+    def lock_overdue_approvals(self, approval_ids: List[UUID], now: datetime) -> List[ApprovalRequest]:
+        """Row-locks the still-overdue subset; rows another node is handling are skipped."""
         return self.db.query(ApprovalRequest).filter(
-            ApprovalRequest.assigned_user_id == user_id,
-            ApprovalRequest.status == "PENDING"
-        ).all()
\ No newline at end of file
+            ApprovalRequest.id.in_(approval_ids),
+            ApprovalRequest.status == "PENDING",
+            ApprovalRequest.due_at <= now
+        ).with_for_update(skip_locked=True).all()
+
+    def count_overdue_approvals(self, now: datetime) -> int:
+        return self.db.query(ApprovalRequest).filter(
+            ApprovalRequest.status == "PENDING",
+            ApprovalRequest.due_at.isnot(None),
+            ApprovalRequest.due_at < now
+        ).count()
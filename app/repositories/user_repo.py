@@ -1,8 +1,16 @@
 # app/repositories/user_repo.py
 from uuid import UUID
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from app.models.organization import User
+from app.core.tracing import trace_repository
 
+# Hot-path statements are built once: SQLAlchemy memoizes their cache key, so each call
+# skips statement construction and goes straight to the compiled-SQL cache
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+ACTIVE_USER_BY_ID = select(User).where(User.id == bindparam("user_id"), User.is_active == True)
+
+@trace_repository
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -11,4 +19,7 @@ class UserRepository:
         return self.db.query(User).filter(User.email == email).first()
 
     def get_by_id(self, user_id: UUID) -> User:
-        return self.db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+        return self.db.execute(USER_BY_ID, {"user_id": user_id}).scalars().first()
+
+    def get_active_by_id(self, user_id: UUID) -> User:
+        return self.db.execute(ACTIVE_USER_BY_ID, {"user_id": user_id}).scalars().first()
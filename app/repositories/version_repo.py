@@ -0,0 +1,46 @@
+# app/repositories/version_repo.py
+from typing import Dict
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.http_cache import Validators, build_validators
+from app.models.audit import AuditLog
+from app.models.versioning import TableVersion
+from app.core.tracing import trace_repository
+
+@trace_repository
+class VersionRepository:
+    """Cheap version stamps used to answer conditional GETs without loading the payload."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_table_validators(self, *table_names: str) -> Validators:
+        rows = self.db.query(TableVersion).filter(TableVersion.table_name.in_(table_names)).all()
+        versions = {row.table_name: row for row in rows}
+        parts = [f"{name}:{versions[name].version if name in versions else 0}" for name in table_names]
+        last_modified = max((row.updated_at for row in rows if row.updated_at), default=None)
+        return build_validators(*parts, last_modified=last_modified)
+
+    def get_versions(self, *table_names: str) -> Dict[str, int]:
+        """Raw version counters (0 = never written through the ORM)."""
+        rows = self.db.query(TableVersion.table_name, TableVersion.version).filter(
+            TableVersion.table_name.in_(table_names)
+        ).all()
+        versions = dict(rows)
+        return {name: versions.get(name, 0) for name in table_names}
+
+    def get_timeline_validators(self, submission_id: UUID) -> Validators:
+        """The audit trail is append-only, so (row count, latest timestamp) identifies it."""
+        count, latest = self.db.query(func.count(AuditLog.id), func.max(AuditLog.timestamp)).filter(
+            AuditLog.entity_id == submission_id,
+            AuditLog.entity_type == "SUBMISSION"
+        ).one()
+        return build_validators("timeline", submission_id, count, latest, last_modified=latest)
+
+    def get_audit_feed_validators(self) -> Validators:
+        # The feed shows actor names, so a renamed user must also invalidate it
+        latest = self.db.query(func.max(AuditLog.timestamp)).scalar()
+        users = self.get_table_validators("users")
+        return build_validators("audit-feed", latest, users.etag, last_modified=latest)
@@ -1,10 +1,18 @@
 # app/repositories/workflow_repo.py
 from uuid import UUID
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.models.workflow import FormTemplate, Workflow, WorkflowStage
+from app.core.tracing import trace_repository
 
+# Built once (see user_repo): the engine runs these on every submission and approval
+STAGES_BY_WORKFLOW = select(WorkflowStage).where(
+    WorkflowStage.workflow_id == bindparam("workflow_id")
+).order_by(WorkflowStage.stage_order.asc())
+
+@trace_repository
 class WorkflowRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -20,6 +28,25 @@ class WorkflowRepository:
 
     def get_workflow_stages(self, workflow_id: UUID) -> list[WorkflowStage]:
         """Returns the stages ordered correctly (Stage 1, Stage 2, etc.)."""
+        return self.db.execute(STAGES_BY_WORKFLOW, {"workflow_id": workflow_id}).scalars().all()
+
+    def get_all_workflow_stages(self) -> list[tuple[Workflow, list[WorkflowStage]]]:
+        """Every workflow with its ordered stages, in two queries (reference-cache loads)."""
+        workflows = self.db.query(Workflow).all()
+        stages = self.db.query(WorkflowStage).order_by(
+            WorkflowStage.workflow_id, WorkflowStage.stage_order.asc(), WorkflowStage.id.asc()
+        ).all()
+        by_workflow: dict = {}
+        for stage in stages:
+            by_workflow.setdefault(stage.workflow_id, []).append(stage)
+        return [(workflow, by_workflow.get(workflow.id, [])) for workflow in workflows]
+
+    def get_stage(self, stage_id: UUID) -> Optional[WorkflowStage]:
+        return self.db.query(WorkflowStage).filter(WorkflowStage.id == stage_id).first()
+
+    def get_stage_group(self, workflow_id: UUID, stage_order: int) -> list[WorkflowStage]:
+        """All stages that run in parallel at a given position of the workflow."""
         return self.db.query(WorkflowStage).filter(
-            WorkflowStage.workflow_id == workflow_id
-        ).order_by(WorkflowStage.stage_order.asc()).all()
\ No newline at end of file
+            WorkflowStage.workflow_id == workflow_id,
+            WorkflowStage.stage_order == stage_order
+        ).order_by(WorkflowStage.id.asc()).all()
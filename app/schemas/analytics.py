@@ -0,0 +1,24 @@
+# app/schemas/analytics.py
+from pydantic import BaseModel
+from uuid import UUID
+from typing import Dict, List, Optional
+from datetime import date
+
+class CycleTimeSummary(BaseModel):
+    decisions: int
+    mean_seconds: Optional[float] = None
+    min_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
+    percentiles: Dict[str, Optional[float]] # e.g. {"p50": 5400.0, "p90": 86400.0}, within 1%
+
+class CycleTimeItem(CycleTimeSummary):
+    key_id: UUID
+    label: str
+
+class CycleTimeReport(BaseModel):
+    dimension: str # stage, approver, template
+    since: date
+    until: date
+    outcome: Optional[str] = None
+    overall: CycleTimeSummary
+    items: List[CycleTimeItem] # Slowest first
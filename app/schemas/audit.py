@@ -0,0 +1,35 @@
+# app/schemas/audit.py
+from pydantic import BaseModel, ConfigDict
+from uuid import UUID
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+
+class AuditLogResponse(BaseModel):
+    id: UUID
+    entity_id: UUID
+    entity_type: str
+    action: str
+    actor_id: Optional[UUID] = None
+    timestamp: Optional[datetime] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class AuditFeedEntryResponse(BaseModel):
+    # Pre-formatted row for the admin audit table
+    id: str
+    timestamp: str
+    actor: str
+    role: str
+    action: str
+    type: str
+    entity_id: str
+    desc: str
+
+
+class AuditSearchHit(AuditLogResponse):
+    rank: float
+    headline: str # Matching fragments wrapped in <mark>...</mark>
+
+class AuditSearchPage(BaseModel):
+    items: List[AuditSearchHit]
+    next_offset: Optional[int] = None
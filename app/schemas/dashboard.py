@@ -0,0 +1,8 @@
+# app/schemas/dashboard.py
+from pydantic import BaseModel
+
+class DashboardStatsResponse(BaseModel):
+    total_users: int
+    open_requests: int
+    overdue_approvals: int
+    completion_rate: str
@@ -1,7 +1,7 @@
 # app/schemas/submission.py
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 class FormSubmissionCreate(BaseModel):
@@ -15,9 +15,79 @@ class FormSubmissionResponse(BaseModel):
     submitter_id: UUID
     form_data: Dict[str, Any]
     status: str
+    current_stage_id: Optional[UUID] = None
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class SubmissionSearchRequest(BaseModel):
+    status: Optional[List[str]] = None
+    form_template_id: Optional[UUID] = None
+    department_id: Optional[UUID] = None # Submitter's department
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    # Same operators as workflow stage conditions, e.g. {"leave_days": {">": 5}, "category": {"IN": ["SICK"]}}
+    form_data: Dict[str, Dict[str, Any]] = {}
+    contains: Optional[Dict[str, Any]] = None # Raw JSONB containment, e.g. {"category": "SICK"}
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=500)
+
+class SubmissionSearchPage(BaseModel):
+    items: List[FormSubmissionResponse]
+    next_cursor: Optional[str] = None
+
+class InboxCountsResponse(BaseModel):
+    pending_approvals: int # "You have N pending approvals"
+    pending_requests: int # "M of your requests are pending"
+
+class SubmissionCreatedResponse(BaseModel):
+    message: str
+    submission_id: UUID
+    status: str
+
+class PendingApprovalResponse(BaseModel):
+    approval_request_id: UUID
+    submission_id: UUID
+    form_data: Dict[str, Any]
+    submitter: str
+    assigned_at: Optional[datetime] = None
+
+class DocumentDownloadResponse(BaseModel):
+    download_url: str
+    document_hash: str
+    expires_in_seconds: int
+
+class DocumentVerificationResponse(BaseModel):
+    document_hash: str
+    computed_hash: Optional[str] = None # None when the object is missing from storage
+    status: str # OK, MISMATCH, MISSING
+    valid: bool
+    size_bytes: int
+    verified_at: datetime
+
+class AttachmentUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str # Must be in ATTACHMENT_ALLOWED_TYPES; the upload is bound to it
+    size_bytes: int = Field(..., gt=0)
+
+class AttachmentUploadResponse(BaseModel):
+    attachment_id: UUID
+    # Multipart POST of `fields` plus the file to `upload_url` (MinIO enforces key, type and size)
+    upload_url: str
+    fields: Dict[str, str]
+    max_bytes: int
+    expires_in_seconds: int
+
+class AttachmentResponse(BaseModel):
+    id: UUID
+    filename: str
+    content_type: str
+    status: str # PENDING, UPLOADED, REJECTED
+    size_bytes: Optional[int] = None
+    content_hash: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    created_at: datetime
+    download_url: Optional[str] = None # Only for UPLOADED attachments; expires after an hour
+
 class ApprovalAction(BaseModel):
     action: str # "APPROVE", "REJECT"
     comments: Optional[str] = None
\ No newline at end of file
@@ -1,6 +1,7 @@
 # app/schemas/user.py
 from pydantic import BaseModel, EmailStr, ConfigDict
 from uuid import UUID
+from typing import List
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -14,4 +15,30 @@ class UserCreate(UserBase):
 class UserResponse(UserBase):
     id: UUID
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- Slim read models (plain str email: stored rows are not re-validated on the way out) ---
+class UserDirectoryResponse(BaseModel):
+    id: UUID
+    email: str
+    full_name: str
+    is_admin: bool
+    is_active: bool
+    model_config = ConfigDict(from_attributes=True)
+
+class UserDepartmentSummary(BaseModel):
+    id: UUID
+    name: str
+
+class UserPositionSummary(BaseModel):
+    position_id: UUID
+    title: str
+    role_type: str
+    department: UserDepartmentSummary
+
+class CurrentUserResponse(BaseModel):
+    id: UUID
+    email: str
+    full_name: str
+    is_admin: bool
+    positions: List[UserPositionSummary]
@@ -1,5 +1,5 @@
 # app/schemas/workflow.py
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -16,6 +16,7 @@ class FormTemplateCreate(FormTemplateBase):
 class FormTemplateResponse(FormTemplateBase):
     id: UUID
     is_active: bool
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
 # --- Workflow Stages ---
@@ -23,6 +24,10 @@ class WorkflowStageBase(BaseModel):
     stage_order: int
     required_role: str
     conditions: Optional[Dict[str, Any]] = None
+    sla_hours: Optional[int] = None
+    sla_action: str = "ESCALATE" # ESCALATE or REMIND
+    join_policy: str = "ALL" # ALL, ANY or QUORUM for stages sharing a stage_order
+    quorum: Optional[int] = None
 
 class WorkflowStageCreate(WorkflowStageBase):
     pass
@@ -42,4 +47,39 @@ class WorkflowCreate(WorkflowBase):
 class WorkflowResponse(WorkflowBase):
     id: UUID
     stages: List[WorkflowStageResponse]
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- Workflow Simulation ---
+class WorkflowSimulationRequest(BaseModel):
+    stages: List[WorkflowStageCreate] # The proposed stage set, same shape as POST /workflows
+    statuses: Optional[List[str]] = None # Default: every non-draft submission
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    top_approvers: int = Field(50, ge=1, le=1000)
+
+class SimulatedStage(BaseModel):
+    scenario: str # current or proposed
+    stage_order: int
+    required_role: str
+    conditions: Optional[Dict[str, Any]] = None
+    hits: int
+    hit_rate: float
+
+class SimulatedApproverLoad(BaseModel):
+    approver_id: UUID
+    name: str
+    current: int
+    proposed: int
+    delta: int
+
+class WorkflowSimulationResponse(BaseModel):
+    submissions: int
+    in_flight: int # Currently PENDING
+    changed: int # Routed through a different set of (stage_order, role) slots
+    changed_in_flight: int
+    changed_rate: float
+    auto_completed: Dict[str, int] # Submissions no stage applies to, per scenario
+    unresolved_approvals: Dict[str, int] # Routed stages with no approver in the submitter's chain
+    stages: List[SimulatedStage]
+    approver_load: List[SimulatedApproverLoad] # Largest changes first
+    seconds: float
@@ -0,0 +1,58 @@
+# app/services/archiver.py
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+
+from app.core.metrics import registry
+from app.repositories.archive_repo import ArchiveRepository
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_SUBMISSIONS = registry.counter(
+    "approveflow_archived_submissions_total", "Finished submissions moved from form_submissions to the archive."
+)
+
+class SubmissionArchiver:
+    """
+    Moves COMPLETED/REJECTED submissions with no activity for `older_than_days`, together with
+    their approval requests, into the archive tables, so the hot tables (and the indexes behind
+    the inbox, dashboard and search) only grow with live work.
+
+    Each batch is copied and deleted in one transaction on rows locked with SKIP LOCKED; a reader
+    sees a submission in exactly one of the two tables. Documents, attachments and the audit trail
+    stay where they are (they are keyed by submission id), so downloads and the timeline need no
+    fallback. Like the other background jobs, an advisory lock elects one node per run.
+    """
+
+    LOCK_NAME = "submission-archiver"
+
+    def __init__(self, session_factory, older_than_days: int = 180, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.older_than = timedelta(days=older_than_days)
+        self.batch_size = batch_size
+
+    def archive_once(self) -> int:
+        archived = 0
+        while True:
+            db = self.session_factory()
+            try:
+                if not db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(self.LOCK_NAME)))).scalar():
+                    db.rollback()
+                    break
+                now = datetime.utcnow()
+                repo = ArchiveRepository(db)
+                submission_ids = repo.lock_archivable(now - self.older_than, self.batch_size)
+                moved = repo.move(submission_ids, now) if submission_ids else 0
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            archived += moved
+            ARCHIVED_SUBMISSIONS.inc(moved)
+            if len(submission_ids) < self.batch_size:
+                break
+        if archived:
+            logger.info("Archived %d finished submissions", archived)
+        return archived
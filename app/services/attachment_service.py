@@ -0,0 +1,246 @@
+# app/services/attachment_service.py
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID, uuid4
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import registry, timed_segment
+from app.core.tracing import traced
+from app.models.audit import Attachment
+from app.models.organization import User
+from app.models.workflow import FormSubmission
+from app.repositories.attachment_repo import AttachmentRepository, attachment_object_key
+from app.repositories.submission_repo import SubmissionRepository
+from app.services.audit_service import AuditService
+from app.services.document_service import BUCKET_NAME, get_storage_client
+from app.services.integrity_service import hash_object
+
+logger = logging.getLogger(__name__)
+
+ATTACHABLE_STATUSES = ("DRAFT", "PENDING")
+ATTACHMENT_CONFIRMATIONS = registry.counter(
+    "approveflow_attachment_confirmations_total", "Attachment uploads checked after the fact, by outcome.", ("result",)
+)
+
+def allowed_content_types() -> List[str]:
+    return [value.strip() for value in settings.ATTACHMENT_ALLOWED_TYPES.split(",") if value.strip()]
+
+def storage_base_url() -> str:
+    scheme = "https" if settings.MINIO_SECURE else "http"
+    return f"{scheme}://{settings.MINIO_ENDPOINT}/{BUCKET_NAME}"
+
+def stat_or_none(client, object_key: str):
+    from minio.error import S3Error
+    try:
+        return client.stat_object(BUCKET_NAME, object_key)
+    except S3Error as exc:
+        if exc.code in ("NoSuchKey", "NoSuchObject", "NotFound"):
+            return None
+        raise
+
+class AttachmentService:
+    """
+    Attachments never pass through the API workers: the service signs an upload policy
+    (exact key, content type and a size range enforced by MinIO itself), the browser sends
+    the bytes to storage, and confirmation afterwards checks and hashes what actually landed.
+    There is deliberately no presigned PUT: it can't carry those conditions.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = AttachmentRepository(db)
+        self.audit_service = AuditService(db)
+
+    @traced("AttachmentService.create_upload")
+    def create_upload(self, submission_id: UUID, uploader_id: UUID, filename: str, content_type: str, size_bytes: int) -> dict:
+        submission = self.db.query(FormSubmission).filter(FormSubmission.id == submission_id).first()
+        if not submission:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        if submission.submitter_id != uploader_id:
+            raise HTTPException(status_code=403, detail="Only the submitter can attach files.")
+        if submission.status not in ATTACHABLE_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Cannot attach files to a {submission.status} submission.")
+        if content_type not in allowed_content_types():
+            raise HTTPException(status_code=415, detail=f"Content type must be one of: {', '.join(allowed_content_types())}")
+        if size_bytes <= 0 or size_bytes > settings.ATTACHMENT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Attachments are limited to {settings.ATTACHMENT_MAX_BYTES} bytes.")
+        if self.repo.count_active(submission_id) >= settings.ATTACHMENT_MAX_PER_SUBMISSION:
+            raise HTTPException(status_code=400, detail="Too many attachments on this submission.")
+
+        attachment_id = uuid4()
+        object_key = attachment_object_key(submission_id, attachment_id)
+        attachment = Attachment(
+            id=attachment_id,
+            submission_id=submission_id,
+            uploader_id=uploader_id,
+            filename=os.path.basename(filename.replace("\\", "/"))[:255] or "attachment",
+            content_type=content_type,
+            declared_size=size_bytes,
+            object_key=object_key,
+            status="PENDING"
+        )
+        self.db.add(attachment)
+
+        from minio.datatypes import PostPolicy
+        expires = timedelta(seconds=settings.ATTACHMENT_UPLOAD_EXPIRY_SECONDS)
+        policy = PostPolicy(BUCKET_NAME, datetime.utcnow() + expires)
+        policy.add_equals_condition("key", object_key)
+        policy.add_equals_condition("Content-Type", content_type)
+        # The declared size is only advisory; MinIO rejects anything above the configured maximum
+        policy.add_content_length_range_condition(1, settings.ATTACHMENT_MAX_BYTES)
+        client = get_storage_client()
+        with timed_segment("storage"):
+            fields = client.presigned_post_policy(policy)
+        self.db.commit()
+
+        return {
+            "attachment_id": attachment_id,
+            "upload_url": storage_base_url(),
+            "fields": {"key": object_key, "Content-Type": content_type, **fields},
+            "max_bytes": settings.ATTACHMENT_MAX_BYTES,
+            "expires_in_seconds": settings.ATTACHMENT_UPLOAD_EXPIRY_SECONDS
+        }
+
+    @traced("AttachmentService.confirm")
+    def confirm(self, attachment_id: UUID, expired_before: Optional[datetime] = None) -> Optional[str]:
+        """
+        Checks the stored object against the upload's rules and records the outcome.
+        A missing object leaves the attachment PENDING unless it was created before
+        `expired_before` (the upload window is over). Returns the new status, or None if untouched.
+        """
+        attachment = self.repo.lock_for_confirmation(attachment_id)
+        if attachment is None:
+            self.db.rollback()
+            return None
+
+        client = get_storage_client()
+        with timed_segment("storage"):
+            stat = stat_or_none(client, attachment.object_key)
+        if stat is None:
+            if expired_before is None or attachment.created_at >= expired_before:
+                self.db.rollback()
+                return None
+            return self._reject(attachment, "Upload never completed.")
+        if stat.size > settings.ATTACHMENT_MAX_BYTES:
+            return self._reject(attachment, "File exceeds the size limit.", client)
+        if (stat.content_type or "").split(";")[0].strip() != attachment.content_type:
+            return self._reject(attachment, f"Stored content type {stat.content_type!r} does not match the upload.", client)
+
+        # Streamed in chunks, so even the largest attachment costs one chunk of memory
+        content_hash, size = hash_object(attachment.object_key)
+        attachment.status = "UPLOADED"
+        attachment.size_bytes = size
+        attachment.content_hash = content_hash
+        attachment.confirmed_at = datetime.utcnow()
+        self.audit_service.log_action(
+            entity_id=attachment.submission_id,
+            entity_type="SUBMISSION",
+            action="ATTACHMENT_UPLOADED",
+            actor_id=attachment.uploader_id,
+            snapshot={
+                "attachment_id": str(attachment.id),
+                "filename": attachment.filename,
+                "size_bytes": size,
+                "content_hash": content_hash
+            }
+        )
+        self.db.commit()
+        ATTACHMENT_CONFIRMATIONS.inc(result="UPLOADED")
+        return "UPLOADED"
+
+    def _reject(self, attachment: Attachment, reason: str, client=None) -> str:
+        if client is not None:
+            # Don't keep bytes that broke the rules
+            client.remove_object(BUCKET_NAME, attachment.object_key)
+        attachment.status = "REJECTED"
+        attachment.rejection_reason = reason
+        attachment.confirmed_at = datetime.utcnow()
+        self.db.commit()
+        ATTACHMENT_CONFIRMATIONS.inc(result="REJECTED")
+        logger.info("Attachment %s rejected: %s", attachment.id, reason)
+        return "REJECTED"
+
+    def get_for_uploader(self, submission_id: UUID, attachment_id: UUID, uploader_id: UUID) -> Attachment:
+        attachment = self.repo.get(attachment_id)
+        if not attachment or attachment.submission_id != submission_id:
+            raise HTTPException(status_code=404, detail="Attachment not found")
+        if attachment.uploader_id != uploader_id:
+            raise HTTPException(status_code=403, detail="Not your attachment.")
+        return attachment
+
+    def list_attachments(self, submission_id: UUID, user: User) -> List[dict]:
+        """Attachment metadata, with a short-lived download link for confirmed uploads."""
+        if not user.is_admin and not SubmissionRepository(self.db).is_participant(submission_id, user.id):
+            raise HTTPException(status_code=403, detail="Only admins and the submission's participants can see its attachments.")
+        attachments = self.repo.list_for_submission(submission_id)
+        client = get_storage_client() if any(a.status == "UPLOADED" for a in attachments) else None
+        items = []
+        for attachment in attachments:
+            download_url = None
+            if attachment.status == "UPLOADED":
+                with timed_segment("storage"):
+                    download_url = client.presigned_get_object(
+                        BUCKET_NAME,
+                        attachment.object_key,
+                        expires=timedelta(hours=1),
+                        response_headers={"response-content-disposition": f'attachment; filename="{attachment.filename}"'}
+                    )
+            items.append({
+                "id": attachment.id,
+                "filename": attachment.filename,
+                "content_type": attachment.content_type,
+                "status": attachment.status,
+                "size_bytes": attachment.size_bytes,
+                "content_hash": attachment.content_hash,
+                "rejection_reason": attachment.rejection_reason,
+                "created_at": attachment.created_at,
+                "download_url": download_url
+            })
+        return items
+
+def confirm_attachment(session_factory, attachment_id: UUID) -> None:
+    """BackgroundTasks entry point: runs after the response is sent, on its own session."""
+    db = session_factory()
+    try:
+        AttachmentService(db).confirm(attachment_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Confirming attachment %s failed; the sweep will retry", attachment_id)
+    finally:
+        db.close()
+
+class AttachmentSweeper:
+    """
+    Confirms uploads the client never reported, and rejects the ones that never arrived.
+    Only attachments older than twice the upload window are considered, so an upload
+    started just before its policy expired has had time to finish.
+    """
+
+    def __init__(self, session_factory, upload_expiry_seconds: int, batch_size: int = 200):
+        self.session_factory = session_factory
+        self.window = timedelta(seconds=upload_expiry_seconds * 2)
+        self.batch_size = batch_size
+
+    def sweep_once(self) -> int:
+        expired_before = datetime.utcnow() - self.window
+        db = self.session_factory()
+        try:
+            pending = AttachmentRepository(db).pending_ids(expired_before, self.batch_size)
+            processed = 0
+            service = AttachmentService(db)
+            for attachment_id in pending:
+                try:
+                    if service.confirm(attachment_id, expired_before=expired_before):
+                        processed += 1
+                except Exception:
+                    db.rollback()
+                    logger.exception("Sweeping attachment %s failed", attachment_id)
+        finally:
+            db.close()
+        if processed:
+            logger.info("Attachment sweep settled %d uploads", processed)
+        return processed
@@ -1,109 +1,219 @@
 # app/services/document_service.py
 import hashlib
 import io
-from datetime import datetime, timedelta
+import logging
+import threading
+from datetime import timedelta
+from typing import Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from jinja2 import Environment, FileSystemLoader
-from xhtml2pdf import pisa
-from minio import Minio
 from fastapi import HTTPException
 
 from app.core.config import settings
-from app.models.audit import Document
-from app.models.workflow import FormSubmission
+from app.core.metrics import registry, timed_segment
+from app.core.tracing import span, traced
+from app.models.audit import Attachment, Document
+from app.models.organization import User
+from app.repositories.object_repo import StoredObjectRepository, content_addressed_key
+from app.repositories.submission_repo import SubmissionRepository
 from app.repositories.user_repo import UserRepository
 from app.services.audit_service import AuditService
 
+# xhtml2pdf (reportlab, Pillow...), minio and jinja2 are imported on first use, not at app import,
+# to keep cold starts fast on autoscaled workers.
+logger = logging.getLogger(__name__)
+
+BUCKET_NAME = "signed-documents"
+DOCUMENT_ACTIONS = ("DOCUMENT_GENERATED", "DOCUMENT_REGENERATED")
+DOCUMENT_UPLOADS = registry.counter(
+    "approveflow_document_uploads_total", "Final document stores by outcome (uploaded or deduplicated).", ("result",)
+)
+_storage_lock = threading.Lock()
+_minio_client = None
+_bucket_ready = False
+_jinja_env = None
+
+def get_storage_client():
+    """Process-wide MinIO client. The bucket check runs once per process instead of per DocumentService()."""
+    global _minio_client, _bucket_ready
+    if _bucket_ready:
+        return _minio_client
+    with _storage_lock:
+        if _minio_client is None:
+            from minio import Minio
+            _minio_client = Minio(
+                settings.MINIO_ENDPOINT,
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=settings.MINIO_SECURE
+            )
+        if not _bucket_ready:
+            with timed_segment("storage"):
+                if not _minio_client.bucket_exists(BUCKET_NAME):
+                    _minio_client.make_bucket(BUCKET_NAME)
+            _bucket_ready = True
+    return _minio_client
+
+def object_exists(client, object_key: str, size_bytes: int) -> bool:
+    """HEAD the object; a size mismatch (e.g. a truncated earlier upload) counts as missing."""
+    from minio.error import S3Error
+    try:
+        stat = client.stat_object(BUCKET_NAME, object_key)
+    except S3Error as exc:
+        if exc.code in ("NoSuchKey", "NoSuchObject", "NotFound"):
+            return False
+        raise
+    return stat.size == size_bytes
+
+def render_pdf(template_data: dict) -> bytes:
+    """Template data -> PDF bytes. Pure CPU, no DB or storage access, so it can run in a worker process."""
+    with span("document.render_template"):
+        template = get_template_env().get_template("document_template.html")
+        html_content = template.render(**template_data)
+
+    from xhtml2pdf import pisa
+    from reportlab import rl_config
+    rl_config.invariant = 1 # No creation timestamp or random document ID: same input, same bytes
+    pdf_file = io.BytesIO()
+    with span("document.create_pdf"), timed_segment("pdf"):
+        pisa_status = pisa.CreatePDF(html_content, dest=pdf_file)
+    if pisa_status.err:
+        raise HTTPException(status_code=500, detail="Failed to generate PDF document")
+    return pdf_file.getvalue()
+
+def get_template_env():
+    global _jinja_env
+    if _jinja_env is None:
+        from jinja2 import Environment, FileSystemLoader
+        _jinja_env = Environment(loader=FileSystemLoader("app/templates"))
+    return _jinja_env
+
+def warm_up_storage() -> None:
+    """Startup hook: connect to object storage and pre-import the PDF stack off the request path."""
+    try:
+        get_storage_client()
+    except Exception:
+        logger.warning("Object storage warm-up failed; will retry on first use", exc_info=True)
+    from xhtml2pdf import pisa  # noqa: F401
+
 class DocumentService:
     def __init__(self, db: Session):
         self.db = db
         self.audit_service = AuditService(db)
         self.user_repo = UserRepository(db)
-        self.bucket_name = "signed-documents"
-        
-        # Initialize MinIO Client
-        self.minio_client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
-        )
-        
-        # Ensure bucket exists
-        if not self.minio_client.bucket_exists(self.bucket_name):
-            self.minio_client.make_bucket(self.bucket_name)
+        self.bucket_name = BUCKET_NAME
+
+    @property
+    def minio_client(self):
+        return get_storage_client()
 
-        # Setup Jinja2 HTML Templates
-        self.jinja_env = Environment(loader=FileSystemLoader("app/templates"))
+    @property
+    def jinja_env(self):
+        return get_template_env()
 
+    @traced("DocumentService.generate_final_document")
     def generate_final_document(self, submission_id: UUID) -> Document:
         """Generates a tamper-evident PDF and uploads to MinIO."""
-        
-        # 1. Gather all necessary data
-        submission = self.db.query(FormSubmission).filter(FormSubmission.id == submission_id).first()
+        template_data = self.build_template_data(submission_id)
+        pdf_bytes = render_pdf(template_data)
+        document_record, _ = self.store_pdf(submission_id, pdf_bytes)
+        return document_record
+
+    def build_template_data(self, submission_id: UUID) -> dict:
+        """Everything the PDF template needs, as plain data (picklable for the backfill's render pool)."""
+        # Archived submissions can still be re-rendered (e.g. by the regeneration CLI)
+        submission = SubmissionRepository(self.db).get_submission(submission_id)
         if not submission:
             raise HTTPException(status_code=404, detail="Submission not found")
             
         submitter = self.user_repo.get_by_id(submission.submitter_id)
-        audit_trail = self.audit_service.get_timeline_for_submission(submission_id)
+        # The document attests the decisions, not its own generation, so regenerating
+        # unchanged content yields identical bytes (and the same storage object)
+        audit_trail = [
+            log for log in self.audit_service.get_timeline_for_submission(submission_id)
+            if log.action not in DOCUMENT_ACTIONS
+        ]
+        actor_ids = {log.actor_id for log in audit_trail if log.actor_id}
+        actor_names = {
+            user.id: user.full_name
+            for user in self.db.query(User).filter(User.id.in_(actor_ids)).all()
+        } if actor_ids else {}
 
-        # 2. Prepare data for the template
-        template_data = {
+        # Confirmed attachments are listed by hash, so the seal covers their exact bytes
+        attachments = self.db.query(Attachment).filter(
+            Attachment.submission_id == submission_id,
+            Attachment.status == "UPLOADED"
+        ).order_by(Attachment.created_at.asc(), Attachment.id.asc()).all()
+
+        return {
             "submission_id": str(submission.id),
             "created_at": submission.created_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
             "submitter_name": submitter.full_name,
             "submitter_email": submitter.email,
             "form_data": submission.form_data,
+            "attachments": [
+                {
+                    "filename": attachment.filename,
+                    "content_type": attachment.content_type,
+                    "size_bytes": attachment.size_bytes,
+                    "content_hash": attachment.content_hash,
+                } for attachment in attachments
+            ],
             "audit_trail": [
                 {
                     "action": log.action,
                     "timestamp": log.timestamp.strftime("%Y-%m-%d %H:%M:%S UTC"),
-                    "actor_name": self.user_repo.get_by_id(log.actor_id).full_name if log.actor_id else "System",
+                    "actor_name": actor_names.get(log.actor_id, "System") if log.actor_id else "System",
                 } for log in audit_trail
             ]
         }
 
-        # 3. Render HTML and Convert to PDF
-        template = self.jinja_env.get_template("document_template.html")
-        html_content = template.render(**template_data)
-        
-        pdf_file = io.BytesIO()
-        pisa_status = pisa.CreatePDF(html_content, dest=pdf_file)
-        if pisa_status.err:
-            raise HTTPException(status_code=500, detail="Failed to generate PDF document")
-        pdf_bytes = pdf_file.getvalue()
-
-        # 4. Cryptographic Hashing for Tamper Evidence
+    def store_pdf(self, submission_id: UUID, pdf_bytes: bytes, action: str = "DOCUMENT_GENERATED") -> Tuple[Document, bool]:
+        """
+        Stores the PDF content-addressed, points the submission's document at it and commits.
+        Returns (document, uploaded); uploaded is False when storage already held the bytes.
+        """
+        # Cryptographic Hashing for Tamper Evidence (the hash is also the storage address)
         doc_hash = hashlib.sha256(pdf_bytes).hexdigest()
+        object_key = content_addressed_key(doc_hash)
 
-        # 5. Upload to MinIO
-        object_key = f"{datetime.utcnow().year}/{datetime.utcnow().month}/{submission_id}.pdf"
-        self.minio_client.put_object(
-            bucket_name=self.bucket_name,
-            object_name=object_key,
-            data=io.BytesIO(pdf_bytes),
-            length=len(pdf_bytes),
-            content_type="application/pdf"
-        )
+        # Reference the blob first: the row lock keeps the GC away until we commit
+        object_repo = StoredObjectRepository(self.db)
+        object_repo.acquire(doc_hash, object_key, len(pdf_bytes))
 
-        # 6. Save Record to Database
-        document_record = Document(
-            submission_id=submission_id,
-            minio_object_key=object_key,
-            document_hash=doc_hash
-        )
-        self.db.add(document_record)
+        # Upload only bytes storage doesn't already hold (retries and identical regenerations are free)
+        with span("document.upload", object_key=object_key, size=len(pdf_bytes)), timed_segment("storage"):
+            uploaded = not object_exists(self.minio_client, object_key, len(pdf_bytes))
+            if uploaded:
+                self.minio_client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_key,
+                    data=io.BytesIO(pdf_bytes),
+                    length=len(pdf_bytes),
+                    content_type="application/pdf"
+                )
+        DOCUMENT_UPLOADS.inc(result="uploaded" if uploaded else "deduplicated")
+
+        # One document per submission; a regeneration repoints it
+        document_record = self.db.query(Document).filter(Document.submission_id == submission_id).first()
+        if document_record is None:
+            document_record = Document(submission_id=submission_id)
+            self.db.add(document_record)
+        elif document_record.document_hash:
+            object_repo.release(document_record.document_hash)
+        document_record.minio_object_key = object_key
+        document_record.document_hash = doc_hash
         
-        # 7. Log the generation
+        # Log the generation
         self.audit_service.log_action(
             entity_id=submission_id,
             entity_type="SUBMISSION",
-            action="DOCUMENT_GENERATED"
+            action=action,
+            snapshot={"document_hash": doc_hash} if action != "DOCUMENT_GENERATED" else None
         )
         
         self.db.commit()
-        return document_record
+        return document_record, uploaded
 
     def get_presigned_download_url(self, submission_id: UUID) -> dict:
         """Generates a secure, temporary download link for the frontend."""
@@ -112,11 +222,12 @@ class DocumentService:
             raise HTTPException(status_code=404, detail="Document not generated yet.")
 
         # URL expires in 1 hour
-        url = self.minio_client.presigned_get_object(
-            bucket_name=self.bucket_name,
-            object_name=document.minio_object_key,
-            expires=timedelta(hours=1)
-        )
+        with timed_segment("storage"):
+            url = self.minio_client.presigned_get_object(
+                bucket_name=self.bucket_name,
+                object_name=document.minio_object_key,
+                expires=timedelta(hours=1)
+            )
         
         return {
             "download_url": url,
@@ -0,0 +1,148 @@
+# app/services/form_schema.py
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+class FormSchemaError(ValueError):
+    """The template's form_schema uses something the compiler cannot translate."""
+
+class FormDataInvalid(ValueError):
+    """Raised with one entry per failing field, shaped like FastAPI's own 422 errors."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid field(s)")
+        self.errors = errors
+
+JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+# JSON Schema keyword -> pydantic Field constraint
+CONSTRAINTS = {
+    "minimum": "ge",
+    "maximum": "le",
+    "exclusiveMinimum": "gt",
+    "exclusiveMaximum": "lt",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minItems": "min_length",
+    "maxItems": "max_length",
+    "pattern": "pattern",
+}
+
+def _field_type(name: str, spec: Dict[str, Any]) -> Any:
+    if "enum" in spec:
+        values = spec["enum"]
+        if not isinstance(values, list) or not values:
+            raise FormSchemaError(f"'{name}': enum must be a non-empty list")
+        return Literal[tuple(values)]
+
+    if "type" not in spec:
+        return Any # Untyped properties took any value before schemas were compiled; they still do
+    json_type = spec["type"]
+    if isinstance(json_type, list): # e.g. ["integer", "null"]
+        nullable = "null" in json_type
+        json_type = next((t for t in json_type if t != "null"), "string")
+    else:
+        nullable = False
+    if json_type not in JSON_TYPES:
+        raise FormSchemaError(f"'{name}': unsupported type '{json_type}'")
+
+    python_type = JSON_TYPES[json_type]
+    return Optional[python_type] if nullable else python_type
+
+def _field_constraints(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    constraints = {}
+    for keyword, argument in CONSTRAINTS.items():
+        if keyword in spec:
+            constraints[argument] = spec[keyword]
+    if "pattern" in constraints:
+        try:
+            re.compile(constraints["pattern"])
+        except re.error as exc:
+            raise FormSchemaError(f"'{name}': invalid pattern ({exc})") from exc
+    return constraints
+
+def compile_form_schema(form_schema: Dict[str, Any]) -> type[BaseModel]:
+    """
+    Translates the subset of JSON Schema the form builder emits (properties, required,
+    type, enum, numeric/length bounds, pattern) into a pydantic model, so validation runs
+    in pydantic-core instead of re-walking the schema for every submission.
+    """
+    properties = form_schema.get("properties") or {}
+    required = set(form_schema.get("required") or [])
+    # Fields the template doesn't describe are kept as-is unless the schema closes the object
+    extra = "forbid" if form_schema.get("additionalProperties") is False else "allow"
+
+    # Property names are data, not identifiers: pydantic rejects leading underscores and reserves
+    # names like model_config, so every field gets a positional name and the property as its alias
+    fields = {}
+    for index, (name, spec) in enumerate(properties.items()):
+        if not isinstance(spec, dict):
+            raise FormSchemaError(f"'{name}': property definition must be an object")
+        field_type = _field_type(name, spec)
+        constraints = _field_constraints(name, spec)
+        if name in required:
+            fields[f"field_{index}"] = (field_type, Field(..., alias=name, **constraints))
+        else:
+            fields[f"field_{index}"] = (Optional[field_type], Field(spec.get("default"), alias=name, **constraints))
+
+    try:
+        return create_model("FormData", __config__=ConfigDict(extra=extra), **fields)
+    except (TypeError, ValueError, NameError) as exc:
+        raise FormSchemaError(str(exc)) from exc
+
+class FormValidatorCache:
+    """Compiled validators keyed by (template id, template version), bounded LRU."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._compiled: "OrderedDict[Tuple[UUID, int], type[BaseModel]]" = OrderedDict()
+
+    def get(self, template_id: UUID, version: int, form_schema: Dict[str, Any]) -> type[BaseModel]:
+        key = (template_id, version)
+        with self._lock:
+            model = self._compiled.get(key)
+            if model is not None:
+                self._compiled.move_to_end(key)
+                return model
+
+        # Compile outside the lock; a concurrent duplicate compile is harmless
+        model = compile_form_schema(form_schema)
+        with self._lock:
+            for stale in [k for k in self._compiled if k[0] == template_id and k[1] != version]:
+                del self._compiled[stale]
+            self._compiled[key] = model
+            while len(self._compiled) > self.max_size:
+                self._compiled.popitem(last=False)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+form_validators = FormValidatorCache()
+
+def validate_form_data(template_id: UUID, version: int, form_schema: Dict[str, Any], form_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Coerces `form_data` against the template schema (e.g. "5" -> 5 for integer fields) and
+    returns the JSON-ready result. Raises FormDataInvalid listing every failing field.
+    """
+    model = form_validators.get(template_id, version, form_schema)
+    try:
+        validated = model.model_validate(form_data)
+    except ValidationError as exc:
+        raise FormDataInvalid([
+            {"loc": ["form_data", *error["loc"]], "msg": error["msg"], "type": error["type"]}
+            for error in exc.errors(include_url=False)
+        ]) from exc
+    return validated.model_dump(mode="json", by_alias=True, exclude_unset=True)
@@ -0,0 +1,68 @@
+# app/services/inbox_reconciler.py
+import logging
+from datetime import datetime
+from sqlalchemy import func, select
+
+from app.core.metrics import registry
+from app.repositories.inbox_repo import InboxCounterRepository
+
+logger = logging.getLogger(__name__)
+
+INBOX_COUNTER_DRIFT = registry.counter(
+    "approveflow_inbox_counter_drift_total", "Inbox badge counters corrected by the reconciler.", ("counter",)
+)
+
+class InboxCounterReconciler:
+    """
+    Recounts every user's badge counters from the source tables and fixes the ones that drifted
+    (bulk updates that bypass the ORM, manual SQL, counters created before the hook existed).
+
+    Counter rows are locked before counting, so a transaction that has already bumped a counter
+    is committed (and therefore counted) first, and one that bumps it afterwards waits and applies
+    its delta on top of the corrected value. Like the storage GC, an advisory lock elects one node.
+    """
+
+    LOCK_NAME = "inbox-counter-reconcile"
+
+    def __init__(self, session_factory, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    def reconcile_once(self) -> int:
+        corrected, after = 0, None
+        while True:
+            db = self.session_factory()
+            try:
+                if not db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(self.LOCK_NAME)))).scalar():
+                    db.rollback()
+                    return corrected
+                repo = InboxCounterRepository(db)
+                user_ids = repo.user_id_batch(after, self.batch_size)
+                if not user_ids:
+                    db.rollback()
+                    break
+                counters = repo.lock_counters(user_ids)
+                now = datetime.utcnow()
+                for user_id, (approvals, requests) in repo.count_actual(user_ids).items():
+                    counter = counters[user_id]
+                    if counter.pending_approvals != approvals:
+                        INBOX_COUNTER_DRIFT.inc(counter="pending_approvals")
+                        counter.pending_approvals = approvals
+                    if counter.pending_requests != requests:
+                        INBOX_COUNTER_DRIFT.inc(counter="pending_requests")
+                        counter.pending_requests = requests
+                    if counter in db.dirty:
+                        counter.updated_at = now
+                        corrected += 1
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            after = user_ids[-1]
+            if len(user_ids) < self.batch_size:
+                break
+        if corrected:
+            logger.warning("Inbox counter reconciliation corrected %d users", corrected)
+        return corrected
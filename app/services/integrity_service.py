@@ -0,0 +1,239 @@
+# app/services/integrity_service.py
+import hashlib
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+
+from app.core.metrics import registry, timed_segment
+from app.core.tracing import traced
+from app.models.audit import Document, StoredObject
+from app.models.organization import User
+from app.repositories.submission_repo import SubmissionRepository
+from app.services.audit_service import AuditService
+from app.services.document_service import BUCKET_NAME, get_storage_client
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+VERIFIED_OBJECTS = registry.counter(
+    "approveflow_integrity_verified_total", "Stored objects re-hashed, by result.", ("result",)
+)
+VERIFIED_BYTES = registry.counter(
+    "approveflow_integrity_verified_bytes_total", "Bytes streamed from object storage for verification."
+)
+VERIFY_SECONDS = registry.histogram(
+    "approveflow_integrity_verify_seconds", "Time to stream and hash one stored object."
+)
+
+class VerificationResult(NamedTuple):
+    expected_hash: str
+    computed_hash: Optional[str]
+    size_bytes: int
+    status: str # OK, MISMATCH, MISSING
+    seconds: float
+
+def hash_object(object_key: str, chunk_size: int = CHUNK_SIZE):
+    """Streams the object and hashes it chunk by chunk; memory use is one chunk, whatever the size."""
+    response = get_storage_client().get_object(BUCKET_NAME, object_key)
+    digest, size = hashlib.sha256(), 0
+    try:
+        for chunk in response.stream(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    finally:
+        response.close()
+        response.release_conn()
+    return digest.hexdigest(), size
+
+def verify_object(object_key: str, expected_hash: str) -> VerificationResult:
+    """Pure storage work (no DB session), so it is safe to run on scanner threads."""
+    from minio.error import S3Error
+    start = time.perf_counter()
+    try:
+        with timed_segment("storage"):
+            computed, size = hash_object(object_key)
+        status = "OK" if computed == expected_hash else "MISMATCH"
+    except S3Error as exc:
+        if exc.code not in ("NoSuchKey", "NoSuchObject", "NotFound"):
+            raise
+        computed, size, status = None, 0, "MISSING"
+    elapsed = time.perf_counter() - start
+
+    VERIFIED_OBJECTS.inc(result=status)
+    VERIFIED_BYTES.inc(size)
+    VERIFY_SECONDS.observe(elapsed)
+    return VerificationResult(expected_hash, computed, size, status, elapsed)
+
+def record_results(db: Session, results: List[VerificationResult], verified_at: datetime) -> None:
+    """
+    Stamps verified_at/status. A failure is audited (once per document) only when it changes the
+    object's status, e.g. OK -> MISMATCH, so repeated checks of a known-bad object add no rows.
+    """
+    # Locked, so a scan and an on-demand check racing on one object can't both see the transition
+    previous = dict(db.query(StoredObject.content_hash, StoredObject.verification_status).filter(
+        StoredObject.content_hash.in_([result.expected_hash for result in results])
+    ).order_by(StoredObject.content_hash).with_for_update().all())
+    for result in results:
+        values = {StoredObject.verified_at: verified_at, StoredObject.verification_status: result.status}
+        if result.status == "OK":
+            values[StoredObject.size_bytes] = result.size_bytes # Fills in rows backfilled from legacy documents
+        db.query(StoredObject).filter(StoredObject.content_hash == result.expected_hash).update(
+            values, synchronize_session=False
+        )
+
+    failed = {
+        result.expected_hash: result for result in results
+        if result.status != "OK" and previous.get(result.expected_hash) != result.status
+    }
+    if failed:
+        audit_service = AuditService(db)
+        for document in db.query(Document).filter(Document.document_hash.in_(list(failed))).all():
+            result = failed[document.document_hash]
+            logger.error("Integrity check failed for document %s (%s)", document.id, result.status)
+            audit_service.log_action(
+                entity_id=document.submission_id,
+                entity_type="SUBMISSION",
+                action="INTEGRITY_FAILED",
+                snapshot={
+                    "document_id": str(document.id),
+                    "status": result.status,
+                    "expected_hash": result.expected_hash,
+                    "computed_hash": result.computed_hash
+                }
+            )
+
+class IntegrityService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @traced("IntegrityService.verify_document")
+    def verify_document(self, submission_id: UUID, user: User) -> dict:
+        """Re-hashes the submission's stored PDF against the hash recorded when it was generated."""
+        if not user.is_admin and not SubmissionRepository(self.db).is_participant(submission_id, user.id):
+            raise HTTPException(status_code=403, detail="Only admins and the submission's participants can verify it.")
+        document = self.db.query(Document).filter(Document.submission_id == submission_id).first()
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not generated yet.")
+
+        result = verify_object(document.minio_object_key, document.document_hash)
+        verified_at = datetime.utcnow()
+        record_results(self.db, [result], verified_at)
+        self.db.commit()
+        return {
+            "document_hash": result.expected_hash,
+            "computed_hash": result.computed_hash,
+            "status": result.status,
+            "valid": result.status == "OK",
+            "size_bytes": result.size_bytes,
+            "verified_at": verified_at
+        }
+
+class IntegrityScanner:
+    """
+    Verifies the whole store incrementally: never-verified objects first, then those last
+    verified before `reverify_after`. Objects are hashed on a bounded thread pool with at most
+    `workers * 2` in flight, and results are written back in batches.
+    """
+
+    def __init__(self, session_factory, workers: int = 8, batch_size: int = 200, reverify_after_seconds: int = 7 * 86400):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.reverify_after = timedelta(seconds=reverify_after_seconds)
+
+    def _next_batch(self, cutoff: datetime, after: Tuple[Optional[datetime], str]) -> List[tuple]:
+        """
+        Keyset page in (verified_at NULLS FIRST, content_hash) order, in two phases that each walk
+        ix_stored_objects_verification: never-verified objects (after[0] is None), then the ones
+        last verified before the cutoff.
+        """
+        verified_at, content_hash = after
+        db = self.session_factory()
+        try:
+            query = db.query(StoredObject.content_hash, StoredObject.object_key, StoredObject.verified_at)
+            if verified_at is None:
+                query = query.filter(StoredObject.verified_at.is_(None), StoredObject.content_hash > content_hash)
+            else:
+                query = query.filter(
+                    StoredObject.verified_at < cutoff,
+                    tuple_(StoredObject.verified_at, StoredObject.content_hash) > tuple_(verified_at, content_hash)
+                )
+            return query.order_by(
+                StoredObject.verified_at.asc(), StoredObject.content_hash.asc()
+            ).limit(self.batch_size).all()
+        finally:
+            db.close()
+
+    def _flush(self, results: List[VerificationResult]) -> None:
+        if not results:
+            return
+        db = self.session_factory()
+        try:
+            record_results(db, results, datetime.utcnow())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def scan(self, limit: Optional[int] = None) -> Dict:
+        started = time.perf_counter()
+        # Anything verified after the scan began is skipped via the cutoff, so a scan always terminates
+        cutoff = datetime.utcnow() - self.reverify_after
+        stats = {"objects": 0, "bytes": 0, "OK": 0, "MISMATCH": 0, "MISSING": 0, "errors": 0}
+        pending_results: List[VerificationResult] = []
+        after: Tuple[Optional[datetime], str] = (None, "")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="integrity") as pool:
+            in_flight = set()
+            while limit is None or stats["objects"] + len(in_flight) < limit:
+                batch = self._next_batch(cutoff, after)
+                if not batch:
+                    if after[0] is None:
+                        after = (datetime.min, "") # Never-verified objects done; on to the stale ones
+                        continue
+                    break
+                after = (batch[-1][2], batch[-1][0])
+                for content_hash, object_key, _ in batch:
+                    if limit is not None and stats["objects"] + len(in_flight) >= limit:
+                        break
+                    if len(in_flight) >= self.workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        self._collect(done, stats, pending_results)
+                    in_flight.add(pool.submit(verify_object, object_key, content_hash))
+                if len(pending_results) >= self.batch_size:
+                    self._flush(pending_results)
+                    pending_results = []
+            done, _ = wait(in_flight)
+            self._collect(done, stats, pending_results)
+        self._flush(pending_results)
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 2)
+        stats["objects_per_second"] = round(stats["objects"] / elapsed, 1) if elapsed else 0.0
+        stats["mb_per_second"] = round(stats["bytes"] / elapsed / 1e6, 2) if elapsed else 0.0
+        if stats["objects"]:
+            logger.info("Integrity scan: %s", stats)
+        return stats
+
+    @staticmethod
+    def _collect(done, stats: Dict, pending_results: List[VerificationResult]) -> None:
+        for future in done:
+            try:
+                result = future.result()
+            except Exception:
+                logger.exception("Integrity verification failed")
+                stats["errors"] += 1
+                continue
+            stats["objects"] += 1
+            stats["bytes"] += result.size_bytes
+            stats[result.status] += 1
+            pending_results.append(result)
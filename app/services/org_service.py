@@ -1,8 +1,11 @@
 # app/services/org_service.py
 from uuid import UUID
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.reference_cache import reference_cache
+from app.core.tracing import traced
 from app.repositories.hierarchy_repo import HierarchyRepository
 
 class OrgService:
@@ -10,6 +13,7 @@ class OrgService:
         self.db = db
         self.repo = HierarchyRepository(db)
 
+    @traced("OrgService.get_approver_for_user")
     def get_approver_for_user(self, submitter_id: UUID, required_role: str) -> UUID:
         """
         Dynamically resolves 'Who should approve this?'
@@ -24,9 +28,9 @@ class OrgService:
         # We assume a primary position for simplicity here
         starting_position_id = user_positions[0].id
 
-        # 2. Get the entire chain up to the CEO (Using the Recursive CTE)
-        # The repo returns the chain ordered from bottom (submitter) to top
-        ancestor_positions = self.repo.get_ancestor_positions(starting_position_id)
+        # 2. Get the entire chain up to the CEO (the cached org tree, or the Recursive CTE)
+        # ordered from bottom (submitter) to top
+        ancestor_positions = reference_cache.ancestor_positions(self.db, starting_position_id)
 
         # 3. Find the nearest ancestor matching the required role
         for pos in ancestor_positions:
@@ -45,4 +49,23 @@ class OrgService:
         raise HTTPException(
             status_code=404, 
             detail=f"No ancestor with role '{required_role}' found in the submitter's reporting chain."
-        )
\ No newline at end of file
+        )
+
+    @traced("OrgService.get_escalation_target")
+    def get_escalation_target(self, approver_id: UUID) -> Optional[UUID]:
+        """
+        Finds who an overdue approval escalates to: the nearest position above the
+        current approver's that is actually staffed. Returns None at the top of the tree.
+        """
+        approver_positions = self.repo.get_user_positions(approver_id)
+        if not approver_positions:
+            return None
+
+        ancestors = reference_cache.ancestor_positions(self.db, approver_positions[0].id)
+        for pos in ancestors:
+            if pos.id == approver_positions[0].id:
+                continue # The CTE includes the starting position itself
+            users_in_position = self.repo.get_users_by_position(pos.id)
+            if users_in_position:
+                return users_in_position[0].id
+        return None
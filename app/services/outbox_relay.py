@@ -0,0 +1,156 @@
+# app/services/outbox_relay.py
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.tracing import inject_trace_headers
+from app.models.outbox import OutboxEvent
+from app.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+def serialize_event(event: OutboxEvent) -> Dict[str, Any]:
+    return {
+        "id": event.id,
+        "event_type": event.event_type,
+        "aggregate_id": str(event.aggregate_id),
+        "payload": event.payload,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }
+
+class OutboxSink:
+    """A downstream destination. `deliver` must raise on failure so the cursor does not move."""
+    name: str = "sink"
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+class WebhookSink(OutboxSink):
+    """POSTs each batch as JSON; receivers should de-duplicate on event id (at-least-once)."""
+
+    def __init__(self, url: str, timeout: float = 10.0, name: str = "webhook"):
+        self.url = url
+        self.timeout = timeout
+        self.name = name
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        import requests
+        response = requests.post(
+            self.url, json={"events": events}, headers=inject_trace_headers({}), timeout=self.timeout
+        )
+        response.raise_for_status()
+
+class FileSink(OutboxSink):
+    """Appends events as JSON lines, fsync'd per batch."""
+
+    def __init__(self, path: str, name: str = "file"):
+        self.path = path
+        self.name = name
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            for event in events:
+                handle.write(json.dumps(event, default=str) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+class InProcessSink(OutboxSink):
+    """Fans batches out to callbacks registered inside this process."""
+
+    def __init__(self, name: str = "in_process"):
+        self.name = name
+        self._subscribers: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(events)
+
+# Application code registers in-process consumers here
+outbox_subscribers = InProcessSink()
+
+class OutboxRelay:
+    """
+    Publishes the outbox to every sink in commit order, in batches, with one cursor per sink.
+    Delivery is at-least-once: the cursor only advances after the sink accepted the batch.
+    """
+
+    def __init__(self, session_factory, sinks: List[OutboxSink], batch_size: int = 500):
+        self.session_factory = session_factory
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.batch_size = batch_size
+
+    def relay_once(self) -> int:
+        delivered = 0
+        for sink in self.sinks.values():
+            try:
+                # Keep draining while batches come back full, so a backlog clears in one pass
+                while True:
+                    count = self._relay_sink(sink)
+                    delivered += count
+                    if count < self.batch_size:
+                        break
+            except Exception:
+                logger.exception("Outbox delivery to sink '%s' failed, will retry", sink.name)
+        return delivered
+
+    def _relay_sink(self, sink: OutboxSink) -> int:
+        db = self.session_factory()
+        try:
+            # One relay per sink across all nodes; others skip this pass instead of waiting
+            locked = db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(f"outbox:{sink.name}")))).scalar()
+            if not locked:
+                return 0
+
+            repo = OutboxRepository(db)
+            cursor = repo.lock_cursor(sink.name)
+            events = repo.get_events_after(cursor, self.batch_size)
+            if not events:
+                db.commit()
+                return 0
+
+            sink.deliver([serialize_event(event) for event in events])
+            cursor.last_transaction_id = events[-1].transaction_id
+            cursor.last_event_id = events[-1].id
+            db.commit()
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def replay(self, sink_name: str, from_event_id: Optional[int] = None) -> None:
+        """Rewinds one sink so subsequent passes re-deliver from `from_event_id` (or from the start)."""
+        if sink_name not in self.sinks:
+            raise ValueError(f"Unknown outbox sink: {sink_name}")
+        db = self.session_factory()
+        try:
+            OutboxRepository(db).rewind_cursor(sink_name, from_event_id)
+            db.commit()
+        finally:
+            db.close()
+
+def build_outbox_relay() -> OutboxRelay:
+    from app.core.database import SessionLocal
+
+    sinks: List[OutboxSink] = [outbox_subscribers]
+    if settings.OUTBOX_WEBHOOK_URL:
+        sinks.append(WebhookSink(settings.OUTBOX_WEBHOOK_URL))
+    if settings.OUTBOX_FILE_PATH:
+        sinks.append(FileSink(settings.OUTBOX_FILE_PATH))
+    return OutboxRelay(SessionLocal, sinks, batch_size=settings.OUTBOX_BATCH_SIZE)
@@ -0,0 +1,147 @@
+# app/services/sla_scheduler.py
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.inbox_broker import inbox_broker
+from app.models.workflow import ApprovalRequest, WorkflowStage
+from app.repositories.outbox_repo import OutboxRepository
+from app.repositories.submission_repo import SubmissionRepository
+from app.services.audit_service import AuditService
+from app.services.org_service import OrgService
+
+logger = logging.getLogger(__name__)
+
+class SlaScheduler:
+    """
+    Escalates or reminds on overdue approvals.
+
+    Only the approvals due within the next `horizon` are held in memory, in a min-heap keyed by
+    due_at and refilled through the partial index on approval_requests(due_at). Millions of pending
+    rows cost nothing until they approach their deadline, and no pass ever scans the table.
+    Any number of nodes can run the scheduler: a transaction-scoped advisory lock elects one
+    processor per tick and rows are locked with SKIP LOCKED.
+    """
+
+    LOCK_NAME = "sla-scheduler"
+
+    def __init__(self, session_factory, horizon_seconds: int = 300, refresh_seconds: int = 60, max_loaded: int = 10000):
+        self.session_factory = session_factory
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.refresh = timedelta(seconds=refresh_seconds)
+        self.max_loaded = max_loaded
+        self._heap: List[Tuple[datetime, UUID]] = []
+        self._loaded_until: Optional[datetime] = None
+        self._loaded_at: Optional[datetime] = None
+
+    def tick(self) -> int:
+        now = datetime.utcnow()
+        if self._needs_refill(now):
+            self._refill(now)
+
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            due_ids.append(heapq.heappop(self._heap)[1])
+        if not due_ids:
+            return 0
+        return self._process(due_ids, now)
+
+    def _needs_refill(self, now: datetime) -> bool:
+        if self._loaded_until is None:
+            return True
+        # Reload when we run out of window, and periodically to pick up rows created by other nodes
+        return now >= self._loaded_until or now - self._loaded_at >= self.refresh
+
+    def _refill(self, now: datetime) -> None:
+        db = self.session_factory()
+        try:
+            rows = SubmissionRepository(db).get_due_approvals(now + self.horizon, self.max_loaded)
+        finally:
+            db.close()
+        self._heap = [(due_at, approval_id) for due_at, approval_id in rows]
+        heapq.heapify(self._heap)
+        self._loaded_at = now
+        # If the window was truncated, only trust it up to the last deadline we actually loaded
+        self._loaded_until = rows[-1][0] if len(rows) >= self.max_loaded else now + self.horizon
+
+    def _process(self, approval_ids: List[UUID], now: datetime) -> int:
+        db = self.session_factory()
+        try:
+            locked = db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(self.LOCK_NAME)))).scalar()
+            if not locked:
+                # Another node is processing this tick; the rows stay PENDING and get re-read on refill
+                db.rollback()
+                self._loaded_until = None
+                return 0
+
+            handled = 0
+            for approval in SubmissionRepository(db).lock_overdue_approvals(approval_ids, now):
+                self._handle_overdue(db, approval, now)
+                handled += 1
+            db.commit()
+            return handled
+        except Exception:
+            db.rollback()
+            self._loaded_until = None
+            raise
+        finally:
+            db.close()
+
+    def _handle_overdue(self, db: Session, approval: ApprovalRequest, now: datetime) -> None:
+        stage = db.get(WorkflowStage, approval.stage_id)
+        sla = timedelta(hours=stage.sla_hours or 24)
+
+        target_id = None
+        if stage.sla_action != "REMIND":
+            target_id = OrgService(db).get_escalation_target(approval.assigned_user_id)
+
+        if target_id is None:
+            # Explicit REMIND, or nobody above the approver: nudge and push the deadline out
+            approval.reminder_count = (approval.reminder_count or 0) + 1
+            approval.due_at = now + sla
+            inbox_broker.publish(db, approval.assigned_user_id, {
+                "type": "approval_reminder",
+                "approval_request_id": str(approval.id),
+                "submission_id": str(approval.submission_id)
+            })
+            AuditService(db).log_action(
+                entity_id=approval.submission_id,
+                entity_type="SUBMISSION",
+                action="SLA_REMINDER",
+                snapshot={"approval_request_id": str(approval.id), "reminder_count": approval.reminder_count}
+            )
+            return
+
+        approval.status = "ESCALATED"
+        approval.action_timestamp = now
+        escalated = SubmissionRepository(db).create_approval_request(
+            approval.submission_id,
+            approval.stage_id,
+            target_id,
+            due_at=now + sla,
+            escalation_level=(approval.escalation_level or 0) + 1,
+            stage_entered_at=approval.stage_entered_at or approval.created_at
+        )
+        AuditService(db).log_action(
+            entity_id=approval.submission_id,
+            entity_type="SUBMISSION",
+            action="SLA_ESCALATED",
+            snapshot={
+                "from_user_id": str(approval.assigned_user_id),
+                "to_user_id": str(target_id),
+                "stage_id": str(approval.stage_id),
+                "escalation_level": escalated.escalation_level
+            }
+        )
+        OutboxRepository(db).add_event("APPROVAL_ESCALATED", approval.submission_id, {
+            "submission_id": str(approval.submission_id),
+            "stage_id": str(approval.stage_id),
+            "from_user_id": str(approval.assigned_user_id),
+            "to_user_id": str(target_id),
+            "approval_request_id": str(escalated.id)
+        })
+        logger.info("Escalated approval %s to user %s", approval.id, target_id)
@@ -0,0 +1,113 @@
+# app/services/storage_gc.py
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import func, select
+
+from app.repositories.object_repo import StoredObjectRepository
+from app.services.document_service import BUCKET_NAME, get_storage_client
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PREFIX = "sha256/"
+
+class StorageGarbageCollector:
+    """
+    Deletes content-addressed blobs nothing references any more.
+
+    Two passes:
+    1. stored_objects rows whose ref_count dropped to zero more than `grace` ago. Rows are
+       locked with SKIP LOCKED, and uploaders take the same row lock in acquire(), so a blob
+       is never deleted while a document is being attached to it.
+    2. (optional) objects under sha256/ with no row at all, e.g. an upload whose transaction
+       rolled back. Only objects older than `grace` are considered, and each batch claims its
+       hashes with placeholder rows before deleting, so an uploader re-using one of them waits
+       in acquire() and then sees the blob is gone.
+
+    Like the SLA scheduler, a transaction-scoped advisory lock elects one node per run.
+    """
+
+    LOCK_NAME = "storage-gc"
+
+    def __init__(self, session_factory, grace_seconds: int = 86400, batch_size: int = 500, sweep_bucket: bool = True):
+        self.session_factory = session_factory
+        self.grace = timedelta(seconds=grace_seconds)
+        self.batch_size = batch_size
+        self.sweep_bucket = sweep_bucket
+
+    def collect_once(self) -> int:
+        deleted = self._collect_unreferenced()
+        if self.sweep_bucket:
+            deleted += self._collect_untracked()
+        if deleted:
+            logger.info("Storage GC removed %d objects", deleted)
+        return deleted
+
+    def _collect_unreferenced(self) -> int:
+        cutoff = datetime.utcnow() - self.grace
+        deleted = 0
+        while True:
+            db = self.session_factory()
+            try:
+                if not db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(self.LOCK_NAME)))).scalar():
+                    db.rollback()
+                    return deleted
+                orphans = StoredObjectRepository(db).lock_orphans(cutoff, self.batch_size)
+                client = get_storage_client() if orphans else None
+                for stored in orphans:
+                    # Removing a key that's already gone is a no-op, so a crash between here and commit is harmless
+                    client.remove_object(BUCKET_NAME, stored.object_key)
+                    db.delete(stored)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            deleted += len(orphans)
+            if len(orphans) < self.batch_size:
+                return deleted
+
+    def _collect_untracked(self) -> int:
+        cutoff = datetime.now(timezone.utc) - self.grace
+        client = get_storage_client()
+        deleted = 0
+        batch: List = []
+        for obj in client.list_objects(BUCKET_NAME, prefix=CONTENT_PREFIX, recursive=True):
+            if obj.last_modified and obj.last_modified < cutoff:
+                batch.append(obj)
+            if len(batch) >= self.batch_size:
+                removed = self._delete_untracked(client, batch)
+                if removed is None:
+                    return deleted
+                deleted += removed
+                batch = []
+        if batch:
+            deleted += self._delete_untracked(client, batch) or 0
+        return deleted
+
+    def _delete_untracked(self, client, objects: List) -> Optional[int]:
+        """Deletes the batch's untracked blobs; None when another node holds the GC lock."""
+        candidates = [
+            (obj.object_name.rsplit("/", 1)[-1].split(".", 1)[0], obj.object_name, obj.size or 0) for obj in objects
+        ]
+        db = self.session_factory()
+        try:
+            if not db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(self.LOCK_NAME)))).scalar():
+                db.rollback()
+                return None
+            # Claim the hashes with placeholder rows: uploaders of a claimed hash block in acquire()
+            # until we commit, then find the blob gone and upload it again
+            repo = StoredObjectRepository(db)
+            claimed = set(repo.claim_untracked(candidates))
+            for content_hash, object_key, _ in candidates:
+                if content_hash in claimed:
+                    client.remove_object(BUCKET_NAME, object_key)
+            repo.discard(list(claimed))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return len(claimed)
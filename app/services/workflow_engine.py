@@ -1,5 +1,7 @@
 # app/services/workflow_engine.py (Part A)
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from app.core.tracing import traced
 
 class ConditionEvaluator:
     """Safely evaluates JSON logic against form submission data."""
@@ -15,6 +17,7 @@ class ConditionEvaluator:
     }
 
     @classmethod
+    @traced("ConditionEvaluator.evaluate")
     def evaluate(cls, conditions: Dict[str, Any], form_data: Dict[str, Any]) -> bool:
         """
         Example conditions: {"leave_days": {">": 3}, "category": {"==": "SICK"}}
@@ -37,28 +40,81 @@ class ConditionEvaluator:
                     
         return True # All conditions passed
 
+class ParallelGroupResolver:
+    """
+    Decides the outcome of a parallel group (stages sharing a `stage_order`).
+    Sequential stages are simply groups of one.
+    """
+
+    JOIN_POLICIES = ("ALL", "ANY", "QUORUM")
+
+    @classmethod
+    def approvals_needed(cls, join_policy: str, quorum: Optional[int], group_size: int) -> int:
+        if join_policy == "ANY":
+            return 1
+        if join_policy == "QUORUM":
+            return max(1, min(quorum or group_size, group_size))
+        return group_size # ALL (default)
+
+    @classmethod
+    def resolve(cls, join_policy: str, quorum: Optional[int], statuses: List[str]) -> Optional[str]:
+        """
+        Example statuses: ["APPROVED", "PENDING", "REJECTED"] (one per routed stage in the group).
+        Returns "APPROVED" once enough approvals are in, "REJECTED" once they can no longer
+        arrive, and None while the group is still open.
+        """
+        needed = cls.approvals_needed(join_policy, quorum, len(statuses))
+        approved = statuses.count("APPROVED")
+        pending = statuses.count("PENDING")
+
+        if approved >= needed:
+            return "APPROVED"
+        if approved + pending < needed:
+            return "REJECTED"
+        return None
+
 # app/services/workflow_engine.py (Part B)
+from itertools import groupby
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
+from app.core.reference_cache import reference_cache
 from app.repositories.workflow_repo import WorkflowRepository
 from app.repositories.submission_repo import SubmissionRepository
+from app.repositories.outbox_repo import OutboxRepository
 from app.services.org_service import OrgService
 from app.models.workflow import FormSubmission, ApprovalRequest
 from app.services.audit_service import AuditService
 from app.services.document_service import DocumentService
+from app.services.form_schema import FormDataInvalid, FormSchemaError, validate_form_data
 
 class WorkflowService:
     def __init__(self, db: Session):
         self.db = db
         self.wf_repo = WorkflowRepository(db)
         self.sub_repo = SubmissionRepository(db)
+        self.outbox_repo = OutboxRepository(db)
         self.org_service = OrgService(db)
 
+    def _emit(self, event_type: str, submission: FormSubmission, **details):
+        """Records a transition in the outbox, inside the same transaction as the state change."""
+        payload = {
+            "submission_id": str(submission.id),
+            "form_template_id": str(submission.form_template_id),
+            "submitter_id": str(submission.submitter_id),
+            **details
+        }
+        self.outbox_repo.add_event(event_type, submission.id, payload)
+
+    @traced("WorkflowService.process_new_submission")
     def process_new_submission(self, submitter_id: UUID, template_id: UUID, form_data: dict, is_draft: bool):
         """Called when user clicks 'Submit' or 'Save as Draft' in the UI."""
+        # Drafts may be incomplete; everything else is checked before any routing work happens
+        if not is_draft:
+            form_data = self.validate_form_data(template_id, form_data)
+
         # 1. Create the base record
         submission = self.sub_repo.create_submission(template_id, submitter_id, form_data, is_draft)
         
@@ -68,15 +124,41 @@ class WorkflowService:
             return submission
 
         # 3. If it's a real submission, start the engine!
+        self._emit("SUBMISSION_PENDING", submission, status="PENDING", form_data=form_data)
         self._advance_workflow(submission)
         self.db.commit()
         return submission
 
+    def validate_form_data(self, template_id: UUID, form_data: dict) -> dict:
+        """Validates and coerces form_data against the template's compiled schema (422 listing every bad field)."""
+        template = self.wf_repo.get_form_template(template_id)
+        if not template or not template.is_active:
+            raise HTTPException(status_code=404, detail="Form template not found or inactive.")
+        try:
+            return validate_form_data(template.id, template.version or 1, template.form_schema, form_data)
+        except FormDataInvalid as exc:
+            raise HTTPException(status_code=422, detail=exc.errors)
+        except FormSchemaError as exc:
+            raise HTTPException(status_code=500, detail=f"Form template schema is invalid: {exc}")
+
+    @traced("WorkflowService.process_approval")
     def process_approval(self, approval_request_id: UUID, actor_id: UUID, action: str, comments: str = None):
         """Called when a Manager clicks 'Approve' or 'Reject' in the UI."""
         req = self.db.query(ApprovalRequest).filter(ApprovalRequest.id == approval_request_id).first()
-        
-        if not req or req.status != "PENDING":
+        if not req:
+            raise HTTPException(status_code=400, detail="Request is invalid or already processed.")
+
+        # Serialize decisions per submission: parallel approvers of a group queue on the submission
+        # row, so exactly one of them sees the group decided. Submission first, then the request
+        # (the archiver locks submissions first too); both re-read, since the first read was unlocked.
+        submission = self.db.query(FormSubmission).filter(
+            FormSubmission.id == req.submission_id
+        ).populate_existing().with_for_update().first()
+        req = self.db.query(ApprovalRequest).filter(
+            ApprovalRequest.id == approval_request_id
+        ).populate_existing().with_for_update().first()
+
+        if submission is None or req.status != "PENDING":
             raise HTTPException(status_code=400, detail="Request is invalid or already processed.")
         if req.assigned_user_id != actor_id:
             raise HTTPException(status_code=403, detail="You are not authorized to approve this step.")
@@ -84,12 +166,45 @@ class WorkflowService:
         # Update the request
         req.status = "APPROVED" if action == "APPROVE" else "REJECTED"
         req.action_timestamp = datetime.utcnow()
-        # Note: In Part 5, we will add Audit Logging here for the `comments`.
+        req.comments = comments
 
-        submission = req.submission
+        AuditService(self.db).log_action(
+            entity_id=submission.id,
+            entity_type="SUBMISSION",
+            action=req.status,
+            actor_id=actor_id,
+            snapshot={
+                "approval_request_id": str(req.id),
+                "stage_id": str(req.stage_id),
+                "comments": comments
+            }
+        )
+
+        # Resolve the parallel group this stage belongs to (a sequential stage is a group of one)
+        blueprint = reference_cache.workflow_blueprint(self.db, submission.form_template_id)
+        group = blueprint.stage_group(req.stage_id) if blueprint else []
+        if not group:
+            # The stage was removed from the workflow after this request was routed
+            stage = self.wf_repo.get_stage(req.stage_id)
+            group = self.wf_repo.get_stage_group(stage.workflow_id, stage.stage_order)
+        group_requests = self.sub_repo.get_active_requests_for_stages(submission.id, [s.id for s in group])
+        outcome = ParallelGroupResolver.resolve(
+            group[0].join_policy, group[0].quorum, [r.status for r in group_requests]
+        )
 
-        if action == "REJECTED":
+        if outcome is None:
+            self.db.commit()
+            return {"message": "Decision recorded. Waiting on the other approvers in this stage."}
+
+        # The group is decided: siblings still waiting are no longer needed
+        self.sub_repo.cancel_pending_requests(submission.id, [s.id for s in group])
+
+        if outcome == "REJECTED":
             self.sub_repo.update_submission_status(submission.id, "REJECTED")
+            self._emit(
+                "SUBMISSION_REJECTED", submission,
+                status="REJECTED", stage_id=str(req.stage_id), actor_id=str(actor_id), comments=comments
+            )
             self.db.commit()
             return {"message": "Submission rejected. Workflow terminated."}
 
@@ -98,50 +213,67 @@ class WorkflowService:
         self.db.commit()
         return {"message": "Approved successfully. Advanced to next stage."}
 
+    @traced("WorkflowService._advance_workflow")
     def _advance_workflow(self, submission: FormSubmission, current_stage_id: UUID = None):
         """
         The Brain: Figures out what happens next.
+        Stages sharing a `stage_order` form a parallel group and are routed together.
         """
-        # 1. Get the workflow blueprint
-        workflow = self.wf_repo.get_workflow_for_template(submission.form_template_id)
+        # 1. Get the workflow blueprint (shared, read-only copy; see app.core.reference_cache)
+        workflow = reference_cache.workflow_blueprint(self.db, submission.form_template_id)
         if not workflow:
             raise HTTPException(status_code=500, detail="No workflow attached to this form.")
 
-        # 2. Fetch all stages sequentially
-        stages = self.wf_repo.get_workflow_stages(workflow.id)
+        # 2. Take the stages in order and bucket them into groups by stage_order
+        stages = workflow.stages
+        groups = [list(members) for _, members in groupby(stages, key=lambda stage: stage.stage_order)]
         
-        # 3. Determine the *next* stage to evaluate
-        next_stage_index = 0
+        # 3. Determine the *next* group to evaluate
+        next_group_index = 0
         if current_stage_id:
-            for idx, stage in enumerate(stages):
-                if stage.id == current_stage_id:
-                    next_stage_index = idx + 1
+            for idx, group in enumerate(groups):
+                if any(stage.id == current_stage_id for stage in group):
+                    next_group_index = idx + 1
                     break
 
-        # 4. Recursively evaluate upcoming stages until one passes its conditions
-        while next_stage_index < len(stages):
-            target_stage = stages[next_stage_index]
+        # 4. Evaluate upcoming groups until one has at least one required stage
+        while next_group_index < len(groups):
+            # Evaluate JSON logic per stage (e.g., leave_days > 3)
+            required_stages = [
+                stage for stage in groups[next_group_index]
+                if ConditionEvaluator.evaluate(stage.conditions, submission.form_data)
+            ]
             
-            # Evaluate JSON logic (e.g., leave_days > 3)
-            is_required = ConditionEvaluator.evaluate(target_stage.conditions, submission.form_data)
-            
-            if is_required:
-                # Logic passed! We must route to this stage.
-                approver_id = self.org_service.get_approver_for_user(
-                    submitter_id=submission.submitter_id,
-                    required_role=target_stage.required_role
-                )
-                
-                # Create the inbox item for the manager
-                self.sub_repo.create_approval_request(submission.id, target_stage.id, approver_id)
-                self.sub_repo.update_submission_status(submission.id, "PENDING", target_stage.id)
+            if required_stages:
+                # Logic passed! Route to every required stage of the group at once.
+                for target_stage in required_stages:
+                    approver_id = self.org_service.get_approver_for_user(
+                        submitter_id=submission.submitter_id,
+                        required_role=target_stage.required_role
+                    )
+                    
+                    # Create the inbox item for the manager (with a deadline if the stage has an SLA)
+                    due_at = None
+                    if target_stage.sla_hours:
+                        due_at = datetime.utcnow() + timedelta(hours=target_stage.sla_hours)
+                    self.sub_repo.create_approval_request(submission.id, target_stage.id, approver_id, due_at=due_at)
+                    self._emit(
+                        "STAGE_ROUTED", submission,
+                        status="PENDING",
+                        stage_id=str(target_stage.id),
+                        stage_order=target_stage.stage_order,
+                        required_role=target_stage.required_role,
+                        approver_id=str(approver_id)
+                    )
+                self.sub_repo.update_submission_status(submission.id, "PENDING", required_stages[0].id)
                 return # Exit loop, waiting for human action
 
-            # If condition failed (e.g., leave_days is only 2), skip this stage and check the next one.
-            next_stage_index += 1
+            # If every condition failed (e.g., leave_days is only 2), skip this group and check the next one.
+            next_group_index += 1
 
         # 5. If we loop through all stages and none are left to process, the workflow is COMPLETE.
         self.sub_repo.update_submission_status(submission.id, "COMPLETED")
+        self._emit("SUBMISSION_COMPLETED", submission, status="COMPLETED", form_data=submission.form_data)
 
         # Log the completion securely
         audit_service = AuditService(self.db)
@@ -0,0 +1,86 @@
+# benchmarks/condition_vector_bench.py
+"""
+Vectorized vs scalar stage condition evaluation on synthetic form_data.
+
+Every condition set is evaluated both ways over the same rows; the run fails if any
+mask differs from ConditionEvaluator, so this doubles as the simulator's equivalence check.
+The data mixes ints, floats, numeric strings, booleans, None, lists and missing keys.
+
+Usage:
+    python -m benchmarks.condition_vector_bench --rows 1000000
+    python -m benchmarks.condition_vector_bench --rows 200000 --scalar-sample 200000
+"""
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.services.workflow_engine import ConditionEvaluator
+from app.services.workflow_simulator import ColumnBatch, VectorizedConditionEvaluator
+
+CONDITION_SETS = [
+    {"leave_days": {">": 5}},
+    {"leave_days": {"<=": 3}, "category": {"==": "sick"}},
+    {"category": {"IN": ["SICK", 5, [1, 2]]}},
+    {"category": {"!=": "vacation"}, "leave_days": {">=": "2"}},
+    {"amount": {">": 1000}, "currency": {"IN": ["USD", "EUR"]}},
+    {"leave_days": {"IN": [3, 4.0]}},
+    None,
+]
+
+def synthetic_rows(rng: random.Random, count: int) -> list:
+    rows = []
+    for _ in range(count):
+        row = {}
+        if rng.random() < 0.9:
+            days = rng.randint(0, 20)
+            row["leave_days"] = rng.choice([days, float(days), str(days), None, True])
+        if rng.random() < 0.9:
+            row["category"] = rng.choice(["SICK", "sick", "Vacation", "Personal", None, 5, [1, 2]])
+        row["amount"] = round(rng.lognormvariate(6, 1.2), 2)
+        row["currency"] = rng.choice(["USD", "EUR", "GBP", "INR"])
+        rows.append(row)
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=100_000, help="Rows also run through the scalar evaluator")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = synthetic_rows(rng, args.rows)
+    fields = sorted({field for conditions in CONDITION_SETS for field in (conditions or {})})
+
+    started = time.perf_counter()
+    columns = {field: np.fromiter((row.get(field) for row in rows), dtype=object, count=len(rows)) for field in fields}
+    print(f"columnar load: {time.perf_counter() - started:.3f}s for {len(rows)} rows")
+
+    sample = min(args.scalar_sample, len(rows))
+    mismatches = 0
+    batch = ColumnBatch(dict(columns), len(rows))
+    for conditions in CONDITION_SETS:
+        started = time.perf_counter()
+        mask = VectorizedConditionEvaluator.evaluate(conditions, batch)
+        vector_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        expected = np.fromiter((ConditionEvaluator.evaluate(conditions, row) for row in rows[:sample]), dtype=bool, count=sample)
+        scalar_seconds = (time.perf_counter() - started) * len(rows) / sample if sample else 0.0
+
+        differ = int((mask[:sample] != expected).sum())
+        mismatches += differ
+        print(
+            f"{str(conditions):70.70} hits={int(mask.sum()):>8} vector={vector_seconds:.3f}s "
+            f"scalar~{scalar_seconds:.2f}s{'  MISMATCH x' + str(differ) if differ else ''}"
+        )
+
+    if mismatches:
+        print(f"FAILED: {mismatches} rows evaluated differently", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
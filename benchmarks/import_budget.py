@@ -0,0 +1,74 @@
+# benchmarks/import_budget.py
+"""
+Cold-start budget for `import app.main`. Each attempt runs in a fresh interpreter with
+`-X importtime`. The script fails if the best wall time exceeds --budget, or if any heavy
+optional dependency was imported eagerly.
+
+Usage:
+    python -m benchmarks.import_budget --budget 1.5 --repeat 5 --top 15
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Only the code paths that actually use these modules should import them
+LAZY_MODULES = ("xhtml2pdf", "reportlab", "minio", "PIL", "jose", "passlib", "jinja2", "numpy")
+
+PROBE = (
+    "import sys, json; import app.main; "
+    "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+)
+
+def run_once() -> Tuple[float, str, List[str]]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - started
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return elapsed, proc.stderr, loaded
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Returns cumulative microseconds per module from `-X importtime` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=1.5, help="Maximum allowed wall time in seconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    best_time, best_stderr, loaded = min(runs, key=lambda run: run[0])
+
+    cumulative = parse_importtime(best_stderr)
+    print(f"import app.main: best {best_time:.3f}s over {args.repeat} runs (budget {args.budget:.3f}s)")
+    print(f"\nTop {args.top} modules by cumulative import time:")
+    for name, micros in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {micros / 1000:9.1f} ms  {name}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if best_time > args.budget:
+        failures.append(f"over budget by {best_time - args.budget:.3f}s")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# benchmarks/parallel_group_race.py
+"""
+Concurrency check for parallel stage groups, through WorkflowService.process_approval and
+_advance_workflow against a real Postgres.
+
+Two workflows (join ALL and join ANY) start with a parallel group of a MANAGER and a HOD stage,
+followed by a final HOD stage. For every submission both group approvers decide at the same
+moment (released together by a barrier). Whatever order the database serializes them in, the
+result must be the one a serial run could produce:
+- the submission is REJECTED only for ALL with a rejection, otherwise it sits at the final stage;
+- the final stage is routed exactly once (never twice, which is what two deciders each seeing
+  the group complete would do), and not at all after a rejection;
+- no request of the decided group is left PENDING;
+- a decider may lose with a 400 (its request was cancelled or decided first), nothing else.
+
+Exits non-zero on any violation.
+
+Usage:
+    python -m benchmarks.parallel_group_race --docker --submissions 200 --concurrency 8
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.workflow_bench import start_docker_postgres, stop_docker_postgres
+
+CASES = [("ALL", ("APPROVE", "APPROVE")), ("ALL", ("APPROVE", "REJECT")), ("ANY", ("APPROVE", "APPROVE")), ("ANY", ("APPROVE", "REJECT"))]
+
+def seed_parallel_workflow(db, join_policy: str) -> Dict:
+    from app.models.workflow import FormTemplate, Workflow, WorkflowStage
+    template = FormTemplate(
+        name=f"Race {join_policy}",
+        form_schema={"type": "object", "properties": {"leave_days": {"type": "integer"}}, "required": ["leave_days"]},
+        is_active=True
+    )
+    db.add(template)
+    db.flush()
+    workflow = Workflow(form_template_id=template.id, name=f"Race {join_policy} workflow")
+    db.add(workflow)
+    db.flush()
+    group = [
+        WorkflowStage(workflow_id=workflow.id, stage_order=1, required_role=role, join_policy=join_policy)
+        for role in ("MANAGER", "HOD")
+    ]
+    final = WorkflowStage(workflow_id=workflow.id, stage_order=2, required_role="HOD", join_policy="ALL")
+    db.add_all(group + [final])
+    db.commit()
+    return {"template_id": template.id, "group_stage_ids": [stage.id for stage in group], "final_stage_id": final.id}
+
+def decide(session_factory, barrier: threading.Barrier, approval_id, approver_id, action: str, outcomes: List) -> None:
+    from fastapi import HTTPException
+    from app.services.workflow_engine import WorkflowService
+    db = session_factory()
+    try:
+        barrier.wait(timeout=30)
+        WorkflowService(db).process_approval(approval_id, approver_id, action)
+        outcomes.append("ok")
+    except HTTPException as exc:
+        outcomes.append(f"http {exc.status_code}")
+    except Exception as exc:
+        outcomes.append(f"error {type(exc).__name__}: {exc}")
+    finally:
+        db.close()
+
+def check(db, submission_id, workflow: Dict, join_policy: str, actions, outcomes: List[str]) -> List[str]:
+    from app.models.workflow import ApprovalRequest, FormSubmission
+    problems = []
+    unexpected = [outcome for outcome in outcomes if outcome not in ("ok", "http 400")]
+    if unexpected or "ok" not in outcomes:
+        problems.append(f"decider outcomes {outcomes}")
+
+    submission = db.get(FormSubmission, submission_id)
+    requests = db.query(ApprovalRequest).filter(ApprovalRequest.submission_id == submission_id).all()
+    final_routes = sum(1 for request in requests if request.stage_id == workflow["final_stage_id"])
+    still_pending = [request for request in requests if request.stage_id in workflow["group_stage_ids"] and request.status == "PENDING"]
+    rejected = join_policy == "ALL" and "REJECT" in actions
+
+    if rejected and (submission.status != "REJECTED" or final_routes):
+        problems.append(f"expected REJECTED with no final route, got {submission.status} / {final_routes} final routes")
+    if not rejected and (submission.status != "PENDING" or submission.current_stage_id != workflow["final_stage_id"] or final_routes != 1):
+        problems.append(f"expected one route to the final stage, got {submission.status} / {final_routes} final routes")
+    if still_pending:
+        problems.append(f"{len(still_pending)} group request(s) left PENDING after the group was decided")
+    return problems
+
+def run(args) -> int:
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import analytics, archive, audit, inbox_counter, organization, outbox, versioning, workflow  # noqa: F401 (create_all)
+    from app.models.workflow import ApprovalRequest
+    from app.services.workflow_engine import WorkflowService
+    from benchmarks.seed_org import seed_synthetic_org
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    org = seed_synthetic_org(db, departments=4, depth=4, fanout=3, users=args.users, seed=args.seed)
+    workflows = {policy: seed_parallel_workflow(db, policy) for policy in ("ALL", "ANY")}
+    db.close()
+
+    rng = random.Random(args.seed)
+    jobs = []
+    for _ in range(args.submissions):
+        join_policy, actions = rng.choice(CASES)
+        db = SessionLocal()
+        submission = WorkflowService(db).process_new_submission(
+            submitter_id=rng.choice(org.submitter_ids),
+            template_id=workflows[join_policy]["template_id"],
+            form_data={"leave_days": 5},
+            is_draft=False
+        )
+        group = db.query(ApprovalRequest.id, ApprovalRequest.assigned_user_id).filter(
+            ApprovalRequest.submission_id == submission.id
+        ).order_by(ApprovalRequest.id).all()
+        jobs.append((submission.id, join_policy, rng.sample(actions, len(actions)), group))
+        db.close()
+
+    violations, tally = [], Counter()
+    for start in range(0, len(jobs), args.concurrency):
+        batch = jobs[start:start + args.concurrency]
+        threads, outcomes = [], {}
+        for submission_id, join_policy, actions, group in batch:
+            barrier = threading.Barrier(len(group))
+            outcomes[submission_id] = []
+            for (approval_id, approver_id), action in zip(group, actions):
+                threads.append(threading.Thread(
+                    target=decide, args=(SessionLocal, barrier, approval_id, approver_id, action, outcomes[submission_id])
+                ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        db = SessionLocal()
+        try:
+            for submission_id, join_policy, actions, _ in batch:
+                tally[(join_policy, tuple(sorted(actions)))] += 1
+                for problem in check(db, submission_id, workflows[join_policy], join_policy, actions, outcomes[submission_id]):
+                    violations.append(f"{join_policy} {sorted(actions)} submission {submission_id}: {problem}")
+        finally:
+            db.close()
+
+    for (join_policy, actions), count in sorted(tally.items()):
+        print(f"{join_policy:3s} {'+'.join(actions):15s} {count:5d} submissions")
+    for violation in violations:
+        print(f"VIOLATION {violation}")
+    print(f"{len(violations)} violation(s) in {len(jobs)} concurrent group decisions")
+    return 1 if violations else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:15 container")
+    parser.add_argument("--docker-port", type=int, default=55436)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="Submissions decided at the same time (2 threads each)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.docker:
+        args.database_url = start_docker_postgres(args.docker_port)
+    if not args.database_url:
+        parser.error("pass --database-url (a disposable database!) or --docker")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_POOL_SIZE", str(args.concurrency * 2 + 2))
+    os.environ.setdefault("INBOX_BROKER", "memory")
+
+    try:
+        status = run(args)
+    finally:
+        if args.docker:
+            stop_docker_postgres()
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/prefork_bench.py
+"""
+Per-worker memory and start-up time of the gunicorn entry point, with and without preloading.
+
+Starts `gunicorn -c gunicorn.conf.py app.main:app` once with GUNICORN_PRELOAD=true and once with
+false, waits until every worker has logged "Application startup complete", then reads each
+worker's /proc/<pid>/smaps_rollup (Linux). USS (private pages) is what a worker really costs;
+PSS splits the shared pages between the processes sharing them. Without preloading, the PDF and
+crypto libraries are still imported lazily, so those workers pay for them later, on first use.
+
+Usage:
+    python -m benchmarks.prefork_bench --docker --workers 4 [--report prefork.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.workflow_bench import start_docker_postgres, stop_docker_postgres
+
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """kB values of /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as handle:
+        for line in handle:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+def child_pids(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as handle:
+        return [int(child) for child in handle.read().split()]
+
+def run_server(database_url: str, workers: int, port: int, preload: bool, timeout: float) -> Dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_PRELOAD": "true" if preload else "false",
+        # Keep the background jobs quiet so only the serving processes are measured
+        "OUTBOX_RELAY_ENABLED": "false", "SLA_SCHEDULER_ENABLED": "false", "STORAGE_GC_ENABLED": "false",
+        "INTEGRITY_SCAN_ENABLED": "false", "ATTACHMENT_SWEEP_ENABLED": "false", "CYCLE_ROLLUP_ENABLED": "false",
+        "INBOX_COUNTER_RECONCILE_ENABLED": "false", "STARTUP_WARM_UP": "false",
+    }
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env, stderr=subprocess.PIPE, text=True
+    )
+    ready = threading.Event()
+    booted = []
+
+    def watch_log():
+        for line in proc.stderr:
+            if "Application startup complete" in line:
+                booted.append(time.perf_counter() - started)
+                if len(booted) >= workers:
+                    ready.set()
+
+    threading.Thread(target=watch_log, daemon=True).start()
+    try:
+        if not ready.wait(timeout):
+            raise RuntimeError(f"only {len(booted)}/{workers} workers started within {timeout:.0f}s")
+        time.sleep(1) # Let the workers settle (listener threads, first GC)
+        per_worker = [smaps_rollup(pid) for pid in child_pids(proc.pid)]
+        master = smaps_rollup(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    uss = [worker.get("Private_Clean", 0) + worker.get("Private_Dirty", 0) for worker in per_worker]
+    pss = [worker.get("Pss", 0) for worker in per_worker]
+    return {
+        "preload": preload,
+        "workers": len(per_worker),
+        "all_workers_ready_seconds": round(booted[-1], 2),
+        "worker_uss_kb_avg": round(sum(uss) / len(uss)),
+        "worker_pss_kb_avg": round(sum(pss) / len(pss)),
+        "total_pss_kb": sum(pss) + master.get("Pss", 0),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:15 container")
+    parser.add_argument("--docker-port", type=int, default=55435)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--report", help="Write the results as JSON here")
+    args = parser.parse_args()
+
+    if args.docker:
+        args.database_url = start_docker_postgres(args.docker_port)
+    if not args.database_url:
+        parser.error("pass --database-url (a disposable database!) or --docker")
+
+    try:
+        results = [run_server(args.database_url, args.workers, args.port, preload, args.timeout) for preload in (False, True)]
+    finally:
+        if args.docker:
+            stop_docker_postgres()
+
+    for result in results:
+        print(
+            f"preload={str(result['preload']):5s} workers={result['workers']} ready in {result['all_workers_ready_seconds']:6.2f}s  "
+            f"USS/worker {result['worker_uss_kb_avg'] / 1024:7.1f} MiB  PSS/worker {result['worker_pss_kb_avg'] / 1024:7.1f} MiB  "
+            f"total PSS {result['total_pss_kb'] / 1024:7.1f} MiB"
+        )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+if __name__ == "__main__":
+    main()
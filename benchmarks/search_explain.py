@@ -0,0 +1,135 @@
+# benchmarks/search_explain.py
+"""
+EXPLAIN guard for the admin submission search.
+
+Seeds a synthetic org plus `--rows` submissions into a throwaway Postgres, runs ANALYZE, then
+plans a set of representative searches with EXPLAIN (FORMAT JSON). Exits non-zero if any of them
+falls back to a sequential scan of form_submissions, i.e. if a filter stopped being index-driven.
+
+Usage:
+    python -m benchmarks.search_explain --docker --rows 50000 [--analyze]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from benchmarks.workflow_bench import start_docker_postgres, stop_docker_postgres
+
+def plan_nodes(node: Dict) -> Iterator[Dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+def seed_submissions(db, org, rows: int, seed: int) -> None:
+    from benchmarks.seed_org import _bulk_insert
+    from app.models.workflow import FormSubmission
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # Skewed so some filters are selective (GIN) and others are better served by ordered scans
+    categories, weights = ["SICK", "CASUAL", "ANNUAL", "UNPAID"], [30, 60, 8, 2]
+    statuses = ["PENDING"] * 2 + ["APPROVED", "REJECTED", "COMPLETED", "COMPLETED", "DRAFT"]
+    _bulk_insert(db, FormSubmission, [{
+        "id": uuid.uuid4(),
+        "form_template_id": org.template_id,
+        "submitter_id": rng.choice(org.submitter_ids),
+        "form_data": {"leave_days": rng.randint(1, 20), "category": rng.choices(categories, weights)[0], "reason": "bench"},
+        "status": rng.choice(statuses),
+        "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+    } for _ in range(rows)])
+    db.commit()
+
+def scenarios(org, department_id) -> Dict[str, Dict]:
+    now = datetime.utcnow()
+    return {
+        "status_page": {"statuses": ["PENDING"]},
+        "containment": {"contains": {"category": "UNPAID"}},
+        "equality_dsl": {"form_data": {"category": {"==": "SICK"}}, "statuses": ["PENDING"]},
+        "in_dsl": {"form_data": {"category": {"IN": ["ANNUAL", "UNPAID"]}}},
+        "unfiltered": {},
+        "range_with_status": {"statuses": ["PENDING"], "form_data": {"leave_days": {">": 5}}},
+        "template_date_range": {"template_id": org.template_id, "created_from": now - timedelta(days=7)},
+        "department": {"statuses": ["PENDING"], "department_id": department_id},
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:15 container")
+    parser.add_argument("--docker-port", type=int, default=55433)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (also prints timings)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.docker:
+        args.database_url = start_docker_postgres(args.docker_port)
+    if not args.database_url:
+        parser.error("pass --database-url (a disposable database!) or --docker")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("INBOX_BROKER", "memory")
+
+    try:
+        failures = run(args)
+    finally:
+        if args.docker:
+            stop_docker_postgres()
+    if failures:
+        print("\nFAIL: sequential scan of form_submissions in " + ", ".join(failures))
+        sys.exit(1)
+    print("\nOK: every search is index-driven")
+
+def run(args) -> List[str]:
+    from sqlalchemy import event, text
+    from app.core.database import Base, SessionLocal, create_tables, engine
+    from app.models.organization import Department
+    from app.repositories.search_repo import SubmissionSearchRepository
+    from benchmarks.seed_org import seed_synthetic_org
+
+    Base.metadata.drop_all(bind=engine)
+    create_tables()
+    db = SessionLocal()
+    org = seed_synthetic_org(db, departments=10, depth=4, fanout=4, users=args.users, seed=args.seed)
+    seed_submissions(db, org, args.rows, args.seed)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    department_id = db.query(Department.id).first()[0]
+
+    prefix = "EXPLAIN (ANALYZE, FORMAT JSON) " if args.analyze else "EXPLAIN (FORMAT JSON) "
+
+    # Capture the statement exactly as sent to the driver, so parameters bind as in production
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    failures = []
+    repo = SubmissionSearchRepository(db)
+    for name, filters in scenarios(org, department_id).items():
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            repo.build_query(**filters).all()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = captured[-1]
+        plan = db.connection().exec_driver_sql(prefix + statement, parameters).scalar()
+        root = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+        nodes = list(plan_nodes(root["Plan"]))
+        seq_scans = [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == "form_submissions"]
+        indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+        timing = f" {root['Execution Time']:.2f}ms" if "Execution Time" in root else ""
+        verdict = "SEQ SCAN" if seq_scans else "ok"
+        print(f"{name:<22} {verdict:<9}{timing} indexes={','.join(indexes) or '-'}")
+        if seq_scans:
+            failures.append(name)
+    db.close()
+    return failures
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/seed_org.py
+"""Synthetic organisation generator: departments, position trees and users, loaded with bulk inserts."""
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.models.organization import User, Department, Position, UserPosition
+from app.models.workflow import FormTemplate, Workflow, WorkflowStage
+
+CHUNK = 5000
+ROLE_BY_LEVEL = {0: "HOD", 1: "MANAGER"} # Deeper levels are plain USER positions
+
+@dataclass
+class SyntheticOrg:
+    template_id: uuid.UUID
+    admin_id: uuid.UUID
+    submitter_ids: List[uuid.UUID] = field(default_factory=list)
+    position_count: int = 0
+    user_count: int = 0
+
+def _bulk_insert(db: Session, model, rows: List[Dict]) -> None:
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[start:start + CHUNK])
+
+def seed_synthetic_org(db: Session, departments: int, depth: int, fanout: int, users: int, seed: int = 42) -> SyntheticOrg:
+    """
+    Builds `departments` position trees of the given depth and fan-out (HOD -> MANAGER -> USER...)
+    and spreads `users` over them, staffing every position at least once.
+    Submitters are drawn from levels >= 2 so every one of them has a MANAGER and a HOD above.
+    """
+    if depth < 3:
+        raise ValueError("depth must be >= 3 so submitters have both a MANAGER and a HOD above them")
+
+    rng = random.Random(seed)
+    password_hash = get_password_hash("bench-password") # bcrypt once, not per user
+
+    department_rows, position_rows, levels = [], [], {}
+    for d in range(departments):
+        department_id = uuid.uuid4()
+        department_rows.append({"id": department_id, "name": f"Department {d}", "region": "Bench"})
+        frontier = [None]
+        for level in range(depth):
+            next_frontier = []
+            for parent_id in frontier:
+                for child in range(1 if level == 0 else fanout):
+                    position_id = uuid.uuid4()
+                    position_rows.append({
+                        "id": position_id,
+                        "title": f"L{level} position {len(position_rows)}",
+                        "role_type": ROLE_BY_LEVEL.get(level, "USER"),
+                        "department_id": department_id,
+                        "parent_position_id": parent_id,
+                    })
+                    levels[position_id] = level
+                    next_frontier.append(position_id)
+            frontier = next_frontier
+
+    # Every position gets one occupant, remaining users go to the deepest (most populous) level
+    leaf_ids = [row["id"] for row in position_rows if levels[row["id"]] == depth - 1]
+    assignments = [row["id"] for row in position_rows]
+    assignments += [rng.choice(leaf_ids) for _ in range(max(0, users - len(assignments)))]
+
+    admin_id = uuid.uuid4()
+    user_rows = [{
+        "id": admin_id, "email": "bench-admin@example.com", "full_name": "Bench Admin",
+        "hashed_password": password_hash, "is_active": True, "is_admin": True,
+    }]
+    user_position_rows, submitter_ids = [], []
+    for idx, position_id in enumerate(assignments):
+        user_id = uuid.uuid4()
+        user_rows.append({
+            "id": user_id, "email": f"bench-user-{idx}@example.com", "full_name": f"Bench User {idx}",
+            "hashed_password": password_hash, "is_active": True, "is_admin": False,
+        })
+        user_position_rows.append({"user_id": user_id, "position_id": position_id})
+        if levels[position_id] >= 2:
+            submitter_ids.append(user_id)
+
+    template_id, workflow_id = uuid.uuid4(), uuid.uuid4()
+
+    _bulk_insert(db, Department, department_rows)
+    _bulk_insert(db, Position, position_rows) # Parents precede children, FK checks run per statement
+    _bulk_insert(db, User, user_rows)
+    _bulk_insert(db, UserPosition, user_position_rows)
+    _bulk_insert(db, FormTemplate, [{
+        "id": template_id,
+        "name": "Bench Leave Request",
+        "description": "Synthetic benchmark template",
+        "form_schema": {
+            "type": "object",
+            "properties": {"leave_days": {"type": "integer", "minimum": 1}, "reason": {"type": "string"}},
+            "required": ["leave_days"],
+        },
+        "is_active": True,
+    }])
+    _bulk_insert(db, Workflow, [{"id": workflow_id, "form_template_id": template_id, "name": "Bench Leave Workflow"}])
+    _bulk_insert(db, WorkflowStage, [
+        {"id": uuid.uuid4(), "workflow_id": workflow_id, "stage_order": 1, "required_role": "MANAGER",
+         "conditions": None, "sla_hours": 48, "sla_action": "ESCALATE", "join_policy": "ALL"},
+        {"id": uuid.uuid4(), "workflow_id": workflow_id, "stage_order": 2, "required_role": "HOD",
+         "conditions": {"leave_days": {">": 3}}, "sla_hours": 48, "sla_action": "ESCALATE", "join_policy": "ALL"},
+    ])
+    db.commit()
+
+    return SyntheticOrg(
+        template_id=template_id,
+        admin_id=admin_id,
+        submitter_ids=submitter_ids,
+        position_count=len(position_rows),
+        user_count=len(user_rows),
+    )
@@ -0,0 +1,94 @@
+# benchmarks/serialization_bench.py
+"""
+Serialization cost per 1k submissions: FastAPI's default path (jsonable_encoder + stdlib json)
+versus the response_model + ORJSONResponse path, plus gzip/brotli cost on the resulting body.
+
+Usage:
+    python -m benchmarks.serialization_bench --rows 1000 --fields 40 --repeat 20
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.submission import FormSubmissionResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def make_rows(count: int, fields: int) -> list:
+    """ORM-like objects (attribute access only) with a realistic JSONB payload."""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        form_data = {f"field_{n}": (n * i) % 97 if n % 3 else f"value {n}-{i}" for n in range(fields)}
+        form_data["line_items"] = [{"sku": str(uuid.uuid4()), "qty": n, "price": n * 9.5} for n in range(5)]
+        rows.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            form_template_id=uuid.uuid4(),
+            submitter_id=uuid.uuid4(),
+            form_data=form_data,
+            status="PENDING",
+            created_at=now - timedelta(minutes=i),
+        ))
+    return rows
+
+def stdlib_path(rows: list) -> bytes:
+    # What FastAPI does for a route without response_model and the default JSONResponse
+    content = jsonable_encoder(rows)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def orjson_path(adapter: TypeAdapter, rows: list) -> bytes:
+    # What FastAPI does with response_model=List[FormSubmissionResponse] and ORJSONResponse
+    content = adapter.dump_python(adapter.validate_python(rows), mode="json")
+    return orjson.dumps(content)
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--fields", type=int, default=40, help="Top-level keys per form_data payload")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.fields)
+    adapter = TypeAdapter(List[FormSubmissionResponse])
+    per_k = 1000 / args.rows
+
+    stdlib_s = measure(lambda: stdlib_path(rows), args.repeat)
+    orjson_s = measure(lambda: orjson_path(adapter, rows), args.repeat)
+    body = orjson_path(adapter, rows)
+
+    print(f"rows={args.rows} fields={args.fields} body={len(body) / 1024:.1f} KiB")
+    print(f"jsonable_encoder + json : {stdlib_s * 1000 * per_k:8.2f} ms / 1k submissions")
+    print(f"pydantic + orjson       : {orjson_s * 1000 * per_k:8.2f} ms / 1k submissions "
+          f"({stdlib_s / orjson_s:.1f}x faster)")
+
+    gzip_s = measure(lambda: gzip.compress(body, compresslevel=6), args.repeat)
+    print(f"gzip level 6            : {gzip_s * 1000 * per_k:8.2f} ms / 1k submissions, "
+          f"{len(gzip.compress(body, compresslevel=6)) / 1024:.1f} KiB")
+    if brotli is not None:
+        br_s = measure(lambda: brotli.compress(body, quality=4), args.repeat)
+        print(f"brotli quality 4        : {br_s * 1000 * per_k:8.2f} ms / 1k submissions, "
+              f"{len(brotli.compress(body, quality=4)) / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
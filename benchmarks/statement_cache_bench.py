@@ -0,0 +1,148 @@
+# benchmarks/statement_cache_bench.py
+"""
+Client CPU per call of the hot repository queries: statements rebuilt on every call (the
+previous code, reproduced below) versus the module-level statements with bound parameters.
+
+Both variants run the same SQL against a throwaway Postgres; time.process_time() counts only
+this process's CPU, so the database round trip cancels out and the difference is statement
+construction, cache-key generation and compilation. Prints CPU and wall microseconds per call
+and the CPU saved per call.
+
+Usage:
+    python -m benchmarks.statement_cache_bench --docker --calls 5000 [--report statements.json]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.workflow_bench import start_docker_postgres, stop_docker_postgres
+
+# --- The previous, rebuilt-per-call versions ---
+def adhoc_user_by_id(db, user_id):
+    from app.models.organization import User
+    return db.query(User).filter(User.id == user_id).first()
+
+def adhoc_workflow_stages(db, workflow_id):
+    from app.models.workflow import WorkflowStage
+    return db.query(WorkflowStage).filter(
+        WorkflowStage.workflow_id == workflow_id
+    ).order_by(WorkflowStage.stage_order.asc()).all()
+
+def adhoc_pending_approvals(db, user_id):
+    from app.models.workflow import ApprovalRequest
+    return db.query(ApprovalRequest).filter(
+        ApprovalRequest.assigned_user_id == user_id,
+        ApprovalRequest.status == "PENDING"
+    ).all()
+
+def adhoc_ancestor_positions(db, position_id):
+    from sqlalchemy import select
+    from sqlalchemy.orm import aliased
+    from app.models.organization import Position
+    base_query = select(Position).where(Position.id == position_id).cte(name="position_hierarchy", recursive=True)
+    PositionAlias = aliased(Position)
+    recursive_query = select(PositionAlias).join(base_query, PositionAlias.id == base_query.c.parent_position_id)
+    return db.execute(select(base_query.union_all(recursive_query))).all()
+
+# --- The cached statements the repositories use now ---
+def cached_user_by_id(db, user_id):
+    from app.repositories.user_repo import USER_BY_ID
+    return db.execute(USER_BY_ID, {"user_id": user_id}).scalars().first()
+
+def cached_workflow_stages(db, workflow_id):
+    from app.repositories.workflow_repo import STAGES_BY_WORKFLOW
+    return db.execute(STAGES_BY_WORKFLOW, {"workflow_id": workflow_id}).scalars().all()
+
+def cached_pending_approvals(db, user_id):
+    from app.repositories.submission_repo import PENDING_APPROVALS_FOR_USER
+    return db.execute(PENDING_APPROVALS_FOR_USER, {"user_id": user_id}).scalars().all()
+
+def cached_ancestor_positions(db, position_id):
+    from app.repositories.hierarchy_repo import ancestor_positions_statement
+    return db.execute(ancestor_positions_statement(), {"starting_position_id": position_id}).all()
+
+def measure(session_factory, operation: Callable, arguments: List, calls: int, warmup: int) -> Dict:
+    db = session_factory()
+    try:
+        for argument in arguments[:warmup]:
+            operation(db, argument)
+        db.expunge_all()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for index in range(calls):
+            operation(db, arguments[index % len(arguments)])
+            if index % 500 == 499:
+                db.expunge_all() # Keep the identity map (and its cost) small and equal for both variants
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    finally:
+        db.close()
+    return {"cpu_us_per_call": round(cpu / calls * 1e6, 1), "wall_us_per_call": round(wall / calls * 1e6, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:15 container")
+    parser.add_argument("--docker-port", type=int, default=55434)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=5000, help="Calls per query and variant")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the results as JSON here")
+    args = parser.parse_args()
+
+    if args.docker:
+        args.database_url = start_docker_postgres(args.docker_port)
+    if not args.database_url:
+        parser.error("pass --database-url (a disposable database!) or --docker")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    try:
+        run(args)
+    finally:
+        if args.docker:
+            stop_docker_postgres()
+
+def run(args) -> None:
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import analytics, archive, audit, inbox_counter, organization, outbox, versioning, workflow  # noqa: F401 (create_all)
+    from app.models.organization import Position, User
+    from app.models.workflow import Workflow
+    from benchmarks.seed_org import seed_synthetic_org
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed_synthetic_org(db, departments=4, depth=4, fanout=3, users=args.users, seed=args.seed)
+    rng = random.Random(args.seed)
+    user_ids = [row[0] for row in db.query(User.id).all()]
+    position_ids = [row[0] for row in db.query(Position.id).all()]
+    workflow_ids = [row[0] for row in db.query(Workflow.id).all()]
+    db.close()
+    rng.shuffle(user_ids)
+    rng.shuffle(position_ids)
+
+    paths = {
+        "UserRepository.get_by_id": (adhoc_user_by_id, cached_user_by_id, user_ids),
+        "WorkflowRepository.get_workflow_stages": (adhoc_workflow_stages, cached_workflow_stages, workflow_ids),
+        "SubmissionRepository.get_pending_approvals_for_user": (adhoc_pending_approvals, cached_pending_approvals, user_ids),
+        "HierarchyRepository.get_ancestor_positions": (adhoc_ancestor_positions, cached_ancestor_positions, position_ids),
+    }
+    results = {}
+    for name, (adhoc, cached, arguments) in paths.items():
+        before = measure(SessionLocal, adhoc, arguments, args.calls, args.warmup)
+        after = measure(SessionLocal, cached, arguments, args.calls, args.warmup)
+        saved = before["cpu_us_per_call"] - after["cpu_us_per_call"]
+        results[name] = {"rebuilt": before, "cached": after, "cpu_us_saved_per_call": round(saved, 1)}
+        print(
+            f"{name:55s} rebuilt {before['cpu_us_per_call']:7.1f}us cpu / {before['wall_us_per_call']:7.1f}us wall   "
+            f"cached {after['cpu_us_per_call']:7.1f}us cpu / {after['wall_us_per_call']:7.1f}us wall   "
+            f"saved {saved:6.1f}us cpu ({saved / before['cpu_us_per_call'] * 100 if before['cpu_us_per_call'] else 0:4.1f}%)"
+        )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump({"calls": args.calls, "driver": engine.dialect.driver, "results": results}, handle, indent=2)
+
+if __name__ == "__main__":
+    main()
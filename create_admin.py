@@ -2,6 +2,7 @@
 from app.core.database import SessionLocal
 from app.models.organization import User
 from app.models.workflow import FormSubmission
+from app.models import versioning  # noqa: F401 (keeps the users list ETag in sync)
 from app.core.security import get_password_hash
 
 def create_superuser():
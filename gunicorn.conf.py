@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+"""
+Pre-fork entry point: one gunicorn master, N uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+With preload_app the master imports the app and runs app.main.prefork_warm_up (heavy imports,
+create_all, reference cache) once; workers fork from it and share those pages copy-on-write.
+gc.freeze() moves everything loaded so far out of the collector's reach, so worker GC passes
+don't write to (and un-share) the inherited objects. Each worker still runs the lifespan hook:
+its own DB pool warm-up, background workers, inbox broker and reference-cache listener.
+
+Environment: PORT, WEB_CONCURRENCY (workers), GUNICORN_TIMEOUT, GUNICORN_PRELOAD=false to compare.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() != "false"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+def when_ready(server):
+    """Master only, after the app is loaded and before the first worker forks."""
+    if not preload_app:
+        return
+    from app.main import prefork_warm_up
+    prefork_warm_up()
+    gc.freeze()
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from app.core.database import engine, read_engine
+    # Drop any pool state inherited from the master without closing the master's sockets
+    engine.dispose(close=False)
+    read_engine.dispose(close=False)
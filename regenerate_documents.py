@@ -0,0 +1,324 @@
+# regenerate_documents.py
+"""
+Re-render and re-store final documents, e.g. after a change to document_template.html
+or after failed uploads.
+
+Template data is gathered in this process, PDFs are rendered in a pool of worker processes
+(xhtml2pdf is CPU-bound), and a thread pool stores them (content-addressed, so unchanged
+documents skip the upload). Progress is checkpointed after every batch, and an interrupted
+run resumes when the same command is run again. Each selection (statuses, template, dates,
+--only-missing, --archived, --dry-run) gets its own checkpoint file; a checkpoint written for a
+different selection is refused, and a finished run's checkpoint is marked complete.
+
+Usage:
+    python regenerate_documents.py --status COMPLETED --since 2024-01-01 \\
+        --processes 8 --upload-threads 16 --rate 200
+    python regenerate_documents.py --only-missing            # documents that never got stored
+    python regenerate_documents.py --archived                # archived submissions
+    python regenerate_documents.py --only-missing --restart  # ignore the checkpoint, start over
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists, tuple_
+
+from app.core.database import SessionLocal
+from app.models import versioning  # noqa: F401 (keeps ETags in sync with the documents we write)
+from app.models.archive import ArchivedSubmission
+from app.models.audit import Document
+from app.models.workflow import FormSubmission
+from app.services.document_service import DocumentService, render_pdf
+
+class RateLimiter:
+    """Token bucket shared by the upload threads; rate <= 0 disables it."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+def selection_key(args) -> str:
+    """Identifies what a run regenerates; a checkpoint only resumes the selection that wrote it."""
+    selection = {
+        "status": sorted(args.status or []),
+        "template_id": str(args.template_id) if args.template_id else None,
+        "since": args.since.isoformat() if args.since else None,
+        "until": args.until.isoformat() if args.until else None,
+        "only_missing": args.only_missing,
+        "archived": args.archived,
+        "dry_run": args.dry_run, # A dry run's cursor must never make a real run skip documents
+    }
+    return hashlib.sha256(json.dumps(selection, sort_keys=True).encode()).hexdigest()[:16]
+
+class CheckpointMismatch(Exception):
+    pass
+
+class Checkpoint:
+    """
+    Last fully processed (created_at, id) plus counters, written atomically after each batch.
+    Stamped with the selection key; a finished run is marked complete, so re-running the same
+    command afterwards starts over instead of resuming at the end.
+    """
+
+    def __init__(self, path: str, selection: str):
+        self.path = path
+        self.selection = selection
+        self.completed = False
+        self.after: Optional[Tuple[datetime, UUID]] = None
+        self.stats = {"done": 0, "uploaded": 0, "deduplicated": 0, "failed": 0}
+        self.failures: List[Dict] = []
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                state = json.load(handle)
+            if state.get("selection") != selection:
+                raise CheckpointMismatch(
+                    f"{path} belongs to a different selection (status/template/dates/--only-missing/--archived/--dry-run); "
+                    f"pass --restart to discard it, or use another --checkpoint"
+                )
+            if state.get("completed"):
+                print(f"{path} records a finished run; starting over")
+                return
+            if state.get("after"):
+                self.after = (datetime.fromisoformat(state["after"][0]), UUID(state["after"][1]))
+            self.stats.update(state.get("stats", {}))
+            self.failures = state.get("failures", [])
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        state = {
+            "selection": self.selection,
+            "completed": self.completed,
+            "after": [self.after[0].isoformat(), str(self.after[1])] if self.after else None,
+            "stats": self.stats,
+            "failures": self.failures[-1000:],
+            "saved_at": datetime.utcnow().isoformat() + "Z",
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(state, handle, indent=2)
+        os.replace(tmp_path, self.path)
+
+def build_filters(args, model) -> list:
+    filters = []
+    if args.status:
+        filters.append(model.status.in_(args.status))
+    if args.template_id:
+        filters.append(model.form_template_id == args.template_id)
+    if args.since:
+        filters.append(model.created_at >= args.since)
+    if args.until:
+        filters.append(model.created_at < args.until)
+    if args.only_missing:
+        filters.append(~exists().where(Document.submission_id == model.id))
+    return filters
+
+def next_batch(model, filters: list, after: Optional[Tuple[datetime, UUID]], size: int) -> List[Tuple[datetime, UUID]]:
+    db = SessionLocal()
+    try:
+        query = db.query(model.created_at, model.id).filter(*filters)
+        if after:
+            query = query.filter(tuple_(model.created_at, model.id) > tuple_(*after))
+        return query.order_by(model.created_at.asc(), model.id.asc()).limit(size).all()
+    finally:
+        db.close()
+
+def count_remaining(model, filters: list, after: Optional[Tuple[datetime, UUID]]) -> int:
+    db = SessionLocal()
+    try:
+        query = db.query(model.id).filter(*filters)
+        if after:
+            query = query.filter(tuple_(model.created_at, model.id) > tuple_(*after))
+        return query.count()
+    finally:
+        db.close()
+
+def load_template_data(submission_ids: List[UUID], checkpoint: "Checkpoint") -> Dict[UUID, dict]:
+    """Template data per submission; one that can't be loaded is recorded as failed, not fatal to the batch."""
+    db = SessionLocal()
+    try:
+        service = DocumentService(db)
+        template_data = {}
+        for submission_id in submission_ids:
+            try:
+                template_data[submission_id] = service.build_template_data(submission_id)
+            except Exception as exc:
+                db.rollback() # A failed query aborts the transaction for the rest of the batch
+                record_failure(checkpoint, submission_id, "load", exc)
+        return template_data
+    finally:
+        db.close()
+
+def render(template_data: dict) -> bytes:
+    """Runs in a worker process. Errors are flattened so they always pickle back to the parent."""
+    try:
+        return render_pdf(template_data)
+    except Exception as exc:
+        raise RuntimeError(repr(exc)) from None
+
+def store(submission_id: UUID, pdf_bytes: bytes, limiter: RateLimiter, dry_run: bool) -> bool:
+    limiter.wait()
+    if dry_run:
+        return False
+    db = SessionLocal()
+    try:
+        _, uploaded = DocumentService(db).store_pdf(submission_id, pdf_bytes, action="DOCUMENT_REGENERATED")
+        return uploaded
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class Progress:
+    def __init__(self, total: int, checkpoint: Checkpoint, interval: float = 5.0):
+        self.total = total
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.start_done = checkpoint.stats["done"]
+        self._last_print = 0.0
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._last_print < self.interval:
+            return
+        self._last_print = now
+        stats = self.checkpoint.stats
+        processed = stats["done"] - self.start_done
+        elapsed = now - self.started
+        rate = processed / elapsed if elapsed else 0.0
+        eta = (self.total - processed) / rate if rate else float("inf")
+        print(
+            f"[{elapsed:7.1f}s] {processed}/{self.total} ({rate:.1f} docs/s, eta {eta:.0f}s) "
+            f"uploaded={stats['uploaded']} deduplicated={stats['deduplicated']} failed={stats['failed']}",
+            flush=True
+        )
+
+def run(args) -> int:
+    selection = selection_key(args)
+    if not args.checkpoint:
+        args.checkpoint = f"regenerate_documents.{selection}.checkpoint.json"
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    try:
+        checkpoint = Checkpoint(args.checkpoint, selection)
+    except CheckpointMismatch as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(f"Checkpoint: {args.checkpoint}")
+    if checkpoint.after:
+        print(f"Resuming after {checkpoint.after[0].isoformat()} / {checkpoint.after[1]}")
+    # Archived submissions live in their own table; the checkpoint cursor is per table
+    model = ArchivedSubmission if args.archived else FormSubmission
+    filters = build_filters(args, model)
+    total = count_remaining(model, filters, checkpoint.after)
+    if args.limit:
+        total = min(total, args.limit)
+    print(f"{total} submissions to regenerate with {args.processes} render processes and {args.upload_threads} upload threads")
+
+    limiter = RateLimiter(args.rate)
+    progress = Progress(total, checkpoint)
+    processed = 0
+    exhausted = False
+
+    with ProcessPoolExecutor(max_workers=args.processes) as renderers, \
+            ThreadPoolExecutor(max_workers=args.upload_threads) as uploaders:
+        while processed < total:
+            batch = next_batch(model, filters, checkpoint.after, min(args.batch_size, total - processed))
+            if not batch:
+                exhausted = True
+                break
+            template_data = load_template_data([submission_id for _, submission_id in batch], checkpoint)
+
+            renders = {renderers.submit(render, data): submission_id for submission_id, data in template_data.items()}
+            stores = {}
+            for future in as_completed(renders):
+                submission_id = renders[future]
+                try:
+                    stores[uploaders.submit(store, submission_id, future.result(), limiter, args.dry_run)] = submission_id
+                except Exception as exc:
+                    record_failure(checkpoint, submission_id, "render", exc)
+                progress.report()
+            for future in as_completed(stores):
+                submission_id = stores[future]
+                try:
+                    uploaded = future.result()
+                    checkpoint.stats["done"] += 1
+                    checkpoint.stats["uploaded" if uploaded else "deduplicated"] += 1
+                except Exception as exc:
+                    record_failure(checkpoint, submission_id, "store", exc)
+                progress.report()
+
+            # Every submission of the batch has been attempted, so the cursor can move past it
+            checkpoint.after = batch[-1]
+            checkpoint.save()
+            processed += len(batch)
+        # Stopping at --limit leaves the run open; otherwise everything selected has been attempted
+        exhausted = exhausted or not args.limit or processed < args.limit
+
+    if exhausted:
+        checkpoint.completed = True
+        checkpoint.save()
+    progress.report(force=True)
+    elapsed = time.perf_counter() - progress.started
+    report = {
+        "elapsed_seconds": round(elapsed, 1),
+        "docs_per_second": round((checkpoint.stats["done"] - progress.start_done) / elapsed, 1) if elapsed else 0.0,
+        **checkpoint.stats,
+    }
+    print(json.dumps(report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump({**report, "failures": checkpoint.failures}, handle, indent=2)
+    return 1 if checkpoint.stats["failed"] else 0
+
+def record_failure(checkpoint: Checkpoint, submission_id: UUID, phase: str, exc: Exception) -> None:
+    checkpoint.stats["done"] += 1
+    checkpoint.stats["failed"] += 1
+    checkpoint.failures.append({"submission_id": str(submission_id), "phase": phase, "error": repr(exc)})
+    print(f"  {phase} failed for {submission_id}: {exc!r}", file=sys.stderr)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="append", help="Submission status to include (repeatable). Default: COMPLETED")
+    parser.add_argument("--template-id", type=UUID)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created_at >= this (ISO date/time)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created_at < this (ISO date/time)")
+    parser.add_argument("--only-missing", action="store_true", help="Only submissions without a stored document")
+    parser.add_argument("--archived", action="store_true", help="Regenerate archived submissions instead of live ones")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2, help="PDF render processes")
+    parser.add_argument("--upload-threads", type=int, default=8, help="Concurrent MinIO uploads / DB commits")
+    parser.add_argument("--rate", type=float, default=0, help="Max documents stored per second (0 = unlimited)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Submissions per checkpointed batch")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many submissions (0 = all)")
+    parser.add_argument("--checkpoint", help="Progress file (default: one per selection, named after its key)")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and start from the beginning")
+    parser.add_argument("--report", help="Write the final JSON report (with failures) here")
+    parser.add_argument("--dry-run", action="store_true", help="Render only; store nothing")
+    args = parser.parse_args()
+    if not args.status:
+        args.status = ["COMPLETED"]
+    sys.exit(run(args))
+
+if __name__ == "__main__":
+    main()
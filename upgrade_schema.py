@@ -0,0 +1,132 @@
+# upgrade_schema.py
+"""
+Brings a database created by an earlier release up to the current models.
+
+`create_all` (run on startup) only creates missing tables; it never adds columns, indexes or
+constraints to tables that already exist. This script runs, in order:
+
+1. create_all, for the tables this release introduces (stored_objects, attachments, outbox,
+   table_versions, inbox_counters, approval_cycle_rollups, the archive tables);
+2. the explicit statements in UPGRADE_STEPS: new columns, their backfills, indexes, and the
+   constraint changes (which need the backfilled rows in place);
+3. a full inbox counter reconcile, so the badges start from the real counts.
+
+Every statement is idempotent (IF [NOT] EXISTS, guarded backfills), so an interrupted run can
+simply be repeated. Steps 1-2 run in one transaction. Index builds lock their table for writes,
+so run it in a maintenance window (or print the SQL and build the indexes CONCURRENTLY first).
+
+Usage:
+    python upgrade_schema.py
+    python upgrade_schema.py --print-sql > upgrade.sql   # review or apply by hand
+"""
+import argparse
+
+# (title, statements), applied in this order
+UPGRADE_STEPS = [
+    ("form_templates: optimistic version counter (compiled validator cache key)", [
+        "ALTER TABLE form_templates ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    ]),
+    ("workflow_stages: SLA and parallel-group columns", [
+        "ALTER TABLE workflow_stages ADD COLUMN IF NOT EXISTS sla_hours INTEGER",
+        "ALTER TABLE workflow_stages ADD COLUMN IF NOT EXISTS sla_action VARCHAR",
+        "ALTER TABLE workflow_stages ADD COLUMN IF NOT EXISTS join_policy VARCHAR",
+        "ALTER TABLE workflow_stages ADD COLUMN IF NOT EXISTS quorum INTEGER",
+        "UPDATE workflow_stages SET sla_action = 'ESCALATE' WHERE sla_action IS NULL",
+        "UPDATE workflow_stages SET join_policy = 'ALL' WHERE join_policy IS NULL",
+    ]),
+    ("approval_requests: comments, SLA bookkeeping, stage entry and rollup flag", [
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS comments TEXT",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITHOUT TIME ZONE",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS stage_entered_at TIMESTAMP WITHOUT TIME ZONE",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS due_at TIMESTAMP WITHOUT TIME ZONE",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS escalation_level INTEGER",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS reminder_count INTEGER",
+        "ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS rolled_up BOOLEAN NOT NULL DEFAULT false",
+        "UPDATE approval_requests SET escalation_level = 0 WHERE escalation_level IS NULL",
+        "UPDATE approval_requests SET reminder_count = 0 WHERE reminder_count IS NULL",
+        # Decisions taken before stage entry was recorded have no cycle time; keep them out of the rollups
+        "UPDATE approval_requests SET rolled_up = true "
+        "WHERE rolled_up = false AND created_at IS NULL AND stage_entered_at IS NULL",
+    ]),
+    ("audit_logs: full-text search vector (rewrites the table)", [
+        "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(snapshot->>'comments', '')), 'A') || "
+        "setweight(to_tsvector('english', action || ' ' || entity_type), 'B') || "
+        "setweight(jsonb_to_tsvector('english', coalesce(snapshot, '{}'::jsonb), '[\"string\", \"numeric\"]'), 'C')"
+        ") STORED",
+    ]),
+    ("documents: creation time", [
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITHOUT TIME ZONE",
+    ]),
+    ("indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_approval_requests_pending_due_at ON approval_requests (due_at) "
+        "WHERE status = 'PENDING' AND due_at IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS ix_approval_requests_assignee_status ON approval_requests (assigned_user_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_approval_requests_submission_id ON approval_requests (submission_id)",
+        "CREATE INDEX IF NOT EXISTS ix_approval_requests_unrolled ON approval_requests (action_timestamp) "
+        "WHERE rolled_up = false AND action_timestamp IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS ix_form_submissions_form_data ON form_submissions USING gin (form_data jsonb_path_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_form_submissions_created ON form_submissions (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_form_submissions_status_created ON form_submissions (status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_form_submissions_template_created ON form_submissions (form_template_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_form_submissions_submitter_created ON form_submissions (submitter_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_entity_timestamp ON audit_logs (entity_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_timestamp ON audit_logs (timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_search_vector ON audit_logs USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_documents_submission_id ON documents (submission_id)",
+        "DROP INDEX IF EXISTS ix_stored_objects_verified_at",
+        "CREATE INDEX IF NOT EXISTS ix_stored_objects_verification ON stored_objects (verified_at, content_hash)",
+    ]),
+    ("stored_objects: one row per legacy document blob", [
+        # Legacy PDFs keep their original keys (the GC's bucket sweep only looks under sha256/).
+        # Their size is unknown here; 0 until the next verify_documents.py run records it.
+        "INSERT INTO stored_objects (content_hash, object_key, size_bytes, content_type, ref_count, created_at) "
+        "SELECT document_hash, min(minio_object_key), 0, 'application/pdf', count(*), now() AT TIME ZONE 'utc' "
+        "FROM documents GROUP BY document_hash "
+        "ON CONFLICT (content_hash) DO NOTHING",
+    ]),
+    ("constraints: documents point at stored_objects, submissions may be archived", [
+        "ALTER TABLE documents DROP CONSTRAINT IF EXISTS documents_submission_id_fkey",
+        "ALTER TABLE attachments DROP CONSTRAINT IF EXISTS attachments_submission_id_fkey",
+        "DO $$ BEGIN "
+        "ALTER TABLE documents ADD CONSTRAINT documents_document_hash_fkey "
+        "FOREIGN KEY (document_hash) REFERENCES stored_objects (content_hash); "
+        "EXCEPTION WHEN duplicate_object THEN NULL; END $$",
+    ]),
+]
+
+def print_sql() -> None:
+    print("-- Run after create_all has created the new tables (python -c \"from app.core.database import create_tables; create_tables()\")")
+    print("BEGIN;")
+    for title, statements in UPGRADE_STEPS:
+        print(f"\n-- {title}")
+        for statement in statements:
+            print(f"{statement};")
+    print("\nCOMMIT;")
+
+def upgrade() -> None:
+    from sqlalchemy import text
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import analytics, archive, audit, inbox_counter, organization, outbox, versioning, workflow  # noqa: F401 (create_all)
+    from app.services.inbox_reconciler import InboxCounterReconciler
+
+    with engine.begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        for title, statements in UPGRADE_STEPS:
+            print(f"-- {title}")
+            for statement in statements:
+                connection.execute(text(statement))
+    corrected = InboxCounterReconciler(SessionLocal).reconcile_once()
+    print(f"Schema upgraded; {corrected} inbox counters initialized")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--print-sql", action="store_true", help="Print the ordered SQL instead of running it")
+    args = parser.parse_args()
+    if args.print_sql:
+        print_sql()
+    else:
+        upgrade()
+
+if __name__ == "__main__":
+    main()